@@ -6,8 +6,16 @@ This program was coded and tested on Mac OSX 10.13.
 Jinook Oh, Cognitive Biology department, University of Vienna
 September 2019.
 
+Usage:
+    python eca.py              # graphical user interface
+    python eca.py run -r 30 -W 800 -g 560 -i random -s 1 -o out.npy
+                               # headless run (wxPython is not imported)
+    python eca.py run -r 30 -W 100000 -g 10000000 --store run.eca
+    python eca.py resume run.eca
+                               # history in a file; continue after Ctrl-C
+
 Dependency:
-    wxPython (4.0)
+    wxPython (4.0), only for the graphical user interface
     Numpy (1.17)
 
 ------------------------------------------------------------------------
@@ -29,592 +37,599 @@ with this program.  If not, see <http://www.gnu.org/licenses/>.
 ------------------------------------------------------------------------
 """
 
-import sys, queue
-from random import randint
-from threading import Thread
+import os, argparse
+from time import time
 
-import wx
-import wx.lib.scrolledpanel as SPanel 
 import numpy as np
 
+from ecaEngine import __version__, ruleLUT, stepECA, packRow, unpackRow, \
+                      ruleFormula, stepPacked, makeInitLine, runECA
+
+# the engine functions are re-exported, so that 'import eca' gives the
+# library API; CellularAutomata1DFrame and CA1DApp (see __getattr__())
+# are left out, as 'from eca import *' would import wx
+__all__ = ["ruleLUT", "stepECA", "packRow", "unpackRow", "ruleFormula",
+           "stepPacked", "makeInitLine", "runECA", "main"]
+
 DEBUG = False
-__version__ = "0.1"
 
 #=======================================================================
 
-class CellularAutomata1DFrame(wx.Frame):
-    """ Printing one dimensional elementary cellular automata
-    (256 rules of Wolfram)
-    with a given parameters in user interface.
+def __getattr__(name):
+    """ Import the wxPython user interface lazily,
+    so that 'import eca' does not import wx.
     """
-    def __init__(self):
-        if DEBUG: print("CellularAutomata1DFrame.__init__")
-
-        ##### beginning of setting up attributes ----- 
-        w_pos = (0, 25) 
-        self.w_sz = [800, 600]
-        self.fonts = self.setupFontsForWXApp(5)
-        pi = {} 
-        # top panel for UI 
-        pi["tUI"] = dict(pos=(0, 0), 
-                         sz=(self.w_sz[0], 40), 
-                         bgCol="#cccccc", 
-                         style=wx.TAB_TRAVERSAL|wx.SUNKEN_BORDER)
-        tUISz = pi["tUI"]["sz"]
-        # panel for drawing rule
-        pi["rul"] = dict(pos=(0, tUISz[1]),
-                         sz=(tUISz[0], 20),
-                         bgCol="#777777",
-                         style=wx.TAB_TRAVERSAL|wx.SUNKEN_BORDER)
-        rulSz = pi["rul"]["sz"]
-        # panel for drawing CA result
-        pi["caR"] = dict(pos=(0, tUISz[1]+rulSz[1]), 
-                         sz=(tUISz[0], self.w_sz[1]-tUISz[1]-rulSz[1]), 
-                         bgCol="#999999", 
-                         style=wx.TAB_TRAVERSAL|wx.SUNKEN_BORDER)
-        self.pi = pi
-        self.gbs = {} # for GridBagSizer
-        self.timers = {}
-        self.rn = 124
-        self.rule = None
-        self.caRArr = None # numpy array for CA result image 
-        self.caRArrSz = (self.w_sz[1]-pi["tUI"]["sz"][1],
-                         self.w_sz[0])
-        self.th = None # thread 
-        self.q2m = queue.Queue()  # queue to main thread
-
-        ##### end of setting up attributes -----
-        
-        ### init frame
-        wx.Frame.__init__(
-                          self, 
-                          None, 
-                          -1, 
-                          "Elementary cellular automata v.%s"%(__version__), 
-                          pos = w_pos, 
-                          size = self.w_sz,
-                         ) 
-        self.SetBackgroundColour('#333333')
-        self.updateFrameSize()
-
-        ### create (scroll) panels
-        self.panel = {}
-        for pk in pi.keys():
-            self.panel[pk] = SPanel.ScrolledPanel(
-                                                  self, 
-                                                  name="%s_panel"%(pk), 
-                                                  pos=pi[pk]["pos"], 
-                                                  size=pi[pk]["sz"], 
-                                                  style=pi[pk]["style"],
-                                                 )
-            self.panel[pk].SetBackgroundColour(pi[pk]["bgCol"]) 
-            if pk == 'rul': 
-                self.panel[pk].Bind(wx.EVT_PAINT, self.onRPaint)
-            elif pk == 'caR': 
-                self.panel[pk].Bind(wx.EVT_PAINT, self.onPaint)
-
-        ##### beginning of setting up top UI panel interface -----
-        bw = 5 # border width for GridBagSizer
-        self.gbs["tUI"] = wx.GridBagSizer(0,0)
-        row = 0
-        col = 0
-        sTxt = self.setupStaticText(
-                                    self.panel["tUI"], 
-                                    "Rule number (Wolfram's 256 rules): ", 
-                                    font=self.fonts[2],
-                                   )
-        self.gbs["tUI"].Add(
-                            sTxt, 
-                            pos=(row,col), 
-                            flag=wx.ALIGN_CENTER_VERTICAL|wx.ALL, 
-                            border=bw,
-                           )
-        col += 1 
-        chkB= wx.CheckBox(
-                            self.panel["tUI"], 
-                            -1, 
-                            "Random",
-                            name="randRN_chkB",
-                            style=wx.CHK_2STATE
-                          )
-        chkB.Bind(wx.EVT_CHECKBOX, self.onCheckboxEvent)
-        chkB.SetValue(False)
-        self.gbs["tUI"].Add(
-                            chkB, 
-                            pos=(row,col), 
-                            flag=wx.ALIGN_CENTER_VERTICAL|wx.ALL, 
-                            border=bw,
-                           )
-        col += 1
-        spin = wx.SpinCtrl(
-                            self.panel["tUI"], 
-                            -1, 
-                            size=(50,-1), 
-                            min=0, 
-                            max=255, 
-                            initial=self.rn, 
-                            name='ruleN_spin',
-                            style=wx.SP_WRAP|wx.SP_ARROW_KEYS,
-                          )
-        self.gbs["tUI"].Add(
-                            spin, 
-                            pos=(row,col), 
-                            flag=wx.ALIGN_CENTER_VERTICAL|wx.ALL, 
-                            border=bw,
-                           )
-        col += 1
-        sTxt = self.setupStaticText(
-                                    self.panel["tUI"], 
-                                    'Initial line: ', 
-                                    font=self.fonts[2],
-                                   )
-        self.gbs["tUI"].Add(
-                            sTxt, 
-                            pos=(row,col), 
-                            flag=wx.ALIGN_CENTER_VERTICAL|wx.ALL, 
-                            border=bw,
-                           )
-        col += 1
-        cho = wx.Choice(
-                            self.panel["tUI"], 
-                            -1, 
-                            choices=['Center seed', 'Random'],
-                            name="initL_cho",
-                       )
-        self.gbs["tUI"].Add(
-                            cho, 
-                            pos=(row,col), 
-                            flag=wx.ALIGN_CENTER_VERTICAL|wx.ALL, 
-                            border=bw,
-                           )
-        col += 1
-        btn = wx.Button(
-                            self.panel["tUI"], 
-                            -1, 
-                            label="Run", 
-                            name='run_btn',
-                       )
-        btn.Bind(wx.EVT_LEFT_DOWN, self.onMouseDown)
-        self.gbs["tUI"].Add(
-                            btn, 
-                            pos=(row,col), 
-                            flag=wx.ALIGN_CENTER_VERTICAL|wx.ALL, 
-                            border=bw,
-                           )
-        self.panel["tUI"].SetSizer(self.gbs["tUI"])
-        self.gbs["tUI"].Layout()
-        self.panel["tUI"].SetupScrolling()
-        ##### end of setting up top UI panel interface -----
-
-        ### set up hot keys
-        idQuit = wx.Window.NewControlId()
-        self.Bind(wx.EVT_MENU, self.onClose, id=idQuit)
-        accel_tbl = wx.AcceleratorTable([ 
-                                    (wx.ACCEL_CMD,  ord('Q'), idQuit), 
-                                        ]) 
-        self.SetAcceleratorTable(accel_tbl)
-
-        ### set up status-bar
-        self.statusbar = self.CreateStatusBar(1)
-        self.sbBgCol = self.statusbar.GetBackgroundColour()
-        self.timers["sbTimer"] = None 
-
-    #-------------------------------------------------------------------
-
-    def setupFontsForWXApp(self, numFonts=5):
-        """ Set up fonts for wxPython application
-
-        Args:
-            numFonts (int): Number of fonts to return.
-
-        Returns:
-            fonts (list): List of wxPython fonts.
-        """
-        if DEBUG: print("CellularAutomata1DFrame.setupFontsForWXApp")
-        
-        ### fonts setup
-        if 'darwin' in sys.platform: _font = "Monaco"
-        else: _font = "Courier"
-        fontSz = 8
-        fonts = []  # larger fonts as index gets larger 
-        for i in range(numFonts):
-            fonts.append(
-                            wx.Font(
-                                    fontSz, 
-                                    wx.FONTFAMILY_SWISS, 
-                                    wx.FONTSTYLE_NORMAL, 
-                                    wx.FONTWEIGHT_BOLD,
-                                    False, 
-                                    faceName=_font,
-                                   )
-                        )
-            fontSz += 2
-        return fonts
-
-    #-------------------------------------------------------------------
-   
-    def setupStaticText(self, panel, label, name=None, size=None, 
-                        wrapWidth=None, font=None, fgColor=None, bgColor=None):
-        """ Initialize wx.StatcText widget with more options
-        
-        Args:
-            panel (wx.Panel): Panel to display wx.StaticText.
-            label (str): String to show in wx.StaticText.
-            name (str, optional): Name of the widget.
-            size (tuple, optional): Size of the widget.
-            wrapWidth (int, optional): Width for text wrapping.
-            font (wx.Font, optional): Font for wx.StaticText.
-            fgColor (wx.Colour, optional): Foreground color 
-            bgColor (wx.Colour, optional): Background color 
-
-        Returns:
-            wx.StaticText: Created wx.StaticText object.
-        """ 
-        if DEBUG: print("CellularAutomata1DFrame.setupStaticText()")
-
-        sTxt = wx.StaticText(panel, -1, label)
-        if name != None: sTxt.SetName(name)
-        if size != None: sTxt.SetSize(size)
-        if wrapWidth != None: sTxt.Wrap(wrapWidth)
-        if font != None: sTxt.SetFont(font)
-        if fgColor != None: sTxt.SetForegroundColour(fgColor) 
-        if bgColor != None: sTxt.SetBackgroundColour(bgColor)
-        return sTxt
-
-    #-------------------------------------------------------------------
-    
-    def updateFrameSize(self):
-        """ Set window size exactly to self.w_sz without menubar/border/etc.
-
-        Args: None
-
-        Returns: None
-        """
-        if DEBUG: print("CellularAutomata1DFrame.updateFrameSize()")
-
-        ### set window size exactly to self.w_sz 
-        ### without menubar/border/etc.
-        _diff = (self.GetSize()[0]-self.GetClientSize()[0], 
-                 self.GetSize()[1]-self.GetClientSize()[1])
-        _sz = (self.w_sz[0]+_diff[0], self.w_sz[1]+_diff[1])
-        self.SetSize(_sz) 
-        self.Refresh()
-    
-    #-------------------------------------------------------------------
-    
-    def receiveDataFromQueue(self, q):
-        """ Receive data from Queue.
-
-        Args:
-            q (Queue): Queue to receive data.
-
-        Returns
-            rData (): Received data from the queue. 
-        """
-        if DEBUG: print("CellularAutomata1DFrame.receiveDataFromQueue()")
-
-        rData = None
+    if name in ["CellularAutomata1DFrame", "CA1DApp"]:
+        import ecaGUI
+        return getattr(ecaGUI, name)
+    raise AttributeError("module %r has no attribute %r"%(__name__, name))
+
+#-----------------------------------------------------------------------
+
+def saveResult(fp, arr, info):
+    """ Save a result array.
+
+    Args:
+        fp (str): File path. '.npy' (cells, uint8), '.npz' (packed),
+            '.png' and '.ecarle' export it (see ecaExport), other
+            extensions save lines of '0'/'1' characters.
+        arr (numpy.ndarray): Result array.
+        info (dict): Run information from runECA().
+
+    Returns: None
+    """
+    if DEBUG: print("saveResult()")
+
+    ext = os.path.splitext(fp)[1].lower()
+    if ext in (".png", ".npy", ".npz", ".ecarle"):
+        from ecaExport import exportResult
+        exportResult(fp, arr, info)
+    else:
+        if info["packed"]: arr = unpackRow(arr, info["w"])
+        with open(fp, "w") as f:
+            for line in arr:
+                f.write((line + ord('0')).tobytes().decode("ascii") + "\n")
+
+#-----------------------------------------------------------------------
+
+def checkRunArgs(args):
+    """ Check that the options of 'run' work together; there is one
+    backend per run.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+        (str or None): Error message, or None if the options are valid.
+    """
+    if DEBUG: print("checkRunArgs()")
+
+    backends = [opt for opt, on in [
+                ("--radius/--colors/--totalistic",
+                    args.radius != 1 or args.colors != 2 or args.totalistic),
+                ("--unbounded", args.unbounded),
+                ("--threads", args.threads != None),
+                ("--store", args.store != None),
+                ("--every", args.every != None),
+                ("--cache", args.cache != None)] if on]
+    if len(backends) > 1:
+        return "%s cannot be used together"%(" and ".join(backends))
+    if args.packed and len(backends) > 0 and backends[0] != "--cache":
+        return "--packed cannot be used with %s"%(backends[0])
+    return None
+
+#-----------------------------------------------------------------------
+
+def cmdRun(args):
+    """ Run CA without user interface.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns: None
+    """
+    if DEBUG: print("cmdRun()")
+
+    cb = None
+    if args.profile != None:
+        from ecaProfile import PROFILER, chunkTimer
+        PROFILER.enabled = True
+        cb = chunkTimer()
+    if args.radius != 1 or args.colors != 2 or args.totalistic:
+        from ecaGeneral import runGeneral
+        arr, info = runGeneral(args.rule, args.width, args.generations,
+                               initL=args.init, seed=args.seed,
+                               k=args.colors, r=args.radius,
+                               totalistic=args.totalistic)
+        if args.output != None: saveResult(args.output, arr, info)
+        print("Rule %i (k=%i, r=%i%s), %i x %i, init: %s, seed: %s, "
+              "mean state: %.4f, %.3f s"%(info["rule"], info["k"],
+                    info["r"], ", totalistic" if info["totalistic"] else "",
+                    info["h"], info["w"], info["initL"], info["seed"],
+                    float(arr.mean()), info["elapsed"]))
+        return
+    if args.unbounded:
+        from ecaEngine import runUnbounded
+        arr, info = runUnbounded(args.rule, args.width, args.generations,
+                                 initL=args.init, seed=args.seed,
+                                 callback=cb)
+    elif args.threads != None:
+        from ecaParallel import ParallelStepper
+        stepper = ParallelStepper(args.threads)
         try:
-            if q.empty() == False: rData = q.get(False)
-        except Exception as e:
-            pass
-        return rData    
-    
-    #-------------------------------------------------------------------
-    
-    def onCheckboxEvent(self, event):
-        """ wx.CHECKBOX was clicked. 
-        
-        Args: event (wx.Event) 
-
-        Returns: None
-        """
-        if DEBUG: print("CellularAutomata1DFrame.onCheckboxEvent()")
-        
-        obj = event.GetEventObject()
-        objName = obj.GetName()
-        if objName == "randRN_chkB": # random rule number checkbox was clicked
-            # enable/disable manual rule number selection widget
-            spin = wx.FindWindowByName("ruleN_spin", self.panel["tUI"])
-            if obj.GetValue() == True: spin.Disable()
-            else: spin.Enable()
-
-    #-------------------------------------------------------------------
-
-    def onMouseDown(self, event):
-        """ Mouse button pressed down.
-        
-        Args: event (wx.Event) 
-
-        Returns: None
-        """
-        if DEBUG: print("CellularAutomata1DFrame.onMouseDown()")
-
-        obj = event.GetEventObject()
-        objName = obj.GetName()
-        if objName == "run_btn": self.runCAThread()
-    
-    #-------------------------------------------------------------------
-  
-    def runCAThread(self):
-        """ Start a thread for running CA 
-
-        Args: None 
-
-        Returns: None
-        """
-        if DEBUG: print("CellularAutomata1DFrame.runCAThread()")
-
-        w = self.caRArrSz[1]
-        h = self.caRArrSz[0]
-        caRArr = np.zeros(self.caRArrSz, np.uint8)
-
-        ### the first line
-        line = []
-        cho = wx.FindWindowByName("initL_cho", self.panel["tUI"])
-        initL = cho.GetString(cho.GetSelection()).lower()
-        if initL == 'center seed':
-            line = [0] * w
-            line[int(w/2)] = 1
-        elif initL == 'random':
-            # randomly generate the first line
-            for i in range(w): line.append(randint(0, 1))
-
-        ### rule number
-        chkB = wx.FindWindowByName("randRN_chkB", self.panel["tUI"])
-        rnSpin = wx.FindWindowByName("ruleN_spin", self.panel["tUI"])
-        if chkB.GetValue() == True:
-            ruleNum = randint(0, 255)
-            rnSpin.SetValue(ruleNum)
-        else:
-            ruleNum = rnSpin.GetValue()
-        self.rn = ruleNum
-        self.rule = '{0:08b}'.format(ruleNum)
-        self.panel["rul"].Refresh() # draw rules
-
-        ### run thread
-        args = (self.q2m, w, h, caRArr, line, ruleNum,)
-        self.th = Thread(target=self.runCA, args=args)
-        self.th.start() # start the thread 
-
-        ### set up a timer to check progress and receive final data 
-        self.timers["updateTimer"] = wx.Timer(self)
-        self.Bind(wx.EVT_TIMER, 
-                  self.updateProgress, 
-                  self.timers["updateTimer"])
-        self.timers["updateTimer"].Start(5)
-
-        btn = wx.FindWindowByName("run_btn", self.panel["tUI"])
-        btn.Disable()
-
-    #-------------------------------------------------------------------
-
-    def updateProgress(self, event):
-        """ Function periodically called by a timer to check progress.
-        
-        Args: event (wx.Event)
-        
-        Returns: None
-        """
-        if DEBUG: print("CellularAutomata1DFrame.updateProgress()")
-        
-        rData = self.receiveDataFromQueue(self.q2m)
-
-        if rData != None:
-            self.showStatusBarMsg(rData[1], 5)
-            p = rData[1].replace(" ","").split("/")
-            if rData[1].startswith("Progress: 100"): # reached the end
-                self.timers["updateTimer"].Stop()
-                self.caRArr = rData[2]
-                self.panel["caR"].Refresh() # draw result
-                self.th.join()
-                self.th = None
-                btn = wx.FindWindowByName("run_btn", self.panel["tUI"])
-                btn.Enable()
-
-    #-------------------------------------------------------------------
-
-    def runCA(self, q2m, w, h, caRArr, line, ruleNum):
-        """ Make a result array of Cellular automata
-
-        Args:
-            q2m (Queue): Queue to send data back.
-            w (int): Width of each line.
-            h (int): Height of result image. (Number of generations.)
-            caRArr (numpy.ndarray): Result image array.
-            line (list): The first line.
-            ruleNum (int): Rule number (among Wolfram's rules, 0-255).
-
-        Returns: None
-        """ 
-        if DEBUG: print("CellularAutomata1DFrame.runCA()")
- 
-        rule = '{0:08b}'.format(ruleNum)
-        rL = [int(x) for x in rule]
-
-        nCC = 3 # number of cells to consider. The cell itself and its
-            # two neighbors are considered in Wolfram's elementray cellular 
-            # automata
-
-        for row in range(h):
-            msg = "Progrss: %.1f %%"%(float(row)/h*100)
-            q2m.put(('msg', msg), True, None)
-            lArr = np.asarray(line)
-            caRArr[row,:] = lArr # store the current line
-            nextL = [0] * w 
-            for x in range(w):
-                rIdx = 0 # rule index
-                for ci in range(nCC):
-                # cell indices
-                # 0: left one, 1: self, 2: right one
-                    n = int(nCC/2)
-                    idx = (x + ci - n + w) % w # index to look at
-                    fCI = nCC - 1 - ci # flip
-                    rIdx = rIdx + (2**fCI) * line[idx]
-                rIdx = (2**nCC) - 1 - rIdx # flip
-                    # Rule index in Wolfram's 256 rules
-                    # starts from right side, [7,6,5,4,3,2,1,0]
-                nextL[x] = rL[rIdx]
-            line = nextL
-        q2m.put(('msg', "Progress: 100 %%", caRArr), True, None)
-
-    #-------------------------------------------------------------------
-    
-    def onRPaint(self, event):
-        """ Painting CA rule.
-
-        Args: event (wx.Event)
-
-        Returns: None
-        """ 
-        if DEBUG: print("CellularAutomata1DFrame.onRPaint()")
-        
-        evtObj = event.GetEventObject()
-        dc = wx.PaintDC(evtObj)
-        pBCol = self.pi["rul"]["bgCol"]
-        dc.SetBackground(wx.Brush(pBCol))
-        dc.Clear()
-
-        if self.rule == None: return
-        rL = [int(x) for x in self.rule]
-
-        ### draw rule number 
-        font = self.fonts[2]
-        fw = font.GetPixelSize()[0]
-        dc.SetFont(font)
-        texts = ['Rule %i:'%(self.rn)]; coords = [(5,0)]
-        fg = [wx.Colour('#000000')]; bg = [wx.Colour(pBCol)]
-        dc.DrawTextList( texts, coords, fg, bg)
-        lblW = coords[0][0] + fw * (len(texts[0])+1) # width of label
-
-        ### set up for drawing rule boxes
-        dc.SetPen(wx.Pen('#000000', 1))
-        ph = self.pi["rul"]["sz"][1] # panel height
-        m = 2 # margin between outer rectangle
-        lrw = ph # outer rectangle width
-        lrh = int(ph*0.66) # height
-        lc = int(ph/3) # small cube size
-        states = [[1,1,1], [1,1,0],
-                  [1,0,1], [1,0,0],
-                  [0,1,1], [0,1,0],
-                  [0,0,1], [0,0,0]]
-        y = 1
-        ### draw rule boxes
-        for i in range(len(rL)):
-            x = lblW + lrw*i + m*i # starting x-coordinate for this outer rect.
-            dc.SetBrush(wx.Brush(pBCol))
-            dc.DrawRectangle(0+x, y, lrw, lrh) # outer rectangle
-            x += 1
-            ### drawing current cell states
-            for si in range(len(states[i])):
-                if states[i][si] == 0: col = '#ffffff'
-                else: col = '#000000'
-                dc.SetBrush(wx.Brush(col))
-                dc.DrawRectangle(x+lc*si, y, lc, lc)
-            ### drawing next cell state
-            if rL[i] == 0: col = '#ffffff'
-            else: col = '#000000'
-            dc.SetBrush(wx.Brush(col))
-            dc.DrawRectangle(x+lc, y+lc, lc, lc)
-    
-    #-------------------------------------------------------------------
-   
-    def onPaint(self, event):
-        """ Painting CA result.
-
-        Args: event (wx.Event)
-
-        Returns: None
-        """ 
-        if DEBUG: print("CellularAutomata1DFrame.onPaint()")
-
-        evtObj = event.GetEventObject()
-        dc = wx.PaintDC(evtObj)
-        dc.SetBackground(wx.Brush('#cccccc'))
-        dc.Clear()
-        if isinstance(self.caRArr, np.ndarray) == False: return 
-      
-        ### draw CA result
-        arr = self.caRArr
-        arr[arr==0] = 255
-        arr[arr==1] = 0
-        imgArr = np.stack( (arr, arr, arr), axis=2 )
-        img = wx.ImageFromBuffer(imgArr.shape[1], imgArr.shape[0], imgArr)
-        bmp = wx.Bitmap(img) # wx.BitmapFromImage(img)
-        dc.DrawBitmap(bmp, 0, 0)
-    
-    #-------------------------------------------------------------------
-    
-    def showStatusBarMsg(self, txt, delTime=0):
-        """ Show message on status bar
-        """
-        if DEBUG: print("CellularAutomata1DFrame.showStatusBarMsg")
-        if self.timers["sbTimer"] != None:
-            self.timers["sbTimer"].Stop()
-            self.timers["sbTimer"] = None
-        self.statusbar.SetStatusText(txt)
-        if txt == '': bgCol = self.sbBgCol 
-        else: bgCol = '#99ee99'
-        self.statusbar.SetBackgroundColour(bgCol)
-        if txt != '' and delTime != 0:
-            self.timers["sbTimer"] = wx.CallLater(delTime,
-                                                  self.showStatusBarMsg, '')
-
-    #-------------------------------------------------------------------
-
-    def onClose(self, event):
-        """ Close this frame.
-
-        Args: event (wx.Event)
-
-        Returns: None
-        """
-        if DEBUG: print("CellularAutomata1DFrame.onClose()")
-
-        for k in self.timers.keys():
-            if self.timers[k] != None: self.timers[k].Stop()
-        self.Destroy()
-
-    #-------------------------------------------------------------------
+            arr, info = stepper.run(args.rule, args.width,
+                                    args.generations, initL=args.init,
+                                    seed=args.seed, callback=cb)
+        finally:
+            stepper.close()
+    elif args.store != None:
+        from ecaHistory import createHistory
+        hist = createHistory(args.store, args.rule, args.width,
+                             args.generations, initL=args.init,
+                             seed=args.seed)
+        try: printHistoryRun(hist.run(cb))
+        finally: hist.close()
+        return
+    elif args.every != None:
+        from ecaMacro import runMacro
+        t0 = time()
+        arr = runMacro(args.rule, args.width, args.generations-1,
+                       initL=args.init, seed=args.seed, every=args.every)
+        info = dict(rule=args.rule, w=args.width, h=arr.shape[0],
+                    initL=args.init, seed=args.seed, packed=False,
+                    transient=None, period=None, elapsed=time()-t0)
+    elif args.cache != None:
+        from ecaCache import ResultCache
+        arr, info = ResultCache(cacheDir=args.cache).run(
+                            args.rule, args.width, args.generations,
+                            initL=args.init, seed=args.seed,
+                            packed=args.packed, callback=cb)
+    else:
+        arr, info = runECA(args.rule, args.width, args.generations,
+                           initL=args.init, seed=args.seed,
+                           packed=args.packed, callback=cb)
+    if args.output != None: saveResult(args.output, arr, info)
+    if info.get("packed"): density = float(unpackRow(arr, info["w"]).mean())
+    else: density = float(arr.mean())
+    print("Rule %i, %i x %i, init: %s, seed: %s, density: %.4f, %.3f s"%(
+            info["rule"], info["h"], info["w"], info["initL"], info["seed"],
+            density, info["elapsed"]))
+    if info.get("cached", False): print("(from the result cache)")
+    if info["period"] != None:
+        print("Cycle from generation %i, period %i"%(info["transient"],
+                                                     info["period"]))
+
+#-----------------------------------------------------------------------
+
+def cmdResume(args):
+    """ Continue a history file from its last row.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns: None
+    """
+    if DEBUG: print("cmdResume()")
 
-#=======================================================================
+    from ecaHistory import HistoryStore
+    hist = HistoryStore(args.file, "r+")
+    try: printHistoryRun(hist.run())
+    finally: hist.close()
+
+#-----------------------------------------------------------------------
+
+def printHistoryRun(info):
+    """ Print the result of ecaHistory.HistoryStore.run().
 
-class CA1DApp(wx.App):
-    """ Initializing CellularAutomata1D app with CellularAutomata1DFrame.
+    Args:
+        info (dict): Run information.
 
-    Attributes:
-        frame (wx.Frame): CellularAutomata1DFrame frame.
+    Returns: None
     """
-    def OnInit(self):
-        if DEBUG: print("CA1DApp.OnInit()")
-        self.frame = CellularAutomata1DFrame()
-        self.frame.Show()
-        self.SetTopWindow(self.frame)
-        return True
+    print("Rule %i, %i x %i, init: %s, seed: %s, rows %i-%i of %i, %.3f s"%(
+            info["rule"], info["h"], info["w"], info["initL"], info["seed"],
+            info["resumedFrom"], info["rowsDone"], info["h"],
+            info["elapsed"]))
 
-#=======================================================================
+#-----------------------------------------------------------------------
 
-if __name__ == "__main__":
-    app = CA1DApp(redirect = False)
+def positiveInt(s):
+    """ argparse type of an integer >= 1.
+
+    Args:
+        s (str): Argument.
+
+    Returns:
+        (int)
+    """
+    v = int(s)
+    if v < 1: raise argparse.ArgumentTypeError("must be 1 or more: %s"%(s))
+    return v
+
+#-----------------------------------------------------------------------
+
+def parseIntList(s):
+    """ Parse a list of integers such as '0-9,20,30'.
+
+    Args:
+        s (str): Comma separated integers or ranges (inclusive).
+
+    Returns:
+        (list): List of integers.
+    """
+    if DEBUG: print("parseIntList()")
+
+    ret = []
+    for item in s.split(","):
+        if "-" in item:
+            i0, i1 = item.split("-")
+            ret += list(range(int(i0), int(i1)+1))
+        elif item != "":
+            ret.append(int(item))
+    return ret
+
+#-----------------------------------------------------------------------
+
+def cmdSweep(args):
+    """ Run many (rule, seed) combinations over a process pool.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns: None
+    """
+    if DEBUG: print("cmdSweep()")
+
+    from ecaSweep import runSweep
+    if args.seeds == None: seeds = [None]
+    else: seeds = parseIntList(args.seeds)
+    blk, info = runSweep(args.width, args.generations,
+                         rules=parseIntList(args.rules), seeds=seeds,
+                         initL=args.init, fp=args.output, nProc=args.procs,
+                         packed=args.packed, useSymmetry=args.symmetry)
+    print("%i jobs (%i x %i) on %i processes: %.3f s, "%(len(info["jobs"]),
+            info["h"], info["w"], info["nProc"], info["elapsed"]) +
+          "%.0f generations/s, %.3g cells/s"%(info["genPerSec"],
+                                              info["cellsPerSec"]))
+    if args.symmetry:
+        print("%i of %i jobs simulated (symmetry classes)"%(
+                                    info["nSimulated"], len(info["jobs"])))
+    if args.export != None:
+        from ecaExport import exportSweep
+        fps = exportSweep(args.export, blk, info)
+        print("Exported to %s"%(fps[0] if len(fps) == 1 else
+                                "%i files"%(len(fps))))
+
+#-----------------------------------------------------------------------
+
+def cmdDeep(args):
+    """ Evolve a first line for a huge number of generations on an
+    unbounded lattice (HashLife-style engine).
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns: None
+    """
+    if DEBUG: print("cmdDeep()")
+
+    from ecaHashLife import HashLife
+    origin = None
+    if args.init == "center seed": line = None
+    elif args.init.lower() == "random":
+        # a random line fills the output cells
+        line = makeInitLine(args.x1-args.x0, "random", args.seed)
+        origin = args.x0
+    else: line = makeInitLine(len(args.init), args.init)
+    t0 = time()
+    hl = HashLife(args.rule, line, origin)
+    if args.rows == None:
+        hl.setView(args.x0, args.x1, args.t)
+        hl.goTo(args.t)
+        row = hl.getRow(args.x0, args.x1)
+        print((row + ord('0')).tobytes().decode("ascii") + "\n")
+        if args.output != None: np.save(args.output, row)
+    else:
+        gens, hist = hl.getHistory(args.t, args.rows, args.x0, args.x1,
+                                   args.cols)
+        if args.output != None: np.save(args.output, hist)
+    if hl.direct == None: mode = "%i nodes"%(len(hl.nodes))
+    else: mode = "stepped directly (chaotic)"
+    print("Rule %i, generation %i, cells [%i, %i), %s, %.3f s"%(
+            args.rule, args.t, args.x0, args.x1, mode, time()-t0))
+
+#-----------------------------------------------------------------------
+
+def cmdStats(args):
+    """ Run CA keeping only per-generation statistics.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns: None
+    """
+    if DEBUG: print("cmdStats()")
+
+    from ecaStats import runStats, saveStats, Density, BlockEntropy, \
+                         DistinctPatterns, Damage
+    ev = args.every
+    reducers = [Density(ev), BlockEntropy(args.block, ev),
+                DistinctPatterns(args.block, ev)]
+    if args.damage: reducers.append(Damage(args.rule, every=ev))
+    res, spec = runStats(args.rule, args.width, args.generations,
+                         initL=args.init, seed=args.seed, reducers=reducers)
+    if args.output != None: saveStats(args.output, res, spec)
+    print("Rule %i, %i generations x %i, init: %s, seed: %s, %.3f s"%(
+            args.rule, args.generations, args.width, spec["initL"],
+            spec["seed"], spec["elapsed"]))
+    for r in reducers:
+        v = res[r.name]
+        print("  %-10s first %.4g, last %.4g, mean %.4g"%(r.name, v[0],
+                                                          v[-1], v.mean()))
+
+#-----------------------------------------------------------------------
+
+def cmdBench(args):
+    """ Run benchmarks, or compare two sessions of the history.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns: None
+    """
+    if DEBUG: print("cmdBench()")
+
+    import ecaBench
+    if args.action == "run":
+        engines = args.engines.split(",")
+        session = ecaBench.runBenchmarks(args.quick, engines, args.label)
+        ecaBench.appendHistory(args.history, session)
+        print("Saved to %s"%(args.history))
+        return
+    sessions = ecaBench.loadHistory(args.history)
+    try: old, new = sessions[args.old], sessions[args.new]
+    except IndexError:
+        raise SystemExit("%s has %i session(s)"%(args.history,
+                                                 len(sessions)))
+    print("old: %s %s\nnew: %s %s"%(old["time"], old["label"], new["time"],
+                                   new["label"]))
+    rows = ecaBench.compareSessions(old, new, args.threshold)
+    for key, ratio, mRatio, flag in rows:
+        if mRatio == None: m = ""
+        else: m = "memory x%.2f"%(mRatio)
+        print("%-50s time x%.2f %-13s %s"%(key, ratio, m, flag))
+    nReg = len([r for r in rows if r[3] != ""])
+    print("%i regression(s) in %i common benchmarks"%(nReg, len(rows)))
+    if nReg > 0: raise SystemExit(1)
+
+#-----------------------------------------------------------------------
+
+def cmdExport(args):
+    """ Export a history file, or a run computed chunk by chunk.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns: None
+    """
+    if DEBUG: print("cmdExport()")
+
+    import ecaExport
+    t0 = time()
+    if args.history != None:
+        from ecaHistory import HistoryStore
+        hist = HistoryStore(args.history)
+        ecaExport.exportResult(args.output, hist)
+        h, w = hist.rowsDone, hist.meta["w"]
+        hist.close()
+    else:
+        ecaExport.exportRun(args.output, args.rule, args.width,
+                            args.generations, initL=args.init,
+                            seed=args.seed)
+        h, w = args.generations, args.width
+    print("Exported %i x %i to %s (%.0f bytes/row), %.3f s"%(h, w,
+                args.output, os.path.getsize(args.output)/max(1, h),
+                time()-t0))
+
+#-----------------------------------------------------------------------
+
+def cmdGUI(args):
+    """ Start the graphical user interface.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns: None
+    """
+    if DEBUG: print("cmdGUI()")
+
+    from ecaGUI import CA1DApp
+    app = CA1DApp(cacheDir=getattr(args, "cache", None), redirect = False)
     app.MainLoop()
 
+#-----------------------------------------------------------------------
+
+def main(argv=None):
+    """ Command line entry point.
+
+    Args:
+        argv (list, optional): Command line arguments.
+
+    Returns: None
+    """
+    if DEBUG: print("main()")
+
+    parser = argparse.ArgumentParser(
+                description="Elementary cellular automata v.%s"%(__version__))
+    sub = parser.add_subparsers(dest="cmd")
+    p = sub.add_parser("gui", help="start the graphical user interface")
+    p.add_argument("--cache", default=None,
+                   help="directory of the result cache (default: results "
+                        "are only cached in memory)")
+    p = sub.add_parser("run", help="run CA without user interface")
+    p.add_argument("-r", "--rule", type=int, default=124,
+                   help="rule number (0-255 for elementary rules)")
+    p.add_argument("-W", "--width", type=int, default=800)
+    p.add_argument("-g", "--generations", type=int, default=560)
+    p.add_argument("-i", "--init", default="center seed",
+                   help="'center seed', 'random' or a string of 0/1")
+    p.add_argument("-s", "--seed", type=int, default=None,
+                   help="seed for a random initial line")
+    p.add_argument("-o", "--output", default=None,
+                   help="output file (.npy, .npz, .png, .ecarle (see "
+                        "'export') or text)")
+    p.add_argument("--packed", action="store_true",
+                   help="use the bit-packed (64 cells per word) backend")
+    p.add_argument("--every", type=positiveInt, default=None,
+                   help="keep only every N-th generation (macro-step "
+                        "lookup tables)")
+    p.add_argument("--radius", type=int, default=1,
+                   help="neighborhood radius (2r+1 cells); with --colors "
+                        "and --totalistic, the rule number may be of any "
+                        "size")
+    p.add_argument("--colors", type=int, default=2,
+                   help="number of cell states (2-10)")
+    p.add_argument("--totalistic", action="store_true",
+                   help="the new state depends on the sum of the "
+                        "neighborhood")
+    p.add_argument("--unbounded", action="store_true",
+                   help="unbounded lattice (background of 0 cells) "
+                        "instead of a ring; only the active cells are "
+                        "computed")
+    p.add_argument("--threads", type=int, default=None,
+                   help="split each line into segments computed by this "
+                        "many threads (for very wide lines)")
+    p.add_argument("--store", default=None,
+                   help="stream the history into this (bit-packed, "
+                        "memory-mapped) file; resumable with 'resume'")
+    p.add_argument("--cache", default=None,
+                   help="directory of the result cache; a run done before "
+                        "is loaded instead of computed")
+    p.add_argument("--profile", default=None,
+                   help="save per-chunk timings to this file (Chrome trace "
+                        "if it ends with .trace.json, otherwise JSON)")
+    p = sub.add_parser("resume", help="continue an interrupted 'run "
+                                      "--store' history file")
+    p.add_argument("file", help="history file")
+    p = sub.add_parser("sweep", help="run many rules/seeds in parallel")
+    p.add_argument("-r", "--rules", default="0-255",
+                   help="rule numbers, e.g. '0-255' or '30,90,110'")
+    p.add_argument("-W", "--width", type=int, default=800)
+    p.add_argument("-g", "--generations", type=int, default=560)
+    p.add_argument("-i", "--init", default="center seed",
+                   help="'center seed' or 'random'")
+    p.add_argument("-s", "--seeds", default=None,
+                   help="seeds of random initial lines, e.g. '0-99'")
+    p.add_argument("-o", "--output", default=None,
+                   help="output .npy file, shape (jobs, generations, width)")
+    p.add_argument("-j", "--procs", type=int, default=None,
+                   help="number of processes (default: all cores)")
+    p.add_argument("--packed", action="store_true",
+                   help="use the bit-packed (64 cells per word) backend")
+    p.add_argument("--symmetry", action="store_true",
+                   help="derive runs of equivalent rules (reflection/"
+                        "complement) instead of simulating them")
+    p.add_argument("--export", default=None,
+                   help="also export the results: one .npz (packed) or "
+                        ".npy, or one .png/.ecarle per run")
+    p = sub.add_parser("export", help="export a history file or a run "
+                                      "(streamed, chunk by chunk)")
+    p.add_argument("output", help="output file (.png: 1-bit image, "
+                                  ".npz: bit-packed with run information, "
+                                  ".npy: cells (uint8) with run "
+                                  "information in .npy.json, .ecarle: "
+                                  "row-delta stream)")
+    p.add_argument("--history", default=None,
+                   help="history file made with 'run --store'; "
+                        "otherwise the run below is computed")
+    p.add_argument("-r", "--rule", type=int, default=124,
+                   help="rule number (0-255)")
+    p.add_argument("-W", "--width", type=int, default=800)
+    p.add_argument("-g", "--generations", type=int, default=560)
+    p.add_argument("-i", "--init", default="center seed",
+                   help="'center seed', 'random' or a string of 0/1")
+    p.add_argument("-s", "--seed", type=int, default=None,
+                   help="seed for a random initial line")
+    p = sub.add_parser("stats", help="per-generation statistics "
+                                     "without storing the history")
+    p.add_argument("-r", "--rule", type=int, default=110,
+                   help="rule number (0-255)")
+    p.add_argument("-W", "--width", type=int, default=800)
+    p.add_argument("-g", "--generations", type=int, default=10000,
+                   help="number of generations to advance")
+    p.add_argument("-i", "--init", default="random",
+                   help="'center seed', 'random' or a string of 0/1")
+    p.add_argument("-s", "--seed", type=int, default=None,
+                   help="seed for a random initial line")
+    p.add_argument("--every", type=int, default=1,
+                   help="record every N-th generation")
+    p.add_argument("--block", type=int, default=3,
+                   help="block length for entropy and distinct patterns "
+                        "(1-16, at most the width)")
+    p.add_argument("--damage", action="store_true",
+                   help="record damage spreading (Hamming distance to a "
+                        "twin with the center cell flipped)")
+    p.add_argument("-o", "--output", default=None,
+                   help="output .npz file (arrays and run specification)")
+    p = sub.add_parser("bench", help="run benchmarks (headless) or "
+                                     "compare benchmark sessions")
+    p.add_argument("action", choices=["run", "compare"])
+    p.add_argument("--history", default="bench_history.json",
+                   help="JSON file of benchmark sessions")
+    p.add_argument("--quick", action="store_true",
+                   help="smaller sizes (widths 10^3 and 10^5)")
+    p.add_argument("--engines", default="bytes,packed,macro,parallel,"
+                                        "unbounded",
+                   help="comma separated engines to benchmark")
+    p.add_argument("--label", default="", help="note stored with the run")
+    p.add_argument("--old", type=int, default=-2,
+                   help="index of the old session to compare")
+    p.add_argument("--new", type=int, default=-1,
+                   help="index of the new session to compare")
+    p.add_argument("--threshold", type=float, default=0.1,
+                   help="relative slowdown flagged as regression")
+    p = sub.add_parser("deep", help="state after a huge number of "
+                                    "generations (unbounded lattice)")
+    p.add_argument("-r", "--rule", type=int, default=90,
+                   help="rule number (0-255)")
+    p.add_argument("-t", type=int, default=10**12, help="generation")
+    p.add_argument("-i", "--init", default="center seed",
+                   help="'center seed', 'random' (the cells from x0 "
+                        "to x1) or a string of 0/1 (its middle cell is at "
+                        "position 0)")
+    p.add_argument("-s", "--seed", type=int, default=None,
+                   help="seed for a random initial line")
+    p.add_argument("--x0", type=int, default=-40,
+                   help="first cell position of the output")
+    p.add_argument("--x1", type=int, default=41,
+                   help="end (exclusive) cell position of the output")
+    p.add_argument("--rows", type=int, default=None,
+                   help="output a history of this many evenly spaced "
+                        "generations from 0 to t")
+    p.add_argument("--cols", type=int, default=None,
+                   help="downsample history rows to this many columns "
+                        "(densities)")
+    p.add_argument("-o", "--output", default=None, help="output .npy file")
+    args = parser.parse_args(argv)
+    if args.cmd == "run":
+        msg = checkRunArgs(args)
+        if msg != None: parser.error(msg)
+        cmdRun(args)
+        if args.profile != None:
+            from ecaProfile import PROFILER
+            PROFILER.export(args.profile)
+    elif args.cmd == "resume": cmdResume(args)
+    elif args.cmd == "sweep": cmdSweep(args)
+    elif args.cmd == "stats":
+        if not 1 <= args.block <= min(16, args.width):
+            parser.error("--block must be 1-%i"%(min(16, args.width)))
+        cmdStats(args)
+    elif args.cmd == "deep": cmdDeep(args)
+    elif args.cmd == "bench": cmdBench(args)
+    elif args.cmd == "export": cmdExport(args)
+    else: cmdGUI(args)
+
+#=======================================================================
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+# coding: UTF-8
+""" Benchmarks of the engines, the render path and end-to-end runs.
+
+Each benchmark records its best time over a few repeats, throughput
+(generations and cells per second) and the memory high-water mark of
+one extra run (tracemalloc; NumPy reports its array allocations to it).
+A benchmark session is appended to a JSON history file, and two
+sessions of the history can be compared to flag regressions.
+Nothing here needs wxPython or a display; the render benchmarks cover
+the NumPy part of the paint path (tiles and RGB conversion).
+
+Dependency:
+    Numpy (1.17)
+
+------------------------------------------------------------------------
+Copyright (C) 2019 Jinook Oh, W. Tecumseh Fitch
+- Contact: jinook.oh@univie.ac.at, tecumseh.fitch@univie.ac.at
+
+This program is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your
+option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program.  If not, see <http://www.gnu.org/licenses/>.
+------------------------------------------------------------------------
+"""
+
+import os, json, platform, tracemalloc
+from time import perf_counter, strftime
+
+import numpy as np
+
+from ecaEngine import __version__, runECA, runUnbounded
+from ecaMacro import runMacro
+from ecaParallel import ParallelStepper
+from ecaRender import Pyramid, toRGB
+
+DEBUG = False
+# example rules of Wolfram's classes 1-4
+RULES = {1: 32, 2: 108, 3: 30, 4: 110}
+WIDTHS = (10**3, 10**5, 10**7)
+INITS = ("center seed", "random")
+CELL_BUDGET = 2*10**7 # cells per benchmark run (sets generations)
+ENGINES = ("bytes", "packed", "macro", "parallel", "unbounded")
+
+#=======================================================================
+
+def engineFunc(name, stepper=None):
+    """ Function running an engine as f(ruleNum, w, h, initL, seed).
+
+    Args:
+        name (str): One of ENGINES.
+        stepper (ecaParallel.ParallelStepper): Pool for 'parallel'.
+
+    Returns:
+        (function)
+    """
+    if name == "bytes":
+        return lambda rn, w, h, i, s: runECA(rn, w, h, i, s)
+    if name == "packed":
+        return lambda rn, w, h, i, s: runECA(rn, w, h, i, s, packed=True)
+    if name == "macro":
+        return lambda rn, w, h, i, s: runMacro(rn, w, h-1, i, s)
+    if name == "parallel":
+        return lambda rn, w, h, i, s: stepper.run(rn, w, h, i, s,
+                                                  chunkRows=h)
+    if name == "unbounded":
+        return lambda rn, w, h, i, s: runUnbounded(rn, w, h, i, s,
+                                                   chunkRows=h)
+    raise ValueError("Unknown engine: %s"%(name))
+
+#-----------------------------------------------------------------------
+
+def measure(func, repeat=3, memory=True):
+    """ Best time of a function and its memory high-water mark.
+
+    Args:
+        func (function): Called without arguments.
+        repeat (int): Number of timed calls.
+        memory (bool): Make one more call under tracemalloc.
+
+    Returns:
+        sec (float): Best time in seconds.
+        peak (int or None): Peak traced bytes during a call.
+    """
+    best = None
+    for i in range(repeat):
+        t0 = perf_counter()
+        func()
+        t = perf_counter() - t0
+        if best == None or t < best: best = t
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+#-----------------------------------------------------------------------
+
+def benchEngines(engines=ENGINES, widths=WIDTHS, rules=RULES, inits=INITS,
+                 cellBudget=CELL_BUDGET, maxGen=1000, repeat=3, log=print):
+    """ Generations per second of engines.
+
+    Args:
+        engines (iterable): Engine names (see ENGINES).
+        widths (iterable): Line widths.
+        rules (dict): Class -> rule number.
+        inits (iterable): First line specs.
+        cellBudget (int): Cells per run; generations are
+            max(4, min(maxGen, cellBudget // width)).
+        maxGen (int): Maximum number of generations.
+        repeat (int): Timed calls per benchmark.
+        log (function, optional): Called with a line per benchmark.
+
+    Returns:
+        results (dict): Benchmark key -> metrics.
+    """
+    if DEBUG: print("benchEngines()")
+
+    results = {}
+    stepper = None
+    if "parallel" in engines: stepper = ParallelStepper()
+    try:
+        for eng in engines:
+            f = engineFunc(eng, stepper)
+            for w in widths:
+                h = max(4, min(maxGen, cellBudget // w))
+                for cls in sorted(rules):
+                    rn = rules[cls]
+                    for initL in inits:
+                        sec, peak = measure(lambda: f(rn, w, h, initL, 1),
+                                            repeat)
+                        key = "engine=%s rule=%i w=%i init=%s"%(
+                                    eng, rn, w, initL.replace(" ", "-"))
+                        results[key] = dict(sec=sec, peakBytes=peak,
+                                            gen=h-1, cls=cls,
+                                            genPerSec=(h-1)/sec,
+                                            cellsPerSec=(h-1)*w/sec)
+                        if log != None: log(fmtResult(key, results[key]))
+    finally:
+        if stepper != None: stepper.close()
+    return results
+
+#-----------------------------------------------------------------------
+
+def benchRender(sizes=((560, 800), (4096, 4096)), repeat=3, log=print):
+    """ Array-to-image conversion of the render path.
+
+    Args:
+        sizes (iterable): (h, w) of the result arrays.
+        repeat (int): Timed calls per benchmark.
+        log (function, optional): Called with a line per benchmark.
+
+    Returns:
+        results (dict): Benchmark key -> metrics.
+    """
+    if DEBUG: print("benchRender()")
+
+    results = {}
+    for h, w in sizes:
+        arr, _ = runECA(30, w, h, "random", 1)
+        pyr = Pyramid(arr)
+        lvl = pyr.nLevels - 1 # whole result in one tile
+        nTy = (h + pyr.tileSz - 1) // pyr.tileSz
+        nTx = (w + pyr.tileSz - 1) // pyr.tileSz
+        def allTiles(): # level 0, as drawn at 100% zoom
+            for ty in range(nTy):
+                for tx in range(nTx): pyr.tileRGB(0, ty, tx)
+        benches = [("toRGB", lambda: toRGB(arr)),
+                   ("pyramid", lambda: Pyramid(arr)),
+                   ("tiles", allTiles),
+                   ("overview", lambda: pyr.tileRGB(lvl, 0, 0))]
+        for name, f in benches:
+            sec, peak = measure(f, repeat)
+            key = "render=%s size=%ix%i"%(name, h, w)
+            results[key] = dict(sec=sec, peakBytes=peak,
+                                cellsPerSec=h*w/sec)
+            if log != None: log(fmtResult(key, results[key]))
+    return results
+
+#-----------------------------------------------------------------------
+
+def benchEndToEnd(sizes=((560, 800), (10000, 10000)), repeat=3, log=print):
+    """ Run, levels of detail and the first screen of tiles, as after
+    clicking Run in the user interface.
+
+    Args:
+        sizes (iterable): (h, w) of the runs.
+        repeat (int): Timed calls per benchmark.
+        log (function, optional): Called with a line per benchmark.
+
+    Returns:
+        results (dict): Benchmark key -> metrics.
+    """
+    if DEBUG: print("benchEndToEnd()")
+
+    results = {}
+    for h, w in sizes:
+        def f():
+            arr, _ = runECA(110, w, h, "random", 1)
+            pyr = Pyramid(arr)
+            lvl = pyr.nLevels - 1
+            for ty in range(4):
+                for tx in range(4): pyr.tileRGB(lvl, ty, tx)
+        sec, peak = measure(f, repeat)
+        key = "e2e rule=110 size=%ix%i"%(h, w)
+        results[key] = dict(sec=sec, peakBytes=peak, genPerSec=(h-1)/sec,
+                            cellsPerSec=(h-1)*w/sec)
+        if log != None: log(fmtResult(key, results[key]))
+    return results
+
+#-----------------------------------------------------------------------
+
+def fmtResult(key, m):
+    """ One line describing a benchmark result.
+    """
+    s = "%-50s %9.4f s"%(key, m["sec"])
+    if "genPerSec" in m: s += " %11.4g gen/s"%(m["genPerSec"])
+    s += " %11.4g cells/s"%(m["cellsPerSec"])
+    if m.get("peakBytes") != None:
+        s += " %8.1f MB"%(m["peakBytes"] / 2**20)
+    return s
+
+#-----------------------------------------------------------------------
+
+def runBenchmarks(quick=False, engines=ENGINES, label="", log=print):
+    """ Run all benchmarks.
+
+    Args:
+        quick (bool): Smaller widths, sizes and budget (seconds).
+        engines (iterable): Engine names (see ENGINES).
+        label (str): Free text stored with the session.
+        log (function, optional): Called with a line per benchmark.
+
+    Returns:
+        session (dict): Time, machine, label and results.
+    """
+    if DEBUG: print("runBenchmarks()")
+
+    if quick:
+        res = benchEngines(engines, (10**3, 10**5), cellBudget=2*10**6,
+                           repeat=2, log=log)
+        res.update(benchRender(((560, 800), (2048, 2048)), 2, log))
+        res.update(benchEndToEnd(((560, 800),), 2, log))
+    else:
+        res = benchEngines(engines, log=log)
+        res.update(benchRender(log=log))
+        res.update(benchEndToEnd(log=log))
+    machine = dict(platform=platform.platform(),
+                   python=platform.python_version(), numpy=np.__version__,
+                   cpus=os.cpu_count(), version=__version__)
+    return dict(time=strftime("%Y-%m-%d %H:%M:%S"), label=label,
+                quick=quick, machine=machine, results=res)
+
+#=======================================================================
+
+def loadHistory(fp):
+    """ Load a benchmark history.
+
+    Args:
+        fp (str): JSON file path.
+
+    Returns:
+        (list): Sessions, oldest first; empty if the file does not exist.
+    """
+    if not os.path.isfile(fp): return []
+    with open(fp) as f: return json.load(f)["sessions"]
+
+#-----------------------------------------------------------------------
+
+def appendHistory(fp, session):
+    """ Append a session to a benchmark history.
+
+    Args:
+        fp (str): JSON file path.
+        session (dict): Output of runBenchmarks().
+
+    Returns: None
+    """
+    if DEBUG: print("appendHistory()")
+
+    sessions = loadHistory(fp)
+    sessions.append(session)
+    with open(fp + ".tmp", "w") as f:
+        json.dump(dict(sessions=sessions), f, indent=1, sort_keys=True)
+    os.replace(fp + ".tmp", fp)
+
+#-----------------------------------------------------------------------
+
+def compareSessions(old, new, threshold=0.1, memThreshold=0.2,
+                    minDelta=0.002):
+    """ Compare two sessions on their common benchmarks.
+
+    Args:
+        old, new (dict): Sessions (see runBenchmarks()).
+        threshold (float): Relative slowdown flagged as regression.
+        minDelta (float): Slowdowns smaller than this many seconds are
+            not flagged (timer noise of very short benchmarks).
+        memThreshold (float): Relative growth of the memory high-water
+            mark flagged as regression.
+
+    Returns:
+        rows (list): (key, time ratio new/old, memory ratio or None,
+            flag) for each common benchmark; flag is '' or 'SLOWER' and/or
+            'MEMORY'.
+    """
+    if DEBUG: print("compareSessions()")
+
+    rows = []
+    for key in sorted(set(old["results"]) & set(new["results"])):
+        a, b = old["results"][key], new["results"][key]
+        ratio = b["sec"] / max(a["sec"], 1e-12)
+        mRatio = None
+        if a.get("peakBytes") and b.get("peakBytes") != None:
+            mRatio = b["peakBytes"] / a["peakBytes"]
+        flags = []
+        if ratio > 1 + threshold and b["sec"] - a["sec"] >= minDelta:
+            flags.append("SLOWER")
+        if mRatio != None and mRatio > 1 + memThreshold:
+            flags.append("MEMORY")
+        rows.append((key, ratio, mRatio, " ".join(flags)))
+    return rows
+
+#=======================================================================
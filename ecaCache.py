@@ -0,0 +1,264 @@
+# coding: UTF-8
+""" Cache of CA results keyed by run specification.
+
+A run is fully specified by (rule, width, generations, initial line,
+seed, backend), so its result is stored under the SHA-1 of that
+specification: in memory and, optionally, as .npy/.json files in a
+directory shared between sessions. Both levels are bounded in bytes
+and evict the least recently used results.
+
+Dependency:
+    Numpy (1.17)
+
+------------------------------------------------------------------------
+Copyright (C) 2019 Jinook Oh, W. Tecumseh Fitch
+- Contact: jinook.oh@univie.ac.at, tecumseh.fitch@univie.ac.at
+
+This program is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your
+option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program.  If not, see <http://www.gnu.org/licenses/>.
+------------------------------------------------------------------------
+"""
+
+import os, json, hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from ecaEngine import __version__, makeInitLine, runECA
+
+DEBUG = False
+
+#=======================================================================
+
+def runSpec(ruleNum, w, h, initL="center seed", seed=None, packed=False,
+            boundary="periodic"):
+    """ Specification of a run, as used for the cache key.
+
+    Args:
+        ruleNum (int): Rule number (0-255).
+        w (int): Width of each line.
+        h (int): Number of generations.
+        initL (str or array-like): See ecaEngine.makeInitLine().
+        seed (int, optional): Seed for a random first line.
+        packed (bool): Bit-packed backend.
+        boundary (str): 'periodic' or 'unbounded' (see
+            ecaEngine.runUnbounded()).
+
+    Returns:
+        spec (dict): Specification; a custom first line is represented
+            by the SHA-1 of its packed bits, and the seed is None
+            unless the first line is random.
+    """
+    if isinstance(initL, str):
+        initSpec = initL.lower()
+    else:
+        line = makeInitLine(w, initL)
+        initSpec = "custom:" + hashlib.sha1(np.packbits(line)).hexdigest()
+    if initSpec != "random": seed = None
+    return dict(rule=ruleNum, w=w, h=h, initL=initSpec, seed=seed,
+                packed=packed, boundary=boundary, version=__version__)
+
+#-----------------------------------------------------------------------
+
+def isCacheable(spec):
+    """ Whether a run is reproducible from its specification; a random
+    first line without a seed is different in every run.
+
+    Args:
+        spec (dict): Output of runSpec().
+
+    Returns:
+        (bool)
+    """
+    return not (spec["initL"] == "random" and spec["seed"] == None)
+
+#-----------------------------------------------------------------------
+
+def specKey(spec):
+    """ Content address of a run specification.
+
+    Args:
+        spec (dict): Output of runSpec().
+
+    Returns:
+        (str): Hexadecimal SHA-1 digest.
+    """
+    b = json.dumps(spec, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(b).hexdigest()
+
+#=======================================================================
+
+class ResultCache:
+    """ Two-level (memory and disk) LRU cache of CA results.
+    Returned arrays are shared with the cache and should not be
+    modified.
+
+    Attributes:
+        maxBytes (int): Maximum bytes of results in memory.
+        cacheDir (str): Directory of cached files; None for memory only.
+        maxDiskBytes (int): Maximum bytes of files in cacheDir.
+        hits (int): Results found in memory.
+        diskHits (int): Results loaded from cacheDir.
+        misses (int): Results not found.
+    """
+    def __init__(self, maxBytes=2**28, cacheDir=None, maxDiskBytes=2**30):
+        if DEBUG: print("ResultCache.__init__()")
+
+        self.maxBytes = maxBytes
+        self.cacheDir = cacheDir
+        self.maxDiskBytes = maxDiskBytes
+        self.hits = 0
+        self.diskHits = 0
+        self.misses = 0
+        self.mem = OrderedDict() # key -> (arr, info)
+        self.memBytes = 0
+        if cacheDir != None and not os.path.isdir(cacheDir):
+            os.makedirs(cacheDir)
+
+    #-------------------------------------------------------------------
+
+    def get(self, spec):
+        """ Look up a result.
+
+        Args:
+            spec (dict): Output of runSpec().
+
+        Returns:
+            (tuple or None): (arr, info) or None when not cached (always
+                for specifications that are not cacheable).
+        """
+        if DEBUG: print("ResultCache.get()")
+
+        if not isCacheable(spec): return None
+        key = specKey(spec)
+        if key in self.mem:
+            self.hits += 1
+            self.mem.move_to_end(key)
+            return self.mem[key]
+        if self.cacheDir != None:
+            fp = os.path.join(self.cacheDir, key)
+            try:
+                arr = np.load(fp + ".npy")
+                with open(fp + ".json") as f: info = json.load(f)
+            except (OSError, ValueError):
+                pass
+            else:
+                for ext in (".npy", ".json"): os.utime(fp + ext) # recency
+                self.diskHits += 1
+                self._putMem(key, arr, info)
+                return arr, info
+        self.misses += 1
+        return None
+
+    #-------------------------------------------------------------------
+
+    def put(self, spec, arr, info):
+        """ Store a result (nothing is stored for specifications that are
+        not cacheable).
+
+        Args:
+            spec (dict): Output of runSpec().
+            arr (numpy.ndarray): Result array.
+            info (dict): Run information.
+
+        Returns: None
+        """
+        if DEBUG: print("ResultCache.put()")
+
+        if not isCacheable(spec): return
+        key = specKey(spec)
+        self._putMem(key, arr, info)
+        if self.cacheDir == None or arr.nbytes > self.maxDiskBytes: return
+        fp = os.path.join(self.cacheDir, key)
+        with open(fp + ".tmp.npy", "wb") as f: np.save(f, arr)
+        with open(fp + ".tmp.json", "w") as f: json.dump(info, f)
+        # rename, so that other sessions never read a partial file
+        os.replace(fp + ".tmp.json", fp + ".json")
+        os.replace(fp + ".tmp.npy", fp + ".npy")
+        self._evictDisk()
+
+    #-------------------------------------------------------------------
+
+    def _putMem(self, key, arr, info):
+        """ Store a result in memory, evicting old ones.
+        """
+        if arr.nbytes > self.maxBytes: return
+        if key in self.mem: self.memBytes -= self.mem.pop(key)[0].nbytes
+        self.mem[key] = (arr, info)
+        self.memBytes += arr.nbytes
+        while self.memBytes > self.maxBytes:
+            _, (a, _) = self.mem.popitem(last=False)
+            self.memBytes -= a.nbytes
+
+    #-------------------------------------------------------------------
+
+    def _evictDisk(self):
+        """ Remove the least recently used files beyond maxDiskBytes.
+        """
+        files = []
+        total = 0
+        for fn in os.listdir(self.cacheDir):
+            if not fn.endswith(".npy") or ".tmp" in fn: continue
+            fp = os.path.join(self.cacheDir, fn)
+            try: st = os.stat(fp)
+            except OSError: continue
+            files.append((st.st_mtime, st.st_size, fp))
+            total += st.st_size
+        files.sort()
+        for _, sz, fp in files:
+            if total <= self.maxDiskBytes: break
+            for p in (fp, fp[:-4] + ".json"):
+                try: os.remove(p)
+                except OSError: pass
+            total -= sz
+
+    #-------------------------------------------------------------------
+
+    def run(self, ruleNum, w, h, initL="center seed", seed=None,
+            packed=False, **kwargs):
+        """ Get a result from the cache or compute (and cache) it.
+
+        Args:
+            ruleNum, w, h, initL, seed, packed: See runSpec().
+            kwargs: Other arguments of ecaEngine.runECA().
+
+        Returns:
+            arr (numpy.ndarray): Result array.
+            info (dict): Run information; 'cached' is True when the
+                result came from the cache.
+        """
+        if DEBUG: print("ResultCache.run()")
+
+        spec = runSpec(ruleNum, w, h, initL, seed, packed)
+        ret = self.get(spec)
+        if ret != None: return ret[0], dict(ret[1], cached=True)
+        arr, info = runECA(ruleNum, w, h, initL, seed, packed=packed,
+                           **kwargs)
+        if not info["cancelled"]: self.put(spec, arr, info)
+        return arr, dict(info, cached=False)
+
+    #-------------------------------------------------------------------
+
+    def stats(self):
+        """ Counters and sizes of the cache.
+
+        Args: None
+
+        Returns:
+            (dict): hits, diskHits, misses, entries and memBytes.
+        """
+        return dict(hits=self.hits, diskHits=self.diskHits,
+                    misses=self.misses, entries=len(self.mem),
+                    memBytes=self.memBytes)
+
+#=======================================================================
@@ -0,0 +1,446 @@
+# coding: UTF-8
+""" Simulation engine of elementary cellular automata (Wolfram code).
+
+This module does not import wxPython; it can be used on machines
+without a display. See eca.py for the command-line interface.
+
+Dependency:
+    Numpy (1.17)
+
+------------------------------------------------------------------------
+Copyright (C) 2019 Jinook Oh, W. Tecumseh Fitch 
+- Contact: jinook.oh@univie.ac.at, tecumseh.fitch@univie.ac.at
+
+This program is free software: you can redistribute it and/or modify it 
+under the terms of the GNU General Public License as published by the 
+Free Software Foundation, either version 3 of the License, or (at your 
+option) any later version.
+
+This program is distributed in the hope that it will be useful, but 
+WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License along 
+with this program.  If not, see <http://www.gnu.org/licenses/>.
+------------------------------------------------------------------------
+"""
+
+from time import time
+
+import numpy as np
+
+DEBUG = False
+__version__ = "0.1"
+
+#=======================================================================
+
+def ruleLUT(ruleNum):
+    """ Make a lookup table of a Wolfram rule.
+
+    Args:
+        ruleNum (int): Rule number (among Wolfram's rules, 0-255).
+
+    Returns:
+        lut (numpy.ndarray): 8 values (uint8); lut[4*left+2*self+right]
+            is the next state of the cell.
+    """
+    if DEBUG: print("ruleLUT()")
+
+    return ((ruleNum >> np.arange(8)) & 1).astype(np.uint8)
+
+#-----------------------------------------------------------------------
+
+def stepECA(line, lut, out, idx=None):
+    """ Compute the next generation of a line (periodic boundary).
+    The 3-bit neighborhood index is built with shifted views of the line,
+    then mapped through the rule lookup table.
+
+    Args:
+        line (numpy.ndarray): Current line (uint8, 0 or 1), or lines
+            stacked along the leading axes (space is the last axis).
+        lut (numpy.ndarray): Rule lookup table from ruleLUT().
+        out (numpy.ndarray): Array (uint8) to write the next line.
+            Must not share memory with 'line'.
+        idx (numpy.ndarray, optional): Buffer (uint8) for the neighborhood
+            index, same shape as 'line'.
+
+    Returns:
+        out (numpy.ndarray): The next line.
+    """
+    if idx is None: idx = np.empty_like(line)
+    # left neighbor
+    idx[..., 1:] = line[..., :-1]
+    idx[..., 0] = line[..., -1]
+    idx <<= 1
+    # self
+    idx |= line
+    idx <<= 1
+    # right neighbor
+    idx[..., :-1] |= line[..., 1:]
+    idx[..., -1] |= line[..., 0]
+    np.take(lut, idx, out=out)
+    return out
+
+#-----------------------------------------------------------------------
+
+def packRow(line):
+    """ Pack line(s) of cells into 64-bit words.
+    Cell x is stored in bit (x % 64) of word (x // 64).
+
+    Args:
+        line (numpy.ndarray): Line (uint8, 0 or 1) or 2D array of lines.
+
+    Returns:
+        words (numpy.ndarray): Packed line(s) (uint64),
+            last axis length is ceil(width/64).
+    """
+    if DEBUG: print("packRow()")
+
+    line = np.asarray(line, np.uint8)
+    w = line.shape[-1]
+    nW = (w + 63) // 64 # number of words
+    b = np.packbits(line, axis=-1, bitorder='little')
+    buf = np.zeros(line.shape[:-1] + (nW*8,), np.uint8)
+    buf[..., :b.shape[-1]] = b
+    return buf.view('<u8').astype(np.uint64, copy=False)
+
+#-----------------------------------------------------------------------
+
+def unpackRow(words, w):
+    """ Unpack line(s) packed with packRow().
+
+    Args:
+        words (numpy.ndarray): Packed line(s) (uint64).
+        w (int): Width of each line.
+
+    Returns:
+        line (numpy.ndarray): Unpacked line(s) (uint8, 0 or 1).
+    """
+    if DEBUG: print("unpackRow()")
+
+    b = np.ascontiguousarray(words, '<u8').view(np.uint8)
+    return np.unpackbits(b, axis=-1, count=w, bitorder='little')
+
+#-----------------------------------------------------------------------
+
+def ruleFormula(ruleNum):
+    """ Boolean formula of a Wolfram rule for word-wide evaluation.
+    The formula is a XOR of AND-terms over the left (L), self (C) and
+    right (R) neighbor words. Candidates are the algebraic normal form
+    and the sum of (mutually exclusive) minterms of the rule or of its
+    complement; the one with the fewest operations is returned.
+
+    Args:
+        ruleNum (int): Rule number (among Wolfram's rules, 0-255).
+
+    Returns:
+        inv (bool): Whether the result of XOR of terms should be inverted.
+        terms (list): List of terms. Each term is a list of
+            (variable, negated) tuples where variable is 2 (L), 1 (C) or
+            0 (R). An empty term means constant 1.
+    """
+    if DEBUG: print("ruleFormula()")
+
+    tt = [(ruleNum >> i) & 1 for i in range(8)] # truth table
+    ### algebraic normal form (Moebius transform of the truth table)
+    anf = list(tt)
+    for b in range(3):
+        for m in range(8):
+            if m & (1<<b): anf[m] ^= anf[m ^ (1<<b)]
+    cands = []
+    terms = [[(b, False) for b in range(3) if m & (1<<b)]
+                for m in range(8) if anf[m]]
+    cands.append((False, terms))
+    ### minterms of the rule and of its complement
+    for inv in (False, True):
+        terms = [[(b, not (i>>b)&1) for b in range(3)]
+                    for i in range(8) if tt[i] != inv]
+        cands.append((inv, terms))
+    def nOps(cand):
+        inv, terms = cand
+        n = int(inv)
+        for t in terms: n += 1 + sum([1+int(neg) for (b, neg) in t])
+        return n
+    return min(cands, key=nOps)
+
+#-----------------------------------------------------------------------
+
+def stepPacked(words, w, ruleNum, out=None, formula=None):
+    """ Compute the next generation of packed line(s) (periodic boundary)
+    with word-wide bitwise operations.
+
+    Args:
+        words (numpy.ndarray): Packed line(s) (uint64) from packRow().
+        w (int): Width of each line.
+        ruleNum (int): Rule number (among Wolfram's rules, 0-255).
+        out (numpy.ndarray, optional): Array (uint64) to write the next
+            line(s).
+        formula (tuple, optional): Result of ruleFormula(ruleNum).
+
+    Returns:
+        out (numpy.ndarray): The next line(s), packed.
+    """
+    if formula is None: formula = ruleFormula(ruleNum)
+    one = np.uint64(1)
+    last = np.uint64((w-1) % 64) # bit of the last cell in the last word
+    ### left neighbors; shift toward higher bits with carry
+    L = words << one
+    L[..., 1:] |= words[..., :-1] >> np.uint64(63)
+    L[..., 0] |= (words[..., -1] >> last) & one
+    ### right neighbors; shift toward lower bits with carry
+    R = words >> one
+    R[..., :-1] |= words[..., 1:] << np.uint64(63)
+    R[..., -1] |= (words[..., 0] & one) << last
+    v = (R, words, L)
+    ### evaluate the rule formula
+    inv, terms = formula
+    acc = np.zeros_like(words)
+    for term in terms:
+        t = None
+        for (b, neg) in term:
+            x = ~v[b] if neg else v[b]
+            t = x if t is None else t & x
+        if t is None: t = ~np.zeros_like(words)
+        acc ^= t
+    if inv: acc = ~acc
+    acc[..., -1] &= np.uint64((1 << (int(last)+1)) - 1) # clear unused bits
+    if out is None: return acc
+    out[...] = acc
+    return out
+
+#-----------------------------------------------------------------------
+
+def makeInitLine(w, initL="center seed", seed=None, k=2):
+    """ Make the first line.
+
+    Args:
+        w (int): Width of the line.
+        initL (str or array-like): 'center seed', 'random',
+            a string of '0'/'1' characters (digits below k) or an array
+            of cell states.
+        seed (int, optional): Seed for the random number generator,
+            used when initL is 'random'.
+        k (int): Number of cell states (colors).
+
+    Returns:
+        line (numpy.ndarray): The first line (uint8, 0 or 1).
+    """
+    if DEBUG: print("makeInitLine()")
+
+    if isinstance(initL, str):
+        initL = initL.lower()
+        if initL == 'center seed':
+            line = np.zeros(w, np.uint8)
+            line[int(w/2)] = 1
+        elif initL == 'random':
+            rng = np.random.default_rng(seed)
+            line = rng.integers(0, k, w, dtype=np.uint8)
+        elif set(initL) <= set('0123456789'[:k]):
+            line = np.frombuffer(initL.encode('ascii'), np.uint8) - ord('0')
+        else:
+            raise ValueError("Unknown initial line: %s"%(initL))
+    else:
+        line = np.asarray(initL, np.uint8)
+    if line.shape != (w,):
+        raise ValueError("Initial line length (%i) != width (%i)"%(
+                                                          line.size, w))
+    return line
+
+#-----------------------------------------------------------------------
+
+def fillCycle(out, transient, period, row):
+    """ Fill rows from 'row' to the end of 'out' by repeating a cycle.
+    Rows [transient, row) must already hold whole periods of the cycle.
+    The copied block doubles every iteration, so the number of copies is
+    logarithmic in the number of rows.
+
+    Args:
+        out (numpy.ndarray): Result array.
+        transient (int): First row of the cycle.
+        period (int): Period of the cycle.
+        row (int): First row to fill; (row - transient) % period == 0.
+
+    Returns: None
+    """
+    if DEBUG: print("fillCycle()")
+
+    h = out.shape[0]
+    while row < h:
+        n = min(row - transient, h - row)
+        out[row:row+n] = out[transient:transient+n]
+        row += n
+
+#-----------------------------------------------------------------------
+
+def runECA(ruleNum, w, h, initL="center seed", seed=None, out=None,
+           packed=False, callback=None, chunkRows=256, detectCycle=True,
+           cancel=None):
+    """ Run an elementary cellular automaton.
+
+    Args:
+        ruleNum (int): Rule number (among Wolfram's rules, 0-255).
+        w (int): Width of each line.
+        h (int): Number of generations (including the first line).
+        initL (str or array-like): The first line; see makeInitLine().
+        seed (int, optional): Seed for a random first line.
+        out (numpy.ndarray, optional): Result array to fill; shape (h, w)
+            uint8, or (h, ceil(w/64)) uint64 when packed.
+        packed (bool): Use the bit-packed backend.
+        callback (function, optional): Called as callback(row0, row1, out)
+            after rows [row0, row1) were computed.
+        chunkRows (int): Number of rows between callbacks.
+        detectCycle (bool): Keep a 64-bit hash of every generation to
+            detect the first repeated state (a hash match is confirmed
+            by comparing the rows); the rest of the result is then
+            filled by repeating the cycle instead of simulating.
+        cancel (threading.Event, optional): Cancellation token, checked
+            between chunks of rows; the run stops when it is set.
+
+    Returns:
+        out (numpy.ndarray): Result array.
+        info (dict): Run specification, elapsed time, 'transient'
+            (first row of the cycle) and 'period' (both None if no cycle
+            was found within h generations or detectCycle is False),
+            'cancelled' and 'rowsDone' (number of computed rows).
+    """
+    if DEBUG: print("runECA()")
+
+    t0 = time()
+    line = makeInitLine(w, initL, seed)
+    if packed:
+        nW = (w + 63) // 64
+        if out is None: out = np.zeros((h, nW), np.uint64)
+        out[0] = packRow(line)
+        formula = ruleFormula(ruleNum)
+        step = lambda r: stepPacked(out[r-1], w, ruleNum, out[r], formula)
+    else:
+        if out is None: out = np.zeros((h, w), np.uint8)
+        out[0] = line
+        lut = ruleLUT(ruleNum)
+        idx = np.empty(w, np.uint8) # buffer for neighborhood index
+        step = lambda r: stepECA(out[r-1], lut, out[r], idx)
+    # 64-bit hash of a generation -> row (or list of rows on collision);
+    # the rows themselves are only kept in 'out'
+    key = lambda r: hash(out[r].tobytes())
+    if detectCycle: seen = {key(0): 0}
+    transient = None
+    period = None
+    row0 = 0
+    cancelled = False
+    while row0 < h:
+        if cancel != None and cancel.is_set():
+            cancelled = True
+            break
+        row1 = min(h, row0 + chunkRows)
+        for row in range(max(1, row0), row1):
+            step(row)
+            if detectCycle:
+                k = key(row)
+                hit = seen.get(k)
+                if hit == None:
+                    seen[k] = row
+                    continue
+                if not isinstance(hit, list): hit = [hit]
+                for r in hit:
+                    if np.array_equal(out[r], out[row]):
+                        transient = r
+                        break
+                if transient != None:
+                    period = row - transient
+                    break
+                seen[k] = hit + [row] # hash collision
+        if period != None:
+            fillCycle(out, transient, period, row)
+            row1 = h
+            detectCycle = False
+        if callback != None: callback(row0, row1, out)
+        row0 = row1
+    if isinstance(initL, str): initSpec = initL.lower()
+    else: initSpec = 'custom'
+    info = dict(rule=ruleNum, w=w, h=h, initL=initSpec, seed=seed,
+                packed=packed, transient=transient, period=period,
+                cancelled=cancelled, rowsDone=row0, elapsed=time()-t0)
+    return out, info
+
+#-----------------------------------------------------------------------
+
+def runUnbounded(ruleNum, w, h, initL="center seed", seed=None, out=None,
+                 callback=None, chunkRows=256, cancel=None):
+    """ Run an elementary cellular automaton on an unbounded lattice.
+    The first line is placed in a background of 0 cells; only the
+    window of cells differing from the background (which itself
+    alternates for rules mapping 000 to 1) is computed, growing by at
+    most one cell on each side per generation. Cells that can no longer
+    influence the shown columns within the remaining generations are
+    dropped, so the cost is bounded by the light cone of the view.
+
+    Args:
+        ruleNum (int): Rule number (among Wolfram's rules, 0-255).
+        w (int): Width of the shown columns (and of the first line).
+        h (int): Number of generations (including the first line).
+        initL (str or array-like): The first line; see makeInitLine().
+        seed (int, optional): Seed for a random first line.
+        out (numpy.ndarray, optional): Result array (h, w) uint8.
+        callback (function, optional): See runECA().
+        chunkRows (int): Number of rows between callbacks.
+        cancel (threading.Event, optional): See runECA().
+
+    Returns:
+        out (numpy.ndarray): Columns [0, w) of the unbounded evolution.
+        info (dict): As runECA() returns, with 'boundary', 'window'
+            (final computed window [x0, x1)) and 'cellsComputed'.
+    """
+    if DEBUG: print("runUnbounded()")
+
+    t0 = time()
+    line = makeInitLine(w, initL, seed)
+    lut = ruleLUT(ruleNum)
+    if out is None: out = np.zeros((h, w), np.uint8)
+    out[0] = line
+    bg = 0 # background state
+    nz = np.flatnonzero(line)
+    if nz.size > 0: x0 = int(nz[0]); cur = line[nz[0]:nz[-1]+1].copy()
+    else: x0 = 0; cur = line[:0].copy()
+    nCells = 0
+    row0 = 0
+    cancelled = False
+    while row0 < h:
+        if cancel != None and cancel.is_set():
+            cancelled = True
+            break
+        row1 = min(h, row0 + chunkRows)
+        for row in range(max(1, row0), row1):
+            nBg = int(lut[7*bg])
+            if cur.size > 0:
+                ### window with two background cells on each side
+                ext = np.full(cur.size+4, bg, np.uint8)
+                ext[2:-2] = cur
+                nxt = stepECA(ext, lut, np.empty_like(ext))[1:-1]
+                x0 -= 1
+                nCells += nxt.size
+                ### trim background cells and cells outside the light cone
+                nz = np.flatnonzero(nxt != nBg)
+                m = h - 1 - row # remaining generations
+                if nz.size > 0:
+                    lo = max(int(nz[0]), -m - x0)
+                    hi = min(int(nz[-1]) + 1, w + m - x0)
+                else:
+                    lo = hi = 0
+                if lo < hi: x0 += lo; cur = nxt[lo:hi]
+                else: cur = nxt[:0]
+            bg = nBg
+            out[row] = bg
+            c0, c1 = max(0, x0), min(w, x0 + cur.size)
+            if c1 > c0: out[row, c0:c1] = cur[c0-x0:c1-x0]
+        if callback != None: callback(row0, row1, out)
+        row0 = row1
+    if isinstance(initL, str): initSpec = initL.lower()
+    else: initSpec = 'custom'
+    info = dict(rule=ruleNum, w=w, h=h, initL=initSpec, seed=seed,
+                packed=False, transient=None, period=None,
+                cancelled=cancelled, rowsDone=row0, elapsed=time()-t0,
+                boundary="unbounded", window=(x0, x0 + cur.size),
+                cellsComputed=nCells)
+    return out, info
+
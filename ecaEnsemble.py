@@ -0,0 +1,176 @@
+# coding: UTF-8
+""" Ensembles of runs: one rule, many initial lines.
+
+N first lines are stacked into an (N, w) array (or (N, ceil(w/64))
+packed words) and all of them are advanced by one array operation per
+generation. Instead of the (N, h, w) history only the final lines
+and/or per-generation summaries (density, activity, ..) are kept.
+Members are processed in batches, so memory stays bounded for any N.
+
+Dependency:
+    Numpy (1.17)
+
+------------------------------------------------------------------------
+Copyright (C) 2019 Jinook Oh, W. Tecumseh Fitch
+- Contact: jinook.oh@univie.ac.at, tecumseh.fitch@univie.ac.at
+
+This program is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your
+option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program.  If not, see <http://www.gnu.org/licenses/>.
+------------------------------------------------------------------------
+"""
+
+from time import time
+
+import numpy as np
+
+from ecaEngine import ruleLUT, stepECA, packRow, unpackRow, ruleFormula, \
+                      stepPacked, makeInitLine
+
+DEBUG = False
+BATCH_BYTES = 2**24 # bytes of one batch of lines (per work buffer)
+POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], np.uint8)
+
+#=======================================================================
+
+def initLines(w, seeds, initL="random"):
+    """ Stack first lines of an ensemble.
+
+    Args:
+        w (int): Width of each line.
+        seeds (iterable): One seed per member; member i gets the same
+            first line as a single run with seeds[i].
+        initL (str): See ecaEngine.makeInitLine().
+
+    Returns:
+        lines (numpy.ndarray): First lines, shape (N, w) uint8.
+    """
+    if DEBUG: print("initLines()")
+
+    return np.array([makeInitLine(w, initL, s) for s in seeds], np.uint8)
+
+#-----------------------------------------------------------------------
+
+def countOnes(lines, packed):
+    """ Number of 1 cells of each line.
+
+    Args:
+        lines (numpy.ndarray): Lines (uint8), or packed words (uint64).
+        packed (bool): Whether 'lines' is packed.
+
+    Returns:
+        (numpy.ndarray): Counts (int64); shape of lines without the
+            last axis.
+    """
+    if packed:
+        b = np.ascontiguousarray(lines).view(np.uint8)
+        return POPCOUNT8[b].sum(axis=-1, dtype=np.int64)
+    return lines.sum(axis=-1, dtype=np.int64)
+
+#-----------------------------------------------------------------------
+
+def _density(cur, prev, w, packed):
+    """ Fraction of 1 cells.
+    """
+    return countOnes(cur, packed) / w
+
+#-----------------------------------------------------------------------
+
+def _activity(cur, prev, w, packed):
+    """ Fraction of cells that changed from the previous generation.
+    """
+    if prev is None: return np.zeros(cur.shape[0])
+    return countOnes(cur ^ prev, packed) / w
+
+#-----------------------------------------------------------------------
+
+SUMMARIES = dict(density=_density, activity=_activity)
+
+#-----------------------------------------------------------------------
+
+def runEnsemble(ruleNum, lines, nGen, summaries=("density",), every=1,
+                keepFinal=True, packed=True, batch=None):
+    """ Advance N first lines together for nGen generations.
+
+    Args:
+        ruleNum (int): Rule number (0-255).
+        lines (numpy.ndarray): First lines, shape (N, w) uint8.
+        nGen (int): Number of generations to advance.
+        summaries (iterable): Per-generation summaries to record; names
+            in SUMMARIES, or functions called with the lines (B, w)
+            uint8 of a batch and returning one value per line.
+        every (int): Record summaries of generations 0, every, 2*every,
+            .. (and always of generation nGen).
+        keepFinal (bool): Return the lines of generation nGen.
+        packed (bool): Use the bit-packed backend.
+        batch (int, optional): Members advanced at once; chosen so that
+            a batch is about BATCH_BYTES when None.
+
+    Returns:
+        res (dict): 'final' (N, w) uint8 (when keepFinal), 'gens'
+            (recorded generations) and one (N, len(gens)) float64 array
+            per summary, keyed by its name (or 'summary<i>' for the i-th
+            summary when it is a function).
+        info (dict): Run specification and throughput.
+    """
+    if DEBUG: print("runEnsemble()")
+
+    t0 = time()
+    lines = np.asarray(lines, np.uint8)
+    N, w = lines.shape
+    if packed: rowBytes = (w+63)//64 * 8
+    else: rowBytes = w
+    if batch == None: batch = max(1, min(N, BATCH_BYTES // rowBytes))
+    gens = list(range(0, nGen+1, max(1, every)))
+    if gens[-1] != nGen: gens.append(nGen)
+    funcs = []
+    res = dict(gens=np.array(gens))
+    for si, sm in enumerate(summaries):
+        if isinstance(sm, str): name = sm; f = SUMMARIES[sm]
+        else: name = "summary%i"%(si); f = sm
+        funcs.append((name, f, isinstance(sm, str)))
+        res[name] = np.zeros((N, len(gens)))
+    if keepFinal: res["final"] = np.empty((N, w), np.uint8)
+
+    if packed: formula = ruleFormula(ruleNum)
+    else: lut = ruleLUT(ruleNum)
+    for b0 in range(0, N, batch):
+        b1 = min(N, b0 + batch)
+        if packed: cur = packRow(lines[b0:b1])
+        else:
+            cur = lines[b0:b1].copy()
+            idx = np.empty_like(cur) # buffer for neighborhood index
+        nxt = np.empty_like(cur)
+        prev = None
+        gi = 0
+        for g in range(nGen+1):
+            if g > 0:
+                if packed: stepPacked(cur, w, ruleNum, nxt, formula)
+                else: stepECA(cur, lut, nxt, idx)
+                prev, cur, nxt = cur, nxt, cur
+            if g != gens[gi]: continue
+            for name, f, builtin in funcs:
+                if builtin: v = f(cur, prev if g > 0 else None, w, packed)
+                elif packed: v = f(unpackRow(cur, w))
+                else: v = f(cur)
+                res[name][b0:b1, gi] = v
+            gi += 1
+        if keepFinal:
+            if packed: res["final"][b0:b1] = unpackRow(cur, w)
+            else: res["final"][b0:b1] = cur
+    elapsed = time() - t0
+    info = dict(rule=ruleNum, n=N, w=w, nGen=nGen, packed=packed,
+                batch=batch, elapsed=elapsed,
+                cellsPerSec=N*w*nGen/max(elapsed, 1e-9))
+    return res, info
+
+#=======================================================================
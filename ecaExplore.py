@@ -0,0 +1,214 @@
+# coding: UTF-8
+""" Thumbnails of many rules for the rule-space explorer.
+
+A thumbnail is a small run (THUMB_CELLS x THUMB_CELLS cells) reduced
+2x2 to an RGB image of densities. Rules are computed in batches (one
+row of the explorer grid) with a single array step for all rules of a
+batch, in a pool of worker threads. Results are kept in a bounded LRU
+cache keyed by (rule, initial line, seed), so the grid is only computed
+once for a given first line.
+
+Dependency:
+    Numpy (1.17)
+
+------------------------------------------------------------------------
+Copyright (C) 2019 Jinook Oh, W. Tecumseh Fitch
+- Contact: jinook.oh@univie.ac.at, tecumseh.fitch@univie.ac.at
+
+This program is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your
+option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program.  If not, see <http://www.gnu.org/licenses/>.
+------------------------------------------------------------------------
+"""
+
+import os, traceback
+from threading import Thread, Condition
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from ecaEngine import ruleLUT, makeInitLine
+from ecaRender import DENSITY_PALETTE, downsample, toRGB
+
+DEBUG = False
+THUMB_CELLS = 128 # width and generations of a thumbnail run
+BATCH = 16 # rules per batch (one row of the 16 x 16 grid)
+
+#=======================================================================
+
+def runRules(rules, w, h, initL="center seed", seed=None):
+    """ Run several rules from the same first line at once.
+
+    Args:
+        rules (list): Rule numbers (0-255).
+        w (int): Width of each line.
+        h (int): Number of generations (including the first line).
+        initL (str or array-like): See ecaEngine.makeInitLine().
+        seed (int, optional): Seed for a random first line.
+
+    Returns:
+        out (numpy.ndarray): Results (uint8), shape (len(rules), h, w).
+    """
+    if DEBUG: print("runRules()")
+
+    luts = np.stack([ruleLUT(r) for r in rules])
+    rows = np.arange(len(rules))[:, None]
+    out = np.empty((len(rules), h, w), np.uint8)
+    out[:, 0] = makeInitLine(w, initL, seed)
+    idx = np.empty((len(rules), w), np.uint8)
+    for g in range(1, h):
+        line = out[:, g-1]
+        # 3-bit neighborhood index of all lines (see ecaEngine.stepECA())
+        idx[:, 1:] = line[:, :-1]
+        idx[:, 0] = line[:, -1]
+        idx <<= 1
+        idx |= line
+        idx <<= 1
+        idx[:, :-1] |= line[:, 1:]
+        idx[:, -1] |= line[:, 0]
+        out[:, g] = luts[rows, idx]
+    return out
+
+#-----------------------------------------------------------------------
+
+def thumbnails(rules, initL="center seed", seed=None, cells=THUMB_CELLS):
+    """ Thumbnail images of rules.
+
+    Args:
+        rules (list): Rule numbers (0-255).
+        initL (str): 'center seed' or 'random'.
+        seed (int, optional): Seed for a random first line.
+        cells (int): Width and generations of each run.
+
+    Returns:
+        (list): RGB arrays (uint8), shape (cells/2, cells/2, 3).
+    """
+    if DEBUG: print("thumbnails()")
+
+    out = runRules(rules, cells, cells, initL, seed)
+    half = (cells + 1) // 2
+    return [toRGB(downsample(arr, 0, half, 255), DENSITY_PALETTE)
+            for arr in out]
+
+#=======================================================================
+
+class ThumbnailCache:
+    """ LRU cache of rule thumbnails filled by a pool of worker threads.
+
+    Attributes:
+        maxItems (int): Maximum number of cached thumbnails.
+        callback (function): Called in a worker thread as
+            callback(keys) when thumbnails were added.
+    """
+    def __init__(self, callback=None, nThreads=None, maxItems=1024):
+        if DEBUG: print("ThumbnailCache.__init__()")
+
+        self.callback = callback
+        self.maxItems = maxItems
+        self.items = OrderedDict() # (rule, initL, seed) -> RGB array
+        self.pending = set() # keys queued or being computed
+        self.batches = deque() # [(initL, seed, rules), ..]
+        self.cond = Condition()
+        self.stopped = False
+        if nThreads == None: nThreads = min(4, os.cpu_count() or 1)
+        self.threads = []
+        for i in range(nThreads):
+            th = Thread(target=self._loop, daemon=True)
+            th.start()
+            self.threads.append(th)
+
+    #-------------------------------------------------------------------
+
+    def get(self, ruleNum, initL="center seed", seed=None):
+        """ Cached thumbnail of a rule.
+
+        Args:
+            ruleNum (int): Rule number.
+            initL (str): 'center seed' or 'random'.
+            seed (int, optional): Seed for a random first line.
+
+        Returns:
+            (numpy.ndarray or None): RGB array, or None when not cached.
+        """
+        key = (ruleNum, initL, seed)
+        with self.cond:
+            rgb = self.items.get(key)
+            if rgb is not None: self.items.move_to_end(key)
+            return rgb
+
+    #-------------------------------------------------------------------
+
+    def request(self, rules, initL="center seed", seed=None):
+        """ Queue thumbnails that are neither cached nor pending; the
+        latest request is computed first (e.g. the rows just scrolled
+        into view).
+
+        Args:
+            rules (list): Rule numbers.
+            initL (str): 'center seed' or 'random'.
+            seed (int, optional): Seed for a random first line.
+
+        Returns: None
+        """
+        with self.cond:
+            todo = [r for r in rules if not (r, initL, seed) in self.items
+                    and not (r, initL, seed) in self.pending]
+            if len(todo) == 0: return
+            for i in range(0, len(todo), BATCH)[::-1]:
+                self.batches.appendleft((initL, seed, todo[i:i+BATCH]))
+            self.pending.update((r, initL, seed) for r in todo)
+            self.cond.notify_all()
+
+    #-------------------------------------------------------------------
+
+    def _loop(self):
+        """ Worker thread; compute queued batches.
+        """
+        while True:
+            with self.cond:
+                while not self.batches and not self.stopped:
+                    self.cond.wait()
+                if self.stopped: return
+                initL, seed, rules = self.batches.popleft()
+            keys = [(r, initL, seed) for r in rules]
+            try:
+                rgbs = thumbnails(rules, initL, seed)
+                with self.cond:
+                    for key, rgb in zip(keys, rgbs): self.items[key] = rgb
+                    while len(self.items) > self.maxItems:
+                        self.items.popitem(last=False)
+                if self.callback != None: self.callback(keys)
+            except Exception:
+                # keep the thread for the other batches; the failed
+                # thumbnails can be requested again
+                traceback.print_exc()
+            finally:
+                with self.cond: self.pending.difference_update(keys)
+
+    #-------------------------------------------------------------------
+
+    def close(self):
+        """ End the worker threads.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("ThumbnailCache.close()")
+
+        with self.cond:
+            self.stopped = True
+            self.batches.clear()
+            self.cond.notify_all()
+        for th in self.threads: th.join()
+
+#=======================================================================
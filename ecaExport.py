@@ -0,0 +1,714 @@
+# coding: UTF-8
+""" Streaming export of CA histories and sweeps.
+
+Formats:
+- '.png': 1-bit palette PNG; rows are packed 8 cells per byte and
+  compressed chunk by chunk, without an RGB image.
+- '.npz': cells packed with numpy.packbits (leftmost cell in the most
+  significant bit), shape (h, ceil(w/8)) uint8 ('cells'), with the run
+  information as JSON ('meta').
+- '.npy': cells as they are, shape (h, w) uint8, like the .npy files
+  saved elsewhere (eca.py run -o); the run information is in a .json
+  file next to it.
+- '.ecarle': row-delta stream; each row is XORed with the previous
+  one, and only the edges of runs of changed cells are stored as
+  variable-length integers, so quiescent rows take one byte.
+Writers take chunks of rows (uint8, 0 or 1) and keep only one chunk in
+memory, whether the rows come from an array, a memory-mapped
+ecaHistory.HistoryStore or the engine itself (engineChunks()).
+Bit-packed results are written to '.png' and '.npz' without unpacking
+them to cells (packedBits()).
+
+Dependency:
+    Numpy (1.17)
+
+------------------------------------------------------------------------
+Copyright (C) 2019 Jinook Oh, W. Tecumseh Fitch
+- Contact: jinook.oh@univie.ac.at, tecumseh.fitch@univie.ac.at
+
+This program is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your
+option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program.  If not, see <http://www.gnu.org/licenses/>.
+------------------------------------------------------------------------
+"""
+
+import os, json, zlib, struct, zipfile
+
+import numpy as np
+
+from ecaEngine import ruleLUT, stepECA, makeInitLine, unpackRow
+from ecaRender import PALETTE
+
+DEBUG = False
+CHUNK_CELLS = 2**24 # cells per chunk of rows
+PNG_SIG = b"\x89PNG\r\n\x1a\n"
+IDAT_BYTES = 2**20 # compressed bytes per PNG IDAT chunk
+RLE_MAGIC = b"ECARLE1\n"
+FORMATS = (".png", ".npy", ".npz", ".ecarle")
+BITS_FORMATS = (".png", ".npz") # formats storing 8 cells per byte
+# shifts and masks swapping bits, pairs and nibbles in every byte of
+# a word; the three swaps reverse the bits of each byte
+BYTE_REVERSE = [(np.uint64(s), np.uint64(m)) for s, m in (
+                    (1, 0x5555555555555555), (2, 0x3333333333333333),
+                    (4, 0x0f0f0f0f0f0f0f0f))]
+
+#=======================================================================
+
+def chunkRowsFor(w, chunkRows=None):
+    """ Rows per chunk; about CHUNK_CELLS cells when chunkRows is None.
+    """
+    if chunkRows != None: return chunkRows
+    return max(1, CHUNK_CELLS // max(1, w))
+
+#-----------------------------------------------------------------------
+
+def packedBits(words, w):
+    """ Convert rows packed with ecaEngine.packRow() (cell x in bit
+    x % 64 of a word) to rows packed as numpy.packbits() does (leftmost
+    cell in the most significant bit of a byte), without unpacking.
+    The bytes of little-endian words are in cell order already; only
+    the bits within each byte are reversed, with shifts of whole words
+    (faster than a lookup table of bytes).
+
+    Args:
+        words (numpy.ndarray): Packed rows (uint64), shape (rows, nW).
+        w (int): Width of each row.
+
+    Returns:
+        (numpy.ndarray): Rows (uint8), shape (rows, ceil(w/8)).
+    """
+    x = np.array(words, "<u8") # a copy, in little-endian byte order
+    t = np.empty_like(x)
+    for sh, m in BYTE_REVERSE:
+        np.right_shift(x, sh, out=t)
+        t &= m
+        x &= m
+        x <<= sh
+        x |= t
+    b = x.view(np.uint8)[:, :(w+7)//8]
+    if w % 8: b[:, -1] &= np.uint8(0xff << (8 - w%8) & 0xff) # unused bits
+    return b
+
+#-----------------------------------------------------------------------
+
+def iterChunks(src, w=None, nRows=None, chunkRows=None, bits=False):
+    """ Read a result in chunks of rows.
+
+    Args:
+        src (numpy.ndarray or ecaHistory.HistoryStore): Result; a
+            uint64 array is taken as packed rows (ecaEngine.packRow()).
+        w (int, optional): Width; needed for packed arrays.
+        nRows (int, optional): Number of rows to read; all rows (rows
+            done of a HistoryStore) by default.
+        chunkRows (int, optional): Rows per chunk.
+        bits (bool): Yield rows packed 8 cells per byte instead of
+            cells; packed sources are converted without unpacking.
+
+    Yields:
+        cells (numpy.ndarray): Rows (uint8, 0 or 1), shape (rows, w),
+            or with bits, as numpy.packbits() packs them (uint8),
+            shape (rows, ceil(w/8)).
+    """
+    if DEBUG: print("iterChunks()")
+
+    if isinstance(src, np.ndarray):
+        if src.dtype == np.uint64: words = src
+        else: words = None
+    elif src.meta["packed"]: words = src.body # packed HistoryStore
+    else: words = None
+    if w == None:
+        if words is src: raise ValueError("width of packed rows is needed")
+        w = src.shape[1]
+    if nRows == None: nRows = getattr(src, "rowsDone", src.shape[0])
+    cr = chunkRowsFor(w, chunkRows)
+    for r0 in range(0, nRows, cr):
+        r1 = min(nRows, r0 + cr)
+        if words is None:
+            cells = np.asarray(src[r0:r1], np.uint8)
+            if bits: yield np.packbits(cells, axis=1)
+            else: yield cells
+        elif bits: yield packedBits(words[r0:r1], w)
+        else: yield unpackRow(words[r0:r1], w)
+
+#-----------------------------------------------------------------------
+
+def engineChunks(ruleNum, w, h, initL="center seed", seed=None,
+                 chunkRows=None):
+    """ Compute a run chunk by chunk, keeping one chunk in memory.
+
+    Args:
+        ruleNum (int): Rule number (0-255).
+        w (int): Width of each line.
+        h (int): Number of generations (including the first line).
+        initL (str or array-like): See ecaEngine.makeInitLine().
+        seed (int, optional): Seed for a random first line.
+        chunkRows (int, optional): Rows per chunk.
+
+    Yields:
+        cells (numpy.ndarray): Rows (uint8); the buffer is reused, so
+            copy it to keep it beyond the next iteration.
+    """
+    if DEBUG: print("engineChunks()")
+
+    lut = ruleLUT(ruleNum)
+    cr = chunkRowsFor(w, chunkRows)
+    buf = np.empty((min(cr, h), w), np.uint8)
+    idx = np.empty(w, np.uint8) # buffer for neighborhood index
+    prev = makeInitLine(w, initL, seed)
+    r0 = 0
+    while r0 < h:
+        n = min(cr, h - r0)
+        for i in range(n):
+            if r0 + i == 0: buf[0] = prev
+            else: stepECA(prev, lut, buf[i], idx)
+            prev = buf[i]
+        yield buf[:n]
+        prev = buf[n-1].copy() # the buffer is overwritten next
+        r0 += n
+
+#-----------------------------------------------------------------------
+
+def resultMeta(src, info=None):
+    """ Run information to store with an export.
+
+    Args:
+        src (numpy.ndarray or ecaHistory.HistoryStore): Result.
+        info (dict, optional): Run information (e.g. from
+            ecaEngine.runECA()).
+
+    Returns:
+        meta (dict): JSON-serializable information, with 'w' and 'h'.
+    """
+    if hasattr(src, "meta"): meta = dict(src.meta, h=src.rowsDone)
+    else: meta = dict(h=src.shape[0], w=src.shape[1])
+    if info != None:
+        meta.update((k, v) for k, v in info.items()
+                    if isinstance(v, (int, float, str, bool, type(None))))
+    meta.pop("packed", None) # packing of the source, not of the export
+    return meta
+
+#=======================================================================
+
+class PNGWriter:
+    """ Streaming writer of a 1-bit palette PNG image.
+
+    Attributes:
+        w, h (int): Image size (cells).
+        rowsWritten (int): Rows written so far.
+    """
+    def __init__(self, fp, w, h, palette=PALETTE, level=6):
+        """
+        Args:
+            fp (str): File path.
+            w, h (int): Image size; exactly h rows must be written.
+            palette (numpy.ndarray): RGB color of cell states 0 and 1.
+            level (int): zlib compression level.
+        """
+        if DEBUG: print("PNGWriter.__init__()")
+
+        self.w = w
+        self.h = h
+        self.rowsWritten = 0
+        self.f = open(fp, "wb")
+        self.z = zlib.compressobj(level)
+        self.buf = bytearray() # compressed bytes not written yet
+        self.f.write(PNG_SIG)
+        # width, height, bit depth 1, color type 3 (palette)
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 1, 3, 0, 0, 0))
+        self._chunk(b"PLTE", np.asarray(palette[:2], np.uint8).tobytes())
+
+    #-------------------------------------------------------------------
+
+    def _chunk(self, tag, data):
+        """ Write a PNG chunk.
+        """
+        self.f.write(struct.pack(">I", len(data)) + tag + data)
+        self.f.write(struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff))
+
+    #-------------------------------------------------------------------
+
+    def write(self, cells):
+        """ Append rows.
+
+        Args:
+            cells (numpy.ndarray): Rows (uint8, 0 or 1), shape (rows, w).
+
+        Returns: None
+        """
+        self.writeBits(np.packbits(cells, axis=1))
+
+    #-------------------------------------------------------------------
+
+    def writeBits(self, rows):
+        """ Append rows packed 8 cells per byte, leftmost cell in the
+        most significant bit, which is the scanline format of the image.
+
+        Args:
+            rows (numpy.ndarray): Rows (uint8), shape (rows, ceil(w/8));
+                see iterChunks() and packedBits().
+
+        Returns: None
+        """
+        n = rows.shape[0]
+        if self.rowsWritten + n > self.h:
+            raise ValueError("more rows than the image height")
+        nb = (self.w + 7) // 8
+        raw = np.zeros((n, nb+1), np.uint8) # filter type 0 (None) first
+        raw[:, 1:] = rows
+        self.buf += self.z.compress(raw.tobytes())
+        while len(self.buf) >= IDAT_BYTES:
+            self._chunk(b"IDAT", bytes(self.buf[:IDAT_BYTES]))
+            del self.buf[:IDAT_BYTES]
+        self.rowsWritten += n
+
+    #-------------------------------------------------------------------
+
+    def close(self):
+        """ Write the remaining data and close the file.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("PNGWriter.close()")
+
+        if self.rowsWritten != self.h:
+            self.f.close()
+            raise ValueError("%i of %i rows were written"%(self.rowsWritten,
+                                                           self.h))
+        self.buf += self.z.flush()
+        self._chunk(b"IDAT", bytes(self.buf))
+        self._chunk(b"IEND", b"")
+        self.f.close()
+
+#=======================================================================
+
+def _writeRows(f, chunks, shape, packed, bits=False):
+    """ Write an .npy header and the rows of chunks; shape is the shape
+    of the cells. With bits, the chunks are packed already.
+    """
+    if packed: shape = shape[:-1] + ((shape[-1]+7)//8,)
+    np.lib.format.write_array_header_2_0(f, dict(descr="|u1",
+                                    fortran_order=False, shape=shape))
+    n = 0
+    for cells in chunks:
+        if packed and not bits: cells = np.packbits(cells, axis=1)
+        f.write(np.ascontiguousarray(cells, np.uint8).tobytes())
+        n += cells.shape[0]
+    nRows = int(np.prod(shape[:-1]))
+    if n != nRows:
+        raise ValueError("%i of %i rows were written"%(n, nRows))
+
+#-----------------------------------------------------------------------
+
+def _shape(meta):
+    """ Shape of the cells of meta; (runs, h, w) or (h, w).
+    """
+    shape = (meta["h"], meta["w"])
+    if "runs" in meta: shape = (meta["runs"],) + shape
+    return shape
+
+#-----------------------------------------------------------------------
+
+def savePacked(fp, chunks, meta, bits=False):
+    """ Save rows bit-packed (numpy.packbits) as .npz; the rows
+    ('cells') and meta ('meta', JSON) in one (deflated) file.
+
+    Args:
+        fp (str): File path.
+        chunks (iterable): Chunks of rows (see iterChunks()); meta["h"]
+            rows in total, or meta["runs"] times meta["h"] rows.
+        meta (dict): Run information with 'w' and 'h', and 'runs' for
+            several runs of h rows (saved with shape (runs, h, ..)).
+        bits (bool): The chunks are packed already (iterChunks()).
+
+    Returns: None
+    """
+    if DEBUG: print("savePacked()")
+
+    shape = _shape(meta)
+    meta = dict(meta, bitorder="big")
+    with zipfile.ZipFile(fp, "w", zipfile.ZIP_DEFLATED) as zf:
+        with zf.open("cells.npy", "w", force_zip64=True) as f:
+            _writeRows(f, chunks, shape, True, bits)
+        with zf.open("meta.npy", "w") as f:
+            np.save(f, np.array(json.dumps(meta)))
+
+#-----------------------------------------------------------------------
+
+def saveCells(fp, chunks, meta):
+    """ Save rows as they are as .npy (uint8 cells) and meta as
+    fp + '.json'.
+
+    Args:
+        fp (str): File path.
+        chunks, meta: See savePacked().
+
+    Returns: None
+    """
+    if DEBUG: print("saveCells()")
+
+    with open(fp, "wb") as f: _writeRows(f, chunks, _shape(meta), False)
+    with open(fp + ".json", "w") as f: json.dump(meta, f)
+
+#-----------------------------------------------------------------------
+
+def loadArray(fp, unpack=True, mmap=False):
+    """ Load rows saved with savePacked() (.npz) or saveCells() (.npy).
+
+    Args:
+        fp (str): File path.
+        unpack (bool): Return cells (uint8, 0 or 1) instead of packed
+            bytes of a .npz.
+        mmap (bool): Map the cells of a .npy file instead of reading
+            them.
+
+    Returns:
+        arr (numpy.ndarray): Cells or packed rows.
+        meta (dict): Run information.
+    """
+    if DEBUG: print("loadArray()")
+
+    if fp.lower().endswith(".npz"):
+        with np.load(fp) as f:
+            arr = f["cells"]
+            meta = json.loads(str(f["meta"]))
+        if unpack: arr = np.unpackbits(arr, axis=-1, count=meta["w"])
+    else:
+        arr = np.load(fp, mmap_mode="r" if mmap else None)
+        with open(fp + ".json") as f: meta = json.load(f)
+    return arr, meta
+
+#=======================================================================
+
+def encodeVarints(v):
+    """ LEB128 encoding of non-negative integers.
+
+    Args:
+        v (numpy.ndarray): Integers.
+
+    Returns:
+        (numpy.ndarray): Bytes (uint8); 7 bits per byte, the high bit
+            set on all but the last byte of each integer.
+    """
+    v = np.asarray(v, np.uint64)
+    nb = np.ones(v.shape, np.int64) # bytes per integer
+    k = 1
+    while k < 10: # at most 10 bytes for 64 bits
+        more = v >= np.uint64(1) << np.uint64(7*k)
+        if not more.any(): break
+        nb += more
+        k += 1
+    pos = np.cumsum(nb) - nb
+    out = np.empty(int(nb.sum()), np.uint8)
+    for i in range(k):
+        m = nb > i
+        b = (v[m] >> np.uint64(7*i)) & np.uint64(0x7f)
+        b |= (nb[m] > i+1).astype(np.uint64) << np.uint64(7)
+        out[pos[m] + i] = b
+    return out
+
+#-----------------------------------------------------------------------
+
+def decodeVarints(b):
+    """ Decode bytes made with encodeVarints().
+
+    Args:
+        b (numpy.ndarray): Bytes (uint8).
+
+    Returns:
+        (numpy.ndarray): Integers (uint64).
+    """
+    if b.shape[0] == 0: return np.zeros(0, np.uint64)
+    ends = np.flatnonzero(b < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    grp = np.repeat(np.arange(starts.shape[0]), ends - starts + 1)
+    shift = ((np.arange(b.shape[0]) - starts[grp]) * 7).astype(np.uint64)
+    parts = (b & 0x7f).astype(np.uint64) << shift
+    return np.add.reduceat(parts, starts)
+
+#=======================================================================
+
+class RLEWriter:
+    """ Streaming writer of a row-delta stream ('.ecarle').
+
+    File layout: RLE_MAGIC, length of the JSON header (uint32), the
+    header, then one frame per write(): number of rows and of payload
+    bytes (uint32, uint64; little endian) and the payload. For each row
+    the payload holds, as varints, the number of runs of cells that
+    changed since the previous row (the first row is compared with an
+    empty row) followed by the start and end of each run, each as the
+    distance from the previous edge in the row.
+
+    Attributes:
+        w (int): Width of each line.
+        rowsWritten (int): Rows written so far.
+    """
+    def __init__(self, fp, meta):
+        """
+        Args:
+            fp (str): File path.
+            meta (dict): Run information with 'w'.
+        """
+        if DEBUG: print("RLEWriter.__init__()")
+
+        self.w = meta["w"]
+        self.rowsWritten = 0
+        self.prev = np.zeros(self.w, np.uint8)
+        self.f = open(fp, "wb")
+        head = json.dumps(meta, sort_keys=True).encode("utf-8")
+        self.f.write(RLE_MAGIC + struct.pack("<I", len(head)) + head)
+
+    #-------------------------------------------------------------------
+
+    def write(self, cells):
+        """ Append rows as one frame.
+
+        Args:
+            cells (numpy.ndarray): Rows (uint8, 0 or 1), shape (rows, w).
+
+        Returns: None
+        """
+        n, w = cells.shape
+        if n == 0: return
+        d = np.empty((n, w), np.uint8) # changed cells
+        np.bitwise_xor(cells[1:], cells[:-1], out=d[1:])
+        np.bitwise_xor(cells[0], self.prev, out=d[0])
+        ### edges: positions where runs of changed cells start or end
+        t = np.empty((n, w+1), bool)
+        t[:, 0] = d[:, 0]
+        np.not_equal(d[:, 1:], d[:, :-1], out=t[:, 1:w])
+        t[:, w] = d[:, -1]
+        rows, cols = np.nonzero(t)
+        nEdges = np.bincount(rows, minlength=n)
+        dist = cols.astype(np.uint64)
+        if cols.shape[0] > 1:
+            dist[1:] -= cols[:-1].astype(np.uint64)
+            first = np.cumsum(nEdges) - nEdges # first edge of each row
+            first = first[nEdges > 0]
+            dist[first] = cols[first]
+        ### [runs of row 0, edges of row 0.., runs of row 1, ..]
+        ints = np.insert(dist, np.cumsum(nEdges) - nEdges, nEdges // 2)
+        payload = encodeVarints(ints).tobytes()
+        self.f.write(struct.pack("<IQ", n, len(payload)) + payload)
+        self.prev = cells[-1].copy()
+        self.rowsWritten += n
+
+    #-------------------------------------------------------------------
+
+    def close(self):
+        """ Close the file.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("RLEWriter.close()")
+
+        self.f.close()
+
+#=======================================================================
+
+class RLEReader:
+    """ Reader of a row-delta stream written by RLEWriter.
+
+    Attributes:
+        meta (dict): Run information.
+    """
+    def __init__(self, fp):
+        if DEBUG: print("RLEReader.__init__()")
+
+        self.fp = fp
+        with open(fp, "rb") as f:
+            if f.read(len(RLE_MAGIC)) != RLE_MAGIC:
+                raise ValueError("%s is not a row-delta stream"%(fp))
+            n, = struct.unpack("<I", f.read(4))
+            self.meta = json.loads(f.read(n).decode("utf-8"))
+            self.dataPos = f.tell()
+
+    #-------------------------------------------------------------------
+
+    def __iter__(self):
+        """ Decode the stream frame by frame.
+
+        Yields:
+            cells (numpy.ndarray): Rows of a frame (uint8), shape
+                (rows, w).
+        """
+        w = self.meta["w"]
+        prev = np.zeros(w, np.uint8)
+        with open(self.fp, "rb") as f:
+            f.seek(self.dataPos)
+            while True:
+                head = f.read(12)
+                if len(head) < 12: break
+                n, nBytes = struct.unpack("<IQ", head)
+                ints = decodeVarints(np.frombuffer(f.read(nBytes), np.uint8))
+                ### position of the run count of each row
+                cntPos = np.empty(n, np.int64)
+                il = ints.tolist()
+                i = 0
+                for r in range(n):
+                    cntPos[r] = i
+                    i += 1 + 2*il[i]
+                nEdges = 2 * ints[cntPos].astype(np.int64)
+                isEdge = np.ones(ints.shape[0], bool)
+                isEdge[cntPos] = False
+                cs = np.cumsum(ints[isEdge].astype(np.int64))
+                base = np.concatenate(([0], cs))[np.cumsum(nEdges) - nEdges]
+                cols = cs - np.repeat(base, nEdges)
+                t = np.zeros((n, w+1), np.uint8)
+                t[np.repeat(np.arange(n), nEdges), cols] = 1
+                d = np.bitwise_xor.accumulate(t[:, :w], axis=1)
+                d[0] ^= prev
+                cells = np.bitwise_xor.accumulate(d, axis=0)
+                prev = cells[-1]
+                yield cells
+
+    #-------------------------------------------------------------------
+
+    def read(self):
+        """ Decode the whole stream.
+
+        Args: None
+
+        Returns:
+            (numpy.ndarray): Cells (uint8), shape (rows, w).
+        """
+        chunks = list(self)
+        if len(chunks) == 0: return np.zeros((0, self.meta["w"]), np.uint8)
+        return np.concatenate(chunks)
+
+#=======================================================================
+
+def exportChunks(fp, chunks, meta, bits=False):
+    """ Write chunks of rows in the format given by the file extension.
+
+    Args:
+        fp (str): File path ending with one of FORMATS.
+        chunks (iterable): Chunks of rows (uint8, 0 or 1).
+        meta (dict): Run information with 'w' and 'h' (number of rows).
+        bits (bool): The chunks are rows packed 8 cells per byte (see
+            iterChunks()); they are written as they are to the formats
+            of BITS_FORMATS.
+
+    Returns: None
+    """
+    if DEBUG: print("exportChunks()")
+
+    ext = os.path.splitext(fp)[1].lower()
+    if bits and ext not in BITS_FORMATS:
+        w = meta["w"]
+        chunks = (np.unpackbits(b, axis=1, count=w) for b in chunks)
+        bits = False
+    if ext == ".npz":
+        savePacked(fp, chunks, meta, bits)
+        return
+    if ext == ".npy":
+        saveCells(fp, chunks, meta)
+        return
+    if ext == ".png": writer = PNGWriter(fp, meta["w"], meta["h"])
+    elif ext == ".ecarle": writer = RLEWriter(fp, meta)
+    else: raise ValueError("Unknown export format: %s"%(ext))
+    for cells in chunks:
+        if bits: writer.writeBits(cells)
+        else: writer.write(cells)
+    writer.close()
+
+#-----------------------------------------------------------------------
+
+def exportResult(fp, src, info=None, nRows=None, chunkRows=None):
+    """ Export a result array or history.
+
+    Args:
+        fp (str): File path ending with one of FORMATS.
+        src (numpy.ndarray or ecaHistory.HistoryStore): Result.
+        info (dict, optional): Run information; needed ('w') for packed
+            arrays.
+        nRows (int, optional): Number of rows to export (e.g. the rows
+            done of a running job); all by default.
+        chunkRows (int, optional): Rows per chunk.
+
+    Returns: None
+    """
+    if DEBUG: print("exportResult()")
+
+    meta = resultMeta(src, info)
+    if nRows != None: meta["h"] = nRows
+    bits = os.path.splitext(fp)[1].lower() in BITS_FORMATS
+    chunks = iterChunks(src, meta["w"], meta["h"], chunkRows, bits)
+    exportChunks(fp, chunks, meta, bits)
+
+#-----------------------------------------------------------------------
+
+def exportRun(fp, ruleNum, w, h, initL="center seed", seed=None,
+              chunkRows=None):
+    """ Compute a run and export it without keeping it in memory.
+
+    Args:
+        fp (str): File path ending with one of FORMATS.
+        ruleNum, w, h, initL, seed: See engineChunks().
+        chunkRows (int, optional): Rows per chunk.
+
+    Returns: None
+    """
+    if DEBUG: print("exportRun()")
+
+    if isinstance(initL, str): initSpec = initL.lower()
+    else: initSpec = 'custom'
+    meta = dict(rule=ruleNum, w=w, h=h, initL=initSpec, seed=seed)
+    exportChunks(fp, engineChunks(ruleNum, w, h, initL, seed, chunkRows),
+                 meta)
+
+#-----------------------------------------------------------------------
+
+def exportSweep(fp, blk, info, chunkRows=None):
+    """ Export the results of ecaSweep.runSweep().
+
+    Args:
+        fp (str): '.npz' or '.npy' saves all runs in one file, with
+            shape (jobs, h, ceil(w/8)) (packed) or (jobs, h, w) and the
+            jobs in the meta;
+            '.png' or '.ecarle' saves one file per run, named
+            '<fp without extension>_rule<r>_seed<s><extension>'.
+        blk (numpy.ndarray): Results of runSweep().
+        info (dict): Information of runSweep().
+        chunkRows (int, optional): Rows per chunk.
+
+    Returns:
+        fps (list): Written file paths.
+    """
+    if DEBUG: print("exportSweep()")
+
+    w, h = info["w"], info["h"]
+    base, ext = os.path.splitext(fp)
+    bits = ext.lower() in BITS_FORMATS
+    if ext.lower() in (".npy", ".npz"):
+        nJ = len(info["jobs"])
+        meta = dict(w=w, h=h, runs=nJ, initL=info["initL"],
+                    jobs=[list(j) for j in info["jobs"]])
+        def chunks(): # rows of all runs, one run after another
+            for ji in range(nJ):
+                for cells in iterChunks(blk[ji], w, h, chunkRows, bits):
+                    yield cells
+        exportChunks(fp, chunks(), meta, bits)
+        return [fp]
+    fps = []
+    for ji, (r, s) in enumerate(info["jobs"]):
+        fpJ = "%s_rule%i_seed%s%s"%(base, r, s, ext)
+        meta = dict(rule=r, w=w, h=h, initL=info["initL"], seed=s)
+        exportChunks(fpJ, iterChunks(blk[ji], w, h, chunkRows, bits), meta,
+                     bits)
+        fps.append(fpJ)
+    return fps
+
+#=======================================================================
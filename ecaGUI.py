@@ -0,0 +1,1393 @@
+# coding: UTF-8
+""" wxPython user interface of elementary cellular automata.
+
+This module is imported only when the graphical user interface is
+started (see CA1DApp in eca.py).
+
+Dependency:
+    wxPython (4.0)
+    Numpy (1.17)
+
+------------------------------------------------------------------------
+Copyright (C) 2019 Jinook Oh, W. Tecumseh Fitch 
+- Contact: jinook.oh@univie.ac.at, tecumseh.fitch@univie.ac.at
+
+This program is free software: you can redistribute it and/or modify it 
+under the terms of the GNU General Public License as published by the 
+Free Software Foundation, either version 3 of the License, or (at your 
+option) any later version.
+
+This program is distributed in the hope that it will be useful, but 
+WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License along 
+with this program.  If not, see <http://www.gnu.org/licenses/>.
+------------------------------------------------------------------------
+"""
+
+import os, sys, tempfile, threading
+from time import time, strftime, perf_counter
+from math import log2, floor, ceil
+from random import randint
+from collections import OrderedDict
+
+import wx
+import wx.lib.scrolledpanel as SPanel 
+import numpy as np
+
+from ecaEngine import __version__, makeInitLine, runECA, runUnbounded
+from ecaRender import Pyramid, toRGB
+from ecaJobs import JobRunner
+from ecaHistory import createHistory, RingHistory
+from ecaCache import ResultCache, runSpec
+from ecaParallel import ParallelStepper
+from ecaProfile import PROFILER, chunkTimer
+from ecaExport import exportResult
+from ecaExplore import ThumbnailCache
+
+DEBUG = False
+MEM_CELLS = 2**28 # larger results are kept in (temporary) files
+PAR_WIDTH = 2**20 # wider lines are computed by a thread pool
+THUMB_SZ = 64 # size (pixels) of a rule thumbnail in the explorer
+THUMB_CELL = (THUMB_SZ+8, THUMB_SZ+20) # grid cell size, with label
+ENDLESS_ROWS = 2 # generations per frame of the endless mode
+ENDLESS_MS = 16 # milliseconds per frame of the endless mode (~60 fps)
+
+#=======================================================================
+
+class CellularAutomata1DFrame(wx.Frame):
+    """ Printing one dimensional elementary cellular automata
+    (256 rules of Wolfram)
+    with a given parameters in user interface.
+    """
+    def __init__(self, cacheDir=None):
+        """
+        Args:
+            cacheDir (str, optional): Directory of the result cache;
+                results are only kept in memory if None.
+        """
+        if DEBUG: print("CellularAutomata1DFrame.__init__")
+
+        ##### beginning of setting up attributes ----- 
+        w_pos = (0, 25) 
+        self.w_sz = [800, 600]
+        self.fonts = self.setupFontsForWXApp(5)
+        pi = {} 
+        # top panel for UI 
+        pi["tUI"] = dict(pos=(0, 0), 
+                         sz=(self.w_sz[0], 40), 
+                         bgCol="#cccccc", 
+                         style=wx.TAB_TRAVERSAL|wx.SUNKEN_BORDER)
+        tUISz = pi["tUI"]["sz"]
+        # panel for drawing rule
+        pi["rul"] = dict(pos=(0, tUISz[1]),
+                         sz=(tUISz[0], 20),
+                         bgCol="#777777",
+                         style=wx.TAB_TRAVERSAL|wx.SUNKEN_BORDER)
+        rulSz = pi["rul"]["sz"]
+        # panel for drawing CA result
+        pi["caR"] = dict(pos=(0, tUISz[1]+rulSz[1]), 
+                         sz=(tUISz[0], self.w_sz[1]-tUISz[1]-rulSz[1]), 
+                         bgCol="#999999", 
+                         style=wx.TAB_TRAVERSAL|wx.SUNKEN_BORDER)
+        self.pi = pi
+        self.gbs = {} # for GridBagSizer
+        self.timers = {}
+        self.rn = 124
+        self.rule = None
+        self.caRArr = None # CA result (array or ecaHistory.HistoryStore) 
+        self.caJob = None # job parameters of caRArr
+        self.endless = None # state of the endless (scrolling) mode
+        self.caRArrSz = (self.w_sz[1]-pi["tUI"]["sz"][1],
+                         self.w_sz[0])
+        self.runner = JobRunner(self.runCA, # worker thread with job queue
+                    onError=lambda job, e: wx.CallAfter(self.onRunError,
+                                                        job, e))
+        self.stepper = None # thread pool for wide lines (ParallelStepper)
+        self.cache = ResultCache(cacheDir=cacheDir) # results
+        self.prog = dict(rowsDone=0, # rows computed by the worker
+                         rowsShown=0, # rows already shown in the view
+                         lastPost=0.0, # time of the last progress event
+                         postTime=None, # perf_counter() of the pending event
+                         pending=False) # progress event not handled yet
+        self.progInterval = 1.0/30 # minimum seconds between progress events
+
+        ##### end of setting up attributes -----
+        
+        ### init frame
+        wx.Frame.__init__(
+                          self, 
+                          None, 
+                          -1, 
+                          "Elementary cellular automata v.%s"%(__version__), 
+                          pos = w_pos, 
+                          size = self.w_sz,
+                         ) 
+        self.SetBackgroundColour('#333333')
+        self.updateFrameSize()
+
+        ### create (scroll) panels
+        self.panel = {}
+        for pk in pi.keys():
+            self.panel[pk] = SPanel.ScrolledPanel(
+                                                  self, 
+                                                  name="%s_panel"%(pk), 
+                                                  pos=pi[pk]["pos"], 
+                                                  size=pi[pk]["sz"], 
+                                                  style=pi[pk]["style"],
+                                                 )
+            self.panel[pk].SetBackgroundColour(pi[pk]["bgCol"]) 
+            if pk == 'rul': 
+                self.panel[pk].Bind(wx.EVT_PAINT, self.onRPaint)
+            elif pk == 'caR': 
+                self.panel[pk].Bind(wx.EVT_PAINT, self.onPaint)
+                self.panel[pk].Bind(wx.EVT_MOUSE_EVENTS, self.onViewMouse)
+        self.view = TiledView() # zoomable view of CA result
+        self.dragPos = None # last mouse position while dragging the view
+
+        ### rule explorer; grid of thumbnails of the 256 rules,
+        ### shown instead of CA result
+        self.thumbs = ThumbnailCache(
+                    callback=lambda keys: wx.CallAfter(self.onThumbsReady))
+        self.expWin = wx.ScrolledWindow(
+                                        self, 
+                                        name="exp_win", 
+                                        pos=pi["caR"]["pos"], 
+                                        size=pi["caR"]["sz"], 
+                                        style=pi["caR"]["style"],
+                                       )
+        self.expWin.SetBackgroundColour(pi["caR"]["bgCol"])
+        self.expWin.SetVirtualSize((THUMB_CELL[0]*16, THUMB_CELL[1]*16))
+        self.expWin.SetScrollRate(20, 20)
+        self.expWin.Bind(wx.EVT_PAINT, self.onEPaint)
+        self.expWin.Bind(wx.EVT_LEFT_DOWN, self.onExplorerClick)
+        self.expWin.Hide()
+
+        ##### beginning of setting up top UI panel interface -----
+        bw = 5 # border width for GridBagSizer
+        self.gbs["tUI"] = wx.GridBagSizer(0,0)
+        row = 0
+        col = 0
+        sTxt = self.setupStaticText(
+                                    self.panel["tUI"], 
+                                    "Rule number (Wolfram's 256 rules): ", 
+                                    font=self.fonts[2],
+                                   )
+        self.gbs["tUI"].Add(
+                            sTxt, 
+                            pos=(row,col), 
+                            flag=wx.ALIGN_CENTER_VERTICAL|wx.ALL, 
+                            border=bw,
+                           )
+        col += 1 
+        chkB= wx.CheckBox(
+                            self.panel["tUI"], 
+                            -1, 
+                            "Random",
+                            name="randRN_chkB",
+                            style=wx.CHK_2STATE
+                          )
+        chkB.Bind(wx.EVT_CHECKBOX, self.onCheckboxEvent)
+        chkB.SetValue(False)
+        self.gbs["tUI"].Add(
+                            chkB, 
+                            pos=(row,col), 
+                            flag=wx.ALIGN_CENTER_VERTICAL|wx.ALL, 
+                            border=bw,
+                           )
+        col += 1
+        spin = wx.SpinCtrl(
+                            self.panel["tUI"], 
+                            -1, 
+                            size=(50,-1), 
+                            min=0, 
+                            max=255, 
+                            initial=self.rn, 
+                            name='ruleN_spin',
+                            style=wx.SP_WRAP|wx.SP_ARROW_KEYS,
+                          )
+        self.gbs["tUI"].Add(
+                            spin, 
+                            pos=(row,col), 
+                            flag=wx.ALIGN_CENTER_VERTICAL|wx.ALL, 
+                            border=bw,
+                           )
+        col += 1
+        sTxt = self.setupStaticText(
+                                    self.panel["tUI"], 
+                                    'Initial line: ', 
+                                    font=self.fonts[2],
+                                   )
+        self.gbs["tUI"].Add(
+                            sTxt, 
+                            pos=(row,col), 
+                            flag=wx.ALIGN_CENTER_VERTICAL|wx.ALL, 
+                            border=bw,
+                           )
+        col += 1
+        cho = wx.Choice(
+                            self.panel["tUI"], 
+                            -1, 
+                            choices=['Center seed', 'Random'],
+                            name="initL_cho",
+                       )
+        self.gbs["tUI"].Add(
+                            cho, 
+                            pos=(row,col), 
+                            flag=wx.ALIGN_CENTER_VERTICAL|wx.ALL, 
+                            border=bw,
+                           )
+        col += 1
+        cho = wx.Choice(
+                            self.panel["tUI"], 
+                            -1, 
+                            choices=['Periodic', 'Unbounded'],
+                            name="bound_cho",
+                       )
+        cho.SetSelection(0)
+        self.gbs["tUI"].Add(
+                            cho, 
+                            pos=(row,col), 
+                            flag=wx.ALIGN_CENTER_VERTICAL|wx.ALL, 
+                            border=bw,
+                           )
+        col += 1
+        sTxt = self.setupStaticText(
+                                    self.panel["tUI"], 
+                                    'Seed: ', 
+                                    font=self.fonts[2],
+                                   )
+        self.gbs["tUI"].Add(
+                            sTxt, 
+                            pos=(row,col), 
+                            flag=wx.ALIGN_CENTER_VERTICAL|wx.ALL, 
+                            border=bw,
+                           )
+        col += 1
+        spin = wx.SpinCtrl(
+                            self.panel["tUI"], 
+                            -1, 
+                            size=(80,-1), 
+                            min=0, 
+                            max=2**31-1, 
+                            initial=0, 
+                            name='seed_spin',
+                            style=wx.SP_ARROW_KEYS,
+                          )
+        self.gbs["tUI"].Add(
+                            spin, 
+                            pos=(row,col), 
+                            flag=wx.ALIGN_CENTER_VERTICAL|wx.ALL, 
+                            border=bw,
+                           )
+        col += 1
+        sTxt = self.setupStaticText(
+                                    self.panel["tUI"], 
+                                    'Size: ', 
+                                    font=self.fonts[2],
+                                   )
+        self.gbs["tUI"].Add(
+                            sTxt, 
+                            pos=(row,col), 
+                            flag=wx.ALIGN_CENTER_VERTICAL|wx.ALL, 
+                            border=bw,
+                           )
+        col += 1
+        for name, val in [("width_spin", self.caRArrSz[1]),
+                          ("gen_spin", self.caRArrSz[0])]:
+            spin = wx.SpinCtrl(
+                                self.panel["tUI"], 
+                                -1, 
+                                size=(80,-1), 
+                                min=1, 
+                                max=10**7, 
+                                initial=val, 
+                                name=name,
+                                style=wx.SP_ARROW_KEYS,
+                              )
+            self.gbs["tUI"].Add(
+                                spin, 
+                                pos=(row,col), 
+                                flag=wx.ALIGN_CENTER_VERTICAL|wx.ALL, 
+                                border=bw,
+                               )
+            col += 1
+        for label, name in [("Run", "run_btn"), ("Queue", "queue_btn"),
+                            ("Stop", "stop_btn"), ("Explore", "explore_btn")]:
+            btn = wx.Button(
+                                self.panel["tUI"], 
+                                -1, 
+                                label=label, 
+                                name=name,
+                                style=wx.BU_EXACTFIT,
+                           )
+            btn.Bind(wx.EVT_LEFT_DOWN, self.onMouseDown)
+            self.gbs["tUI"].Add(
+                                btn, 
+                                pos=(row,col), 
+                                flag=wx.ALIGN_CENTER_VERTICAL|wx.ALL, 
+                                border=bw,
+                               )
+            col += 1
+        chkB= wx.CheckBox(
+                            self.panel["tUI"], 
+                            -1, 
+                            "Endless",
+                            name="endless_chkB",
+                            style=wx.CHK_2STATE
+                          )
+        chkB.Bind(wx.EVT_CHECKBOX, self.onCheckboxEvent)
+        chkB.SetValue(False)
+        self.gbs["tUI"].Add(
+                            chkB, 
+                            pos=(row,col), 
+                            flag=wx.ALIGN_CENTER_VERTICAL|wx.ALL, 
+                            border=bw,
+                           )
+        col += 1
+        self.panel["tUI"].SetSizer(self.gbs["tUI"])
+        self.gbs["tUI"].Layout()
+        self.panel["tUI"].SetupScrolling()
+        ##### end of setting up top UI panel interface -----
+
+        ### set up hot keys
+        idQuit = wx.Window.NewControlId()
+        self.Bind(wx.EVT_MENU, self.onClose, id=idQuit)
+        idProfile = wx.Window.NewControlId()
+        self.Bind(wx.EVT_MENU, self.onToggleProfile, id=idProfile)
+        idExport = wx.Window.NewControlId()
+        self.Bind(wx.EVT_MENU, self.onExportProfile, id=idExport)
+        idSave = wx.Window.NewControlId()
+        self.Bind(wx.EVT_MENU, self.onSaveResult, id=idSave)
+        accel_tbl = wx.AcceleratorTable([ 
+                                    (wx.ACCEL_CMD,  ord('Q'), idQuit), 
+                                    (wx.ACCEL_CMD,  ord('P'), idProfile), 
+                                    (wx.ACCEL_CMD,  ord('E'), idExport), 
+                                    (wx.ACCEL_CMD,  ord('S'), idSave), 
+                                        ]) 
+        self.SetAcceleratorTable(accel_tbl)
+
+        ### set up status-bar
+        ### (second field: profiling measures, see onToggleProfile())
+        self.statusbar = self.CreateStatusBar(2)
+        self.statusbar.SetStatusWidths([-1, -1])
+        self.sbBgCol = self.statusbar.GetBackgroundColour()
+        self.timers["sbTimer"] = None 
+
+    #-------------------------------------------------------------------
+
+    def setupFontsForWXApp(self, numFonts=5):
+        """ Set up fonts for wxPython application
+
+        Args:
+            numFonts (int): Number of fonts to return.
+
+        Returns:
+            fonts (list): List of wxPython fonts.
+        """
+        if DEBUG: print("CellularAutomata1DFrame.setupFontsForWXApp")
+        
+        ### fonts setup
+        if 'darwin' in sys.platform: _font = "Monaco"
+        else: _font = "Courier"
+        fontSz = 8
+        fonts = []  # larger fonts as index gets larger 
+        for i in range(numFonts):
+            fonts.append(
+                            wx.Font(
+                                    fontSz, 
+                                    wx.FONTFAMILY_SWISS, 
+                                    wx.FONTSTYLE_NORMAL, 
+                                    wx.FONTWEIGHT_BOLD,
+                                    False, 
+                                    faceName=_font,
+                                   )
+                        )
+            fontSz += 2
+        return fonts
+
+    #-------------------------------------------------------------------
+   
+    def setupStaticText(self, panel, label, name=None, size=None, 
+                        wrapWidth=None, font=None, fgColor=None, bgColor=None):
+        """ Initialize wx.StatcText widget with more options
+        
+        Args:
+            panel (wx.Panel): Panel to display wx.StaticText.
+            label (str): String to show in wx.StaticText.
+            name (str, optional): Name of the widget.
+            size (tuple, optional): Size of the widget.
+            wrapWidth (int, optional): Width for text wrapping.
+            font (wx.Font, optional): Font for wx.StaticText.
+            fgColor (wx.Colour, optional): Foreground color 
+            bgColor (wx.Colour, optional): Background color 
+
+        Returns:
+            wx.StaticText: Created wx.StaticText object.
+        """ 
+        if DEBUG: print("CellularAutomata1DFrame.setupStaticText()")
+
+        sTxt = wx.StaticText(panel, -1, label)
+        if name != None: sTxt.SetName(name)
+        if size != None: sTxt.SetSize(size)
+        if wrapWidth != None: sTxt.Wrap(wrapWidth)
+        if font != None: sTxt.SetFont(font)
+        if fgColor != None: sTxt.SetForegroundColour(fgColor) 
+        if bgColor != None: sTxt.SetBackgroundColour(bgColor)
+        return sTxt
+
+    #-------------------------------------------------------------------
+    
+    def updateFrameSize(self):
+        """ Set window size exactly to self.w_sz without menubar/border/etc.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("CellularAutomata1DFrame.updateFrameSize()")
+
+        ### set window size exactly to self.w_sz 
+        ### without menubar/border/etc.
+        _diff = (self.GetSize()[0]-self.GetClientSize()[0], 
+                 self.GetSize()[1]-self.GetClientSize()[1])
+        _sz = (self.w_sz[0]+_diff[0], self.w_sz[1]+_diff[1])
+        self.SetSize(_sz) 
+        self.Refresh()
+    
+    #-------------------------------------------------------------------
+    
+    def onCheckboxEvent(self, event):
+        """ wx.CHECKBOX was clicked. 
+        
+        Args: event (wx.Event) 
+
+        Returns: None
+        """
+        if DEBUG: print("CellularAutomata1DFrame.onCheckboxEvent()")
+        
+        obj = event.GetEventObject()
+        objName = obj.GetName()
+        if objName == "randRN_chkB": # random rule number checkbox was clicked
+            # enable/disable manual rule number selection widget
+            spin = wx.FindWindowByName("ruleN_spin", self.panel["tUI"])
+            if obj.GetValue() == True: spin.Disable()
+            else: spin.Enable()
+        elif objName == "endless_chkB":
+            self.setEndless(obj.GetValue())
+
+    #-------------------------------------------------------------------
+
+    def onMouseDown(self, event):
+        """ Mouse button pressed down.
+        
+        Args: event (wx.Event) 
+
+        Returns: None
+        """
+        if DEBUG: print("CellularAutomata1DFrame.onMouseDown()")
+
+        obj = event.GetEventObject()
+        objName = obj.GetName()
+        if objName == "run_btn": self.runCAThread(preempt=True)
+        elif objName == "queue_btn": self.runCAThread(preempt=False)
+        elif objName == "stop_btn": self.runner.cancel()
+        elif objName == "explore_btn": self.toggleExplorer()
+    
+    #-------------------------------------------------------------------
+  
+    def runCAThread(self, preempt=True):
+        """ Submit a CA run with the current parameters to the worker
+        thread.
+
+        Args:
+            preempt (bool): Cancel the running job and queued jobs and
+                start this one right away; otherwise queue it.
+
+        Returns: None
+        """
+        if DEBUG: print("CellularAutomata1DFrame.runCAThread()")
+
+        if self.endless != None:
+            wx.FindWindowByName("endless_chkB",
+                                self.panel["tUI"]).SetValue(False)
+            self.setEndless(False)
+        job = self.jobParams()
+        self.runner.submit(job, preempt)
+        if not preempt:
+            self.showStatusBarMsg("Queued: rule %i (%i job(s) waiting)"%(
+                                        job["ruleNum"], self.runner.nQueued()))
+
+    #-------------------------------------------------------------------
+
+    def jobParams(self):
+        """ Job parameters from the current values of the top panel.
+
+        Args: None
+
+        Returns:
+            job (dict): See runCA().
+        """
+        w = wx.FindWindowByName("width_spin", self.panel["tUI"]).GetValue()
+        h = wx.FindWindowByName("gen_spin", self.panel["tUI"]).GetValue()
+
+        ### the first line
+        cho = wx.FindWindowByName("initL_cho", self.panel["tUI"])
+        initL = cho.GetString(cho.GetSelection()).lower()
+        seed = wx.FindWindowByName("seed_spin", self.panel["tUI"]).GetValue()
+        line = makeInitLine(w, initL, seed)
+        cho = wx.FindWindowByName("bound_cho", self.panel["tUI"])
+        boundary = cho.GetString(cho.GetSelection()).lower()
+
+        ### rule number
+        chkB = wx.FindWindowByName("randRN_chkB", self.panel["tUI"])
+        rnSpin = wx.FindWindowByName("ruleN_spin", self.panel["tUI"])
+        if chkB.GetValue() == True:
+            ruleNum = randint(0, 255)
+            rnSpin.SetValue(ruleNum)
+        else:
+            ruleNum = rnSpin.GetValue()
+
+        return dict(w=w, h=h, initL=initL, seed=seed, line=line,
+                    ruleNum=ruleNum, boundary=boundary)
+
+    #-------------------------------------------------------------------
+
+    def onRunStart(self, job, arr, pyr):
+        """ The worker thread started a job; show its result while it is
+        being computed.
+
+        Args:
+            job (dict): Job parameters.
+            arr (numpy.ndarray): Result image array being filled.
+            pyr (ecaRender.Pyramid): Levels of detail of arr.
+
+        Returns: None
+        """
+        if DEBUG: print("CellularAutomata1DFrame.onRunStart()")
+
+        self.caJob = job
+        self.rn = job["ruleNum"]
+        self.rule = '{0:08b}'.format(self.rn)
+        self.panel["rul"].Refresh() # draw rules
+        self.setResult(arr, pyr)
+
+    #-------------------------------------------------------------------
+
+    def postProgress(self, rowsDone):
+        """ Called in the worker thread when rows were computed.
+        Progress events to the main thread are throttled and coalesced;
+        at most one is pending at a time.
+
+        Args:
+            rowsDone (int): Number of computed rows.
+
+        Returns: None
+        """
+        prog = self.prog
+        prog["rowsDone"] = rowsDone
+        now = time()
+        if prog["pending"] or now - prog["lastPost"] < self.progInterval:
+            return
+        prog["pending"] = True
+        prog["lastPost"] = now
+        prog["postTime"] = perf_counter()
+        wx.CallAfter(self.onProgress)
+
+    #-------------------------------------------------------------------
+
+    def onProgress(self):
+        """ Show progress and the newly computed band of rows.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("CellularAutomata1DFrame.onProgress()")
+
+        prog = self.prog
+        prog["pending"] = False
+        if PROFILER.enabled and prog.get("postTime") != None:
+            # time the event waited in the main thread's queue
+            PROFILER.counter("queueLatency", perf_counter()-prog["postTime"])
+            prog["postTime"] = None
+        r0, r1 = prog["rowsShown"], prog["rowsDone"]
+        if r1 > r0 and self.caRArr is not None:
+            prog["rowsShown"] = r1
+            self.view.invalidate(r0, r1)
+            self.panel["caR"].Refresh()
+            h = self.caRArr.shape[0]
+            self.showStatusBarMsg("Progress: %.1f %%"%(float(r1)/h*100))
+        if PROFILER.enabled:
+            self.statusbar.SetStatusText(PROFILER.statusText(), 1)
+
+    #-------------------------------------------------------------------
+
+    def onRunDone(self, info):
+        """ The worker thread finished a run.
+
+        Args:
+            info (dict): Run information from ecaEngine.runECA().
+
+        Returns: None
+        """
+        if DEBUG: print("CellularAutomata1DFrame.onRunDone()")
+
+        self.onProgress()
+        if info["cancelled"]:
+            msg = "Cancelled: rule %i at row %i"%(info["rule"],
+                                                  info["rowsDone"])
+        else:
+            msg = "Done: rule %i, %i x %i, %.3f s"%(info["rule"], info["h"],
+                                                info["w"], info["elapsed"])
+            if info.get("cached", False): msg += " (cached)"
+        if info["period"] != None:
+            msg += " (transient: %i, period: %i)"%(info["transient"],
+                                                  info["period"])
+        nQ = self.runner.nQueued()
+        if nQ > 0: msg += ", %i job(s) waiting"%(nQ)
+        self.showStatusBarMsg(msg)
+
+    #-------------------------------------------------------------------
+
+    def onRunError(self, job, exc):
+        """ A job failed in the worker thread; the worker goes on with
+        the next job.
+
+        Args:
+            job (dict): Job parameters.
+            exc (Exception): The exception raised by the job.
+
+        Returns: None
+        """
+        if DEBUG: print("CellularAutomata1DFrame.onRunError()")
+
+        msg = "Failed: rule %i, %s: %s"%(job["ruleNum"],
+                                         type(exc).__name__, exc)
+        nQ = self.runner.nQueued()
+        if nQ > 0: msg += ", %i job(s) waiting"%(nQ)
+        self.showStatusBarMsg(msg)
+
+    #-------------------------------------------------------------------
+
+    def runCA(self, job, cancel):
+        """ Make a result array of Cellular automata.
+        Runs in the worker thread of self.runner; rows are written into
+        a result array shared with the main thread (a memory-mapped
+        history file beyond MEM_CELLS cells) and only row counts are sent
+        back.
+
+        Args:
+            job (dict): Job parameters; w (width of each line),
+                h (number of generations), initL and seed (initial line
+                spec), line (the first line), ruleNum (rule number
+                among Wolfram's rules, 0-255) and boundary ('periodic'
+                or 'unbounded').
+            cancel (threading.Event): Set when the job should stop.
+
+        Returns: None
+        """
+        if DEBUG: print("CellularAutomata1DFrame.runCA()")
+
+        w, h = job["w"], job["h"]
+        unbounded = job["boundary"] == "unbounded"
+        spec = runSpec(job["ruleNum"], w, h, job["initL"], job["seed"],
+                       boundary=job["boundary"])
+        inMem = w*h <= MEM_CELLS
+        if inMem: hit = self.cache.get(spec)
+        else: hit = None
+        if hit != None: # same run was done before
+            caRArr, info = hit
+            pyr = Pyramid(caRArr)
+            self.prog.update(rowsDone=h, rowsShown=0, lastPost=0.0,
+                             pending=False)
+            wx.CallAfter(self.onRunStart, job, caRArr, pyr)
+            wx.CallAfter(self.onRunDone, dict(info, cached=True))
+            return
+        if inMem:
+            caRArr = np.zeros((h, w), np.uint8)
+            pyr = Pyramid(caRArr, build=False)
+        else: # history and levels of detail in memory-mapped files
+            fps = []
+            for suffix in (".eca", ".lod"):
+                fd, fp = tempfile.mkstemp(suffix=suffix)
+                os.close(fd)
+                fps.append(fp)
+            if unbounded: # not resumable; a plain memory-mapped array
+                caRArr = np.memmap(fps[0], np.uint8, "w+", shape=(h, w))
+            else:
+                caRArr = createHistory(fps[0], job["ruleNum"], w, h,
+                                       job["line"])
+            pyr = Pyramid(caRArr, build=False, fp=fps[1])
+            for fp in fps:
+                try: os.remove(fp) # the mappings stay valid
+                except OSError: pass
+        self.prog.update(rowsDone=0, rowsShown=0, lastPost=0.0,
+                         pending=False)
+        wx.CallAfter(self.onRunStart, job, caRArr, pyr)
+
+        def showBand(row0, row1, arr):
+            with PROFILER.span("pyramid", rows=row1-row0):
+                pyr.update(row0, row1) # levels of detail of the new band
+            self.postProgress(row1)
+        callback = chunkTimer(showBand) # times the chunks when profiling
+        chunkRows = max(1, min(int(h/100), int(2**20/w))) # rows per band
+        if isinstance(caRArr, np.ndarray):
+            if unbounded: run = runUnbounded
+            elif w >= PAR_WIDTH and (os.cpu_count() or 1) > 1:
+                if self.stepper == None: self.stepper = ParallelStepper()
+                run = self.stepper.run
+            else: run = runECA
+            _, info = run(job["ruleNum"], w, h, job["line"], out=caRArr,
+                          callback=callback, chunkRows=chunkRows,
+                          cancel=cancel)
+        else:
+            info = caRArr.run(callback, chunkRows, cancel=cancel)
+        self.prog["rowsDone"] = info["rowsDone"]
+        wx.CallAfter(self.onRunDone, info)
+        # after the result is shown; writes a file when cacheDir is set
+        if inMem and not info["cancelled"]: self.cache.put(spec, caRArr, info)
+
+    #-------------------------------------------------------------------
+    
+    def onRPaint(self, event):
+        """ Painting CA rule.
+
+        Args: event (wx.Event)
+
+        Returns: None
+        """ 
+        if DEBUG: print("CellularAutomata1DFrame.onRPaint()")
+        
+        evtObj = event.GetEventObject()
+        dc = wx.PaintDC(evtObj)
+        pBCol = self.pi["rul"]["bgCol"]
+        dc.SetBackground(wx.Brush(pBCol))
+        dc.Clear()
+
+        if self.rule == None: return
+        rL = [int(x) for x in self.rule]
+
+        ### draw rule number 
+        font = self.fonts[2]
+        fw = font.GetPixelSize()[0]
+        dc.SetFont(font)
+        texts = ['Rule %i:'%(self.rn)]; coords = [(5,0)]
+        fg = [wx.Colour('#000000')]; bg = [wx.Colour(pBCol)]
+        dc.DrawTextList( texts, coords, fg, bg)
+        lblW = coords[0][0] + fw * (len(texts[0])+1) # width of label
+
+        ### set up for drawing rule boxes
+        dc.SetPen(wx.Pen('#000000', 1))
+        ph = self.pi["rul"]["sz"][1] # panel height
+        m = 2 # margin between outer rectangle
+        lrw = ph # outer rectangle width
+        lrh = int(ph*0.66) # height
+        lc = int(ph/3) # small cube size
+        states = [[1,1,1], [1,1,0],
+                  [1,0,1], [1,0,0],
+                  [0,1,1], [0,1,0],
+                  [0,0,1], [0,0,0]]
+        y = 1
+        ### draw rule boxes
+        for i in range(len(rL)):
+            x = lblW + lrw*i + m*i # starting x-coordinate for this outer rect.
+            dc.SetBrush(wx.Brush(pBCol))
+            dc.DrawRectangle(0+x, y, lrw, lrh) # outer rectangle
+            x += 1
+            ### drawing current cell states
+            for si in range(len(states[i])):
+                if states[i][si] == 0: col = '#ffffff'
+                else: col = '#000000'
+                dc.SetBrush(wx.Brush(col))
+                dc.DrawRectangle(x+lc*si, y, lc, lc)
+            ### drawing next cell state
+            if rL[i] == 0: col = '#ffffff'
+            else: col = '#000000'
+            dc.SetBrush(wx.Brush(col))
+            dc.DrawRectangle(x+lc, y+lc, lc, lc)
+    
+    #-------------------------------------------------------------------
+   
+    def onPaint(self, event):
+        """ Painting CA result.
+
+        Args: event (wx.Event)
+
+        Returns: None
+        """ 
+        if DEBUG: print("CellularAutomata1DFrame.onPaint()")
+
+        evtObj = event.GetEventObject()
+        dc = wx.PaintDC(evtObj)
+        if self.endless != None: # back buffer of the endless mode
+            self.drawEndlessView(dc)
+            return
+        dc.SetBackground(wx.Brush('#cccccc'))
+        dc.Clear()
+        if self.caRArr is None: return
+      
+        ### draw visible tiles of CA result
+        with PROFILER.span("paint"):
+            self.view.draw(dc, evtObj.GetClientSize())
+    
+    #-------------------------------------------------------------------
+
+    def setEndless(self, on):
+        """ Start or stop the endless mode; generations keep flowing
+        from the bottom of the view. Only the rows and columns on screen
+        are kept, in a ring buffer (ecaHistory.RingHistory), and drawn
+        into a circular back buffer. A timer runs only while the mode
+        is on.
+
+        Args:
+            on (bool): Start the mode.
+
+        Returns: None
+        """
+        if DEBUG: print("CellularAutomata1DFrame.setEndless()")
+
+        timer = self.timers.get("endless")
+        if timer != None:
+            timer.Stop()
+            self.Unbind(wx.EVT_TIMER, source=timer)
+            self.timers["endless"] = None
+        self.endless = None
+        panel = self.panel["caR"]
+        if on:
+            self.runner.cancel()
+            self.toggleExplorer(False)
+            job = self.jobParams()
+            self.rn = job["ruleNum"]
+            self.rule = '{0:08b}'.format(self.rn)
+            self.panel["rul"].Refresh() # draw rules
+            pw, ph = panel.GetClientSize()
+            pw, ph = max(1, pw), max(1, ph)
+            w = job["w"]
+            x0 = max(0, (w-pw)//2) # visible cells
+            cw = min(w, pw)
+            ring = RingHistory(job["ruleNum"], w, ph, job["line"],
+                               cols=(x0, x0+cw))
+            bmp = wx.Bitmap(pw, ph)
+            mdc = wx.MemoryDC(bmp)
+            mdc.SetBackground(wx.Brush('#cccccc'))
+            mdc.Clear()
+            mdc.SelectObject(wx.NullBitmap)
+            # generation g is drawn in row g % ph of bmp
+            self.endless = dict(ring=ring, bmp=bmp, sz=(pw, ph), frames=0)
+            self.drawEndlessRows(0, 1)
+            timer = wx.Timer(self)
+            self.Bind(wx.EVT_TIMER, self.onEndlessTimer, timer)
+            self.timers["endless"] = timer
+            timer.Start(ENDLESS_MS)
+        panel.Refresh()
+
+    #-------------------------------------------------------------------
+
+    def onEndlessTimer(self, event):
+        """ Compute the next generations of the endless mode and
+        scroll them into the view.
+
+        Args: event (wx.Event)
+
+        Returns: None
+        """
+        es = self.endless
+        if es == None: return
+        with PROFILER.span("endlessFrame", rows=ENDLESS_ROWS):
+            ring = es["ring"]
+            g = ring.step(ENDLESS_ROWS)
+            self.drawEndlessRows(g-ENDLESS_ROWS+1, g+1)
+            self.drawEndlessView(wx.ClientDC(self.panel["caR"]))
+        es["frames"] += 1
+        if es["frames"] % 30 == 0:
+            self.statusbar.SetStatusText("Endless: rule %i, generation %i"%(
+                                                        ring.ruleNum, g))
+
+    #-------------------------------------------------------------------
+
+    def drawEndlessRows(self, g0, g1):
+        """ Draw generations [g0, g1) into the circular back buffer;
+        nothing else of the buffer is touched.
+
+        Args:
+            g0, g1 (int): Generations; must be in the ring.
+
+        Returns: None
+        """
+        es = self.endless
+        ph = es["sz"][1]
+        g0 = max(g0, g1-ph)
+        rgb = toRGB(es["ring"].rows(g0, g1))
+        mdc = wx.MemoryDC(es["bmp"])
+        while g0 < g1: # in up to two parts, when wrapping around
+            y = g0 % ph
+            n = min(g1-g0, ph-y)
+            part = rgb[:n]
+            rgb = rgb[n:]
+            mdc.DrawBitmap(wx.Bitmap(wx.Image(part.shape[1], n,
+                                              part.tobytes())), 0, y)
+            g0 += n
+        mdc.SelectObject(wx.NullBitmap)
+
+    #-------------------------------------------------------------------
+
+    def drawEndlessView(self, dc):
+        """ Draw the circular back buffer with the latest generation at
+        the bottom (two blits).
+
+        Args:
+            dc (wx.DC): Device context of the view.
+
+        Returns: None
+        """
+        es = self.endless
+        pw, ph = es["sz"]
+        top = (es["ring"].gen+1) % ph # row of the oldest generation
+        mdc = wx.MemoryDC(es["bmp"])
+        dc.Blit(0, 0, pw, ph-top, mdc, 0, top)
+        if top > 0: dc.Blit(0, ph-top, pw, top, mdc, 0, 0)
+        mdc.SelectObject(wx.NullBitmap)
+
+    #-------------------------------------------------------------------
+
+    def toggleExplorer(self, show=None):
+        """ Show or hide the rule explorer in place of CA result.
+
+        Args:
+            show (bool, optional): Show it; toggle when None.
+
+        Returns: None
+        """
+        if DEBUG: print("CellularAutomata1DFrame.toggleExplorer()")
+
+        if show == None: show = not self.expWin.IsShown()
+        if show and self.endless != None:
+            wx.FindWindowByName("endless_chkB",
+                                self.panel["tUI"]).SetValue(False)
+            self.setEndless(False)
+        self.expWin.Show(show)
+        self.panel["caR"].Show(not show)
+        if show: self.expWin.Refresh()
+
+    #-------------------------------------------------------------------
+
+    def thumbParams(self):
+        """ First line spec (initL, seed) of the thumbnails; the
+        current 'Initial line' and 'Seed' values.
+        """
+        cho = wx.FindWindowByName("initL_cho", self.panel["tUI"])
+        initL = cho.GetString(cho.GetSelection()).lower()
+        if initL != "random": return initL, None
+        seed = wx.FindWindowByName("seed_spin", self.panel["tUI"]).GetValue()
+        return initL, seed
+
+    #-------------------------------------------------------------------
+
+    def onEPaint(self, event):
+        """ Painting visible thumbnails of the rule explorer; missing
+        ones are requested from the worker threads of self.thumbs and
+        painted when they are ready (onThumbsReady).
+
+        Args: event (wx.Event)
+
+        Returns: None
+        """
+        if DEBUG: print("CellularAutomata1DFrame.onEPaint()")
+
+        win = self.expWin
+        dc = wx.PaintDC(win)
+        win.DoPrepareDC(dc)
+        dc.SetBackground(wx.Brush(self.pi["caR"]["bgCol"]))
+        dc.Clear()
+        dc.SetFont(self.fonts[1])
+        initL, seed = self.thumbParams()
+        cw, ch = THUMB_CELL
+        ### visible grid cells
+        x0, y0 = win.CalcUnscrolledPosition(0, 0)
+        pw, ph = win.GetClientSize()
+        c0, c1 = max(0, x0//cw), min(16, (x0+pw)//cw + 1)
+        r0, r1 = max(0, y0//ch), min(16, (y0+ph)//ch + 1)
+        missing = []
+        for row in range(r0, r1):
+            for col in range(c0, c1):
+                rn = row*16 + col
+                x, y = col*cw + 4, row*ch + 4
+                dc.DrawText("%i"%(rn), x, y)
+                rgb = self.thumbs.get(rn, initL, seed)
+                if rgb is None:
+                    missing.append(rn)
+                    continue
+                th, tw = rgb.shape[:2]
+                img = wx.Image(tw, th, rgb.tobytes())
+                if (tw, th) != (THUMB_SZ, THUMB_SZ):
+                    img = img.Scale(THUMB_SZ, THUMB_SZ)
+                dc.DrawBitmap(wx.Bitmap(img), x, y+14)
+        if len(missing) > 0: self.thumbs.request(missing, initL, seed)
+
+    #-------------------------------------------------------------------
+
+    def onThumbsReady(self):
+        """ Thumbnails were computed.
+
+        Args: None
+
+        Returns: None
+        """
+        if self.expWin.IsShown(): self.expWin.Refresh()
+
+    #-------------------------------------------------------------------
+
+    def onExplorerClick(self, event):
+        """ Run the clicked rule at full size.
+
+        Args: event (wx.Event)
+
+        Returns: None
+        """
+        if DEBUG: print("CellularAutomata1DFrame.onExplorerClick()")
+
+        x, y = self.expWin.CalcUnscrolledPosition(event.GetPosition())
+        col, row = x // THUMB_CELL[0], y // THUMB_CELL[1]
+        if not (0 <= col < 16 and 0 <= row < 16): return
+        wx.FindWindowByName("randRN_chkB", self.panel["tUI"]).SetValue(False)
+        wx.FindWindowByName("ruleN_spin", self.panel["tUI"]).SetValue(
+                                                                row*16+col)
+        self.toggleExplorer(False)
+        self.runCAThread(preempt=True)
+
+    #-------------------------------------------------------------------
+
+    def setResult(self, arr, pyr):
+        """ Set a new CA result and invalidate the cached tiles.
+
+        Args:
+            arr (numpy.ndarray or ecaHistory.HistoryStore): Result.
+            pyr (ecaRender.Pyramid): Levels of detail of arr.
+
+        Returns: None
+        """
+        if DEBUG: print("CellularAutomata1DFrame.setResult()")
+
+        self.caRArr = arr
+        self.view.setPyramid(pyr)
+        self.panel["caR"].Refresh() # draw result
+
+    #-------------------------------------------------------------------
+
+    def onViewMouse(self, event):
+        """ Zoom (mouse wheel), pan (drag) or fit (double click)
+        the view of CA result.
+
+        Args: event (wx.Event)
+
+        Returns: None
+        """
+        panel = self.panel["caR"]
+        pos = event.GetPosition()
+        if event.GetEventType() == wx.wxEVT_MOUSEWHEEL:
+            rot = event.GetWheelRotation() / max(1, event.GetWheelDelta())
+            self.view.zoomAt(1.25**rot, pos[0], pos[1])
+            panel.Refresh()
+        elif event.LeftDClick():
+            self.view.fit(*panel.GetClientSize())
+            panel.Refresh()
+        elif event.LeftDown():
+            self.dragPos = pos
+            if not panel.HasCapture(): panel.CaptureMouse()
+        elif event.Dragging() and self.dragPos != None:
+            self.view.pan(pos[0]-self.dragPos[0], pos[1]-self.dragPos[1])
+            self.dragPos = pos
+            panel.Refresh()
+        elif event.LeftUp():
+            self.dragPos = None
+            if panel.HasCapture(): panel.ReleaseMouse()
+        event.Skip()
+
+    #-------------------------------------------------------------------
+    
+    def showStatusBarMsg(self, txt, delTime=0):
+        """ Show message on status bar
+        """
+        if DEBUG: print("CellularAutomata1DFrame.showStatusBarMsg")
+        if self.timers["sbTimer"] != None:
+            self.timers["sbTimer"].Stop()
+            self.timers["sbTimer"] = None
+        self.statusbar.SetStatusText(txt)
+        if txt == '': bgCol = self.sbBgCol 
+        else: bgCol = '#99ee99'
+        self.statusbar.SetBackgroundColour(bgCol)
+        if txt != '' and delTime != 0:
+            self.timers["sbTimer"] = wx.CallLater(delTime,
+                                                  self.showStatusBarMsg, '')
+
+    #-------------------------------------------------------------------
+
+    def onSaveResult(self, event):
+        """ Export the rows of the current result computed so far
+        (Ctrl+S); the file is written in a separate thread.
+
+        Args: event (wx.Event)
+
+        Returns: None
+        """
+        if DEBUG: print("CellularAutomata1DFrame.onSaveResult()")
+
+        if self.caRArr is None: return
+        wildcard = "1-bit PNG image (*.png)|*.png|" + \
+                   "Bit-packed NumPy with run information (*.npz)|*.npz|" + \
+                   "Row-delta stream (*.ecarle)|*.ecarle"
+        dlg = wx.FileDialog(self, "Export result", wildcard=wildcard,
+                            defaultFile="eca_rule%i.png"%(self.rn),
+                            style=wx.FD_SAVE|wx.FD_OVERWRITE_PROMPT)
+        if dlg.ShowModal() == wx.ID_OK: fp = dlg.GetPath()
+        else: fp = None
+        dlg.Destroy()
+        if fp == None: return
+        job = self.caJob
+        info = dict(rule=job["ruleNum"], initL=job["initL"],
+                    boundary=job["boundary"])
+        if job["initL"] == "random": info["seed"] = job["seed"]
+        arr = self.caRArr
+        nRows = self.prog["rowsDone"]
+
+        def save():
+            try: exportResult(fp, arr, info, nRows)
+            except Exception as e:
+                wx.CallAfter(self.showStatusBarMsg, "Export failed: %s"%(e))
+            else:
+                wx.CallAfter(self.showStatusBarMsg, "Exported %i rows to %s"%(
+                                                        nRows, fp), 5000)
+        self.showStatusBarMsg("Exporting %i rows to %s .."%(nRows, fp))
+        threading.Thread(target=save, daemon=True).start()
+
+    #-------------------------------------------------------------------
+
+    def onToggleProfile(self, event):
+        """ Switch profiling of runs and painting on or off (Ctrl+P).
+
+        Args: event (wx.Event)
+
+        Returns: None
+        """
+        if DEBUG: print("CellularAutomata1DFrame.onToggleProfile()")
+
+        PROFILER.enabled = not PROFILER.enabled
+        if PROFILER.enabled:
+            PROFILER.reset()
+            self.statusbar.SetStatusText("Profiling..", 1)
+        else:
+            self.statusbar.SetStatusText("", 1)
+
+    #-------------------------------------------------------------------
+
+    def onExportProfile(self, event):
+        """ Save the profiling records as a Chrome trace (Ctrl+E).
+
+        Args: event (wx.Event)
+
+        Returns: None
+        """
+        if DEBUG: print("CellularAutomata1DFrame.onExportProfile()")
+
+        fp = "eca_profile_%s.trace.json"%(strftime("%Y%m%d_%H%M%S"))
+        PROFILER.exportChromeTrace(fp)
+        self.showStatusBarMsg("Saved profile: %s"%(os.path.abspath(fp)),
+                              5000)
+
+    #-------------------------------------------------------------------
+
+    def onClose(self, event):
+        """ Close this frame.
+
+        Args: event (wx.Event)
+
+        Returns: None
+        """
+        if DEBUG: print("CellularAutomata1DFrame.onClose()")
+
+        for k in self.timers.keys():
+            if self.timers[k] != None: self.timers[k].Stop()
+        self.runner.stop(timeout=2.0)
+        if self.stepper != None and not self.runner.th.is_alive():
+            self.stepper.close()
+        self.thumbs.close()
+        self.Destroy()
+
+    #-------------------------------------------------------------------
+
+#=======================================================================
+
+class TiledView:
+    """ Zoomable and pannable view of a CA result.
+    Only visible tiles are converted to bitmaps, from the pyramid level
+    that matches the zoom; tile bitmaps are kept in an LRU cache.
+
+    Attributes:
+        pyr (ecaRender.Pyramid): Levels of detail of CA result.
+        zoom (float): Screen pixels per cell.
+        ox, oy (float): Cell coordinates at the top-left of the view.
+        cache (OrderedDict): Tile bitmaps.
+        maxTiles (int): Maximum number of cached tile bitmaps.
+    """
+    def __init__(self, maxTiles=512):
+        if DEBUG: print("TiledView.__init__()")
+
+        self.pyr = None
+        self.zoom = 1.0
+        self.ox = 0.0
+        self.oy = 0.0
+        self.cache = OrderedDict()
+        self.maxTiles = maxTiles
+
+    #-------------------------------------------------------------------
+
+    def setPyramid(self, pyr):
+        """ Show a new result.
+
+        Args:
+            pyr (ecaRender.Pyramid): Levels of detail of CA result.
+
+        Returns: None
+        """
+        if DEBUG: print("TiledView.setPyramid()")
+
+        self.pyr = pyr
+        self.invalidate()
+
+    #-------------------------------------------------------------------
+
+    def invalidate(self, r0=None, r1=None):
+        """ Drop cached tiles.
+
+        Args:
+            r0, r1 (int, optional): Drop only tiles over cell rows
+                [r0, r1); all tiles if None.
+
+        Returns: None
+        """
+        if r0 == None:
+            self.cache.clear()
+            return
+        for key in list(self.cache.keys()):
+            lvl, T, ty = key[:3]
+            cy0 = ty * T * 2**lvl
+            if cy0 < r1 and cy0 + T * 2**lvl > r0: del self.cache[key]
+
+    #-------------------------------------------------------------------
+
+    def zoomAt(self, factor, mx, my):
+        """ Zoom keeping the cell under the mouse pointer in place.
+
+        Args:
+            factor (float): Zoom factor.
+            mx, my (int): Mouse position in the view.
+
+        Returns: None
+        """
+        if self.pyr == None: return
+        cx = self.ox + mx / self.zoom
+        cy = self.oy + my / self.zoom
+        minZoom = 1.0 / 2**self.pyr.nLevels
+        self.zoom = min(64.0, max(minZoom, self.zoom * factor))
+        self.ox = cx - mx / self.zoom
+        self.oy = cy - my / self.zoom
+
+    #-------------------------------------------------------------------
+
+    def pan(self, dx, dy):
+        """ Move the view by (dx, dy) screen pixels.
+        """
+        self.ox -= dx / self.zoom
+        self.oy -= dy / self.zoom
+
+    #-------------------------------------------------------------------
+
+    def fit(self, pw, ph):
+        """ Zoom to show the whole result in a (pw, ph) view.
+        """
+        if self.pyr == None: return
+        h, w = self.pyr.shape(0)
+        self.zoom = min(float(pw) / w, float(ph) / h)
+        self.ox = 0.0
+        self.oy = 0.0
+
+    #-------------------------------------------------------------------
+
+    def tileBmp(self, lvl, T, ty, tx, s):
+        """ Bitmap of a tile scaled by s (from the cache if possible).
+        """
+        key = (lvl, T, ty, tx, s)
+        bmp = self.cache.get(key)
+        if bmp != None:
+            self.cache.move_to_end(key)
+            return bmp
+        with PROFILER.span("tileBitmap", lvl=lvl):
+            rgb = self.pyr.tileRGB(lvl, ty, tx, T)
+            th, tw = rgb.shape[:2]
+            img = wx.Image(tw, th, rgb.tobytes())
+            bw, bh = int(ceil(tw * s)), int(ceil(th * s))
+            if (bw, bh) != (tw, th):
+                img = img.Scale(bw, bh, wx.IMAGE_QUALITY_NORMAL)
+            bmp = wx.Bitmap(img)
+        self.cache[key] = bmp
+        if len(self.cache) > self.maxTiles: self.cache.popitem(last=False)
+        return bmp
+
+    #-------------------------------------------------------------------
+
+    def draw(self, dc, sz):
+        """ Draw visible tiles.
+
+        Args:
+            dc (wx.DC): Device context.
+            sz (wx.Size): Size of the view.
+
+        Returns: None
+        """
+        if DEBUG: print("TiledView.draw()")
+
+        if self.pyr == None: return
+        pw, ph = sz
+        lvl = 0
+        if self.zoom < 1:
+            lvl = min(self.pyr.nLevels-1, int(floor(log2(1.0/self.zoom))))
+        d = 2**lvl # cells per pixel of the level
+        s = self.zoom * d # screen pixels per pixel of the level
+        T = max(16, int(self.pyr.tileSz / max(1.0, s))) # tile size
+        lh, lw = self.pyr.shape(lvl)
+        lx0, ly0 = self.ox / d, self.oy / d # view in level pixels
+        lx1, ly1 = lx0 + pw / s, ly0 + ph / s
+        tx0 = max(0, int(floor(lx0 / T)))
+        tx1 = min(int(ceil(float(lw) / T)), int(ceil(lx1 / T)))
+        ty0 = max(0, int(floor(ly0 / T)))
+        ty1 = min(int(ceil(float(lh) / T)), int(ceil(ly1 / T)))
+        for ty in range(ty0, ty1):
+            for tx in range(tx0, tx1):
+                bmp = self.tileBmp(lvl, T, ty, tx, s)
+                dc.DrawBitmap(bmp, int(floor((tx*T - lx0) * s)),
+                                   int(floor((ty*T - ly0) * s)))
+
+#=======================================================================
+
+class CA1DApp(wx.App):
+    """ Initializing CellularAutomata1D app with CellularAutomata1DFrame.
+
+    Attributes:
+        frame (wx.Frame): CellularAutomata1DFrame frame.
+        cacheDir (str): Directory of the result cache (None: memory only).
+    """
+    def __init__(self, cacheDir=None, **kwargs):
+        self.cacheDir = cacheDir # before wx.App.__init__() calls OnInit()
+        wx.App.__init__(self, **kwargs)
+
+    def OnInit(self):
+        if DEBUG: print("CA1DApp.OnInit()")
+        self.frame = CellularAutomata1DFrame(self.cacheDir)
+        self.frame.Show()
+        self.SetTopWindow(self.frame)
+        return True
+
+#=======================================================================
@@ -0,0 +1,234 @@
+# coding: UTF-8
+""" Generalized one dimensional cellular automata: radius-r
+neighborhoods, k colors and totalistic rules.
+
+A rule number (any size; Python int) is read as base-k digits. For a
+general rule, digit i is the new state of the neighborhood whose cells,
+read left to right as a base-k number, equal i (Wolfram's numbering;
+k=2, r=1 gives the elementary rules). For a totalistic rule, digit s is
+the new state when the neighborhood cells sum to s.
+Each step computes the neighborhood index of all cells at once as a
+dot product of shifted views of the line with place values, then looks
+the new states up in the rule table.
+
+Dependency:
+    Numpy (1.17)
+
+------------------------------------------------------------------------
+Copyright (C) 2019 Jinook Oh, W. Tecumseh Fitch
+- Contact: jinook.oh@univie.ac.at, tecumseh.fitch@univie.ac.at
+
+This program is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your
+option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program.  If not, see <http://www.gnu.org/licenses/>.
+------------------------------------------------------------------------
+"""
+
+from time import time
+
+import numpy as np
+
+from ecaEngine import makeInitLine
+
+DEBUG = False
+MAX_TABLE = 2**24 # maximum number of rule table entries
+
+#=======================================================================
+
+def tableSize(k=2, r=1, totalistic=False):
+    """ Number of entries of a rule table.
+
+    Args:
+        k (int): Number of colors.
+        r (int): Radius of the neighborhood (2r+1 cells).
+        totalistic (bool): Totalistic rule.
+
+    Returns:
+        (int): Number of neighborhood indices.
+    """
+    if totalistic: return (2*r+1)*(k-1) + 1
+    return k**(2*r+1)
+
+#-----------------------------------------------------------------------
+
+def numRules(k=2, r=1, totalistic=False):
+    """ Number of rules (rule numbers are 0 to numRules()-1).
+    """
+    return k**tableSize(k, r, totalistic)
+
+#-----------------------------------------------------------------------
+
+def ruleTable(ruleNum, k=2, r=1, totalistic=False):
+    """ Rule table of a rule number.
+
+    Args:
+        ruleNum (int): Rule number.
+        k (int): Number of colors (2-10).
+        r (int): Radius of the neighborhood.
+        totalistic (bool): Totalistic rule.
+
+    Returns:
+        table (numpy.ndarray): New state (uint8) of each neighborhood
+            index.
+    """
+    if DEBUG: print("ruleTable()")
+
+    ruleNum = int(ruleNum)
+    if not 2 <= k <= 10: raise ValueError("k must be 2-10")
+    n = tableSize(k, r, totalistic)
+    if n > MAX_TABLE: raise ValueError("rule table is too large")
+    if not 0 <= ruleNum < k**n:
+        raise ValueError("rule number must be 0 to %i**%i-1"%(k, n))
+    if k == 2: # bits of the rule number
+        b = ruleNum.to_bytes((n+7)//8, "little")
+        return np.unpackbits(np.frombuffer(b, np.uint8), count=n,
+                             bitorder='little')
+    table = np.zeros(n, np.uint8)
+    i = 0
+    while ruleNum > 0:
+        ruleNum, table[i] = divmod(ruleNum, k)
+        i += 1
+    return table
+
+#-----------------------------------------------------------------------
+
+def tableRule(table, k=2):
+    """ Rule number of a rule table; inverse of ruleTable().
+
+    Args:
+        table (array-like): New state of each neighborhood index.
+        k (int): Number of colors.
+
+    Returns:
+        ruleNum (int): Rule number.
+    """
+    ruleNum = 0
+    for d in reversed([int(x) for x in table]): ruleNum = ruleNum*k + d
+    return ruleNum
+
+#-----------------------------------------------------------------------
+
+def placeValues(k=2, r=1, totalistic=False):
+    """ Weight of each neighborhood cell (leftmost first) in the
+    neighborhood index.
+
+    Args:
+        k (int): Number of colors.
+        r (int): Radius of the neighborhood.
+        totalistic (bool): Totalistic rule (all weights are 1).
+
+    Returns:
+        (list): 2r+1 place values.
+    """
+    if totalistic: return [1] * (2*r+1)
+    return [k**(2*r-j) for j in range(2*r+1)]
+
+#-----------------------------------------------------------------------
+
+def stepGeneral(line, table, k=2, r=1, totalistic=False, out=None,
+                bufs=None):
+    """ Compute the next generation of a line (periodic boundary).
+
+    Args:
+        line (numpy.ndarray): Current line (uint8, 0 to k-1).
+        table (numpy.ndarray): Rule table from ruleTable().
+        k (int): Number of colors.
+        r (int): Radius of the neighborhood.
+        totalistic (bool): Totalistic rule.
+        out (numpy.ndarray, optional): Array (uint8) to write the next
+            line.
+        bufs (tuple, optional): (ext, idx, tmp) buffers from
+            stepBuffers(), reused between steps.
+
+    Returns:
+        out (numpy.ndarray): The next line.
+    """
+    w = line.shape[0]
+    if bufs is None: bufs = stepBuffers(w, table.shape[0], r)
+    ext, idx, tmp = bufs
+    ### line with r wrapped cells on each side
+    if w >= r:
+        ext[r:r+w] = line
+        ext[:r] = line[w-r:]
+        ext[r+w:] = line[:r]
+    else: # narrower than the radius; the line wraps more than once
+        np.take(line, np.arange(-r, w+r) % w, out=ext)
+    ### index: dot product of the 2r+1 shifted views with place values
+    for j, pv in enumerate(placeValues(k, r, totalistic)):
+        pv = idx.dtype.type(pv)
+        if j == 0: np.multiply(ext[0:w], pv, out=idx)
+        elif pv == 1: idx += ext[j:j+w]
+        else:
+            np.multiply(ext[j:j+w], pv, out=tmp)
+            idx += tmp
+    if out is None: out = np.empty(w, np.uint8)
+    np.take(table, idx, out=out)
+    return out
+
+#-----------------------------------------------------------------------
+
+def stepBuffers(w, nTable, r):
+    """ Work buffers of stepGeneral().
+
+    Args:
+        w (int): Width of the line.
+        nTable (int): Number of rule table entries.
+        r (int): Radius of the neighborhood.
+
+    Returns:
+        (tuple): ext (uint8), idx and tmp (smallest unsigned type
+            holding the indices).
+    """
+    if nTable <= 2**8: dtype = np.uint8
+    elif nTable <= 2**16: dtype = np.uint16
+    else: dtype = np.uint32
+    return (np.empty(w + 2*r, np.uint8), np.empty(w, dtype),
+            np.empty(w, dtype))
+
+#-----------------------------------------------------------------------
+
+def runGeneral(ruleNum, w, h, initL="center seed", seed=None, k=2, r=1,
+               totalistic=False, out=None):
+    """ Run a generalized cellular automaton.
+
+    Args:
+        ruleNum (int): Rule number (any size).
+        w (int): Width of each line.
+        h (int): Number of generations (including the first line).
+        initL (str or array-like): See ecaEngine.makeInitLine().
+        seed (int, optional): Seed for a random first line.
+        k (int): Number of colors.
+        r (int): Radius of the neighborhood.
+        totalistic (bool): Totalistic rule.
+        out (numpy.ndarray, optional): Result array (h, w) uint8.
+
+    Returns:
+        out (numpy.ndarray): Result array (cell states 0 to k-1).
+        info (dict): Run specification and elapsed time.
+    """
+    if DEBUG: print("runGeneral()")
+
+    t0 = time()
+    table = ruleTable(ruleNum, k, r, totalistic)
+    if out is None: out = np.zeros((h, w), np.uint8)
+    out[0] = makeInitLine(w, initL, seed, k)
+    bufs = stepBuffers(w, table.shape[0], r)
+    for row in range(1, h):
+        stepGeneral(out[row-1], table, k, r, totalistic, out[row], bufs)
+    if isinstance(initL, str): initSpec = initL.lower()
+    else: initSpec = 'custom'
+    info = dict(rule=ruleNum, w=w, h=h, initL=initSpec, seed=seed, k=k,
+                r=r, totalistic=totalistic, packed=False, transient=None,
+                period=None, elapsed=time()-t0)
+    return out, info
+
+#=======================================================================
@@ -0,0 +1,640 @@
+# coding: UTF-8
+""" HashLife-style engine of elementary cellular automata for enormous
+generation counts on an unbounded lattice.
+
+A line of 2**n cells is a binary tree of hash-consed (interned) nodes;
+identical sub-lines share one node. The result of a node of level n is
+its middle 2**(n-1) cells advanced by 2**j generations (j <= n-2);
+results are memoized on the nodes, so self-similar evolutions (rules 90,
+150, ..) reach generation 10**12 in logarithmic time.
+
+Chaotic evolutions (rules 30, 45, ..) reuse almost no results, and a
+jump costs more than stepping the cells directly. Jumps start small and
+at most double the generation, and when the number of new results per
+jump grows like the area of the light cone, the engine switches to
+direct stepping of the cells that can still reach the view (setView()).
+
+Dependency:
+    Numpy (1.17)
+
+------------------------------------------------------------------------
+Copyright (C) 2019 Jinook Oh, W. Tecumseh Fitch
+- Contact: jinook.oh@univie.ac.at, tecumseh.fitch@univie.ac.at
+
+This program is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your
+option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program.  If not, see <http://www.gnu.org/licenses/>.
+------------------------------------------------------------------------
+"""
+
+import numpy as np
+
+from ecaEngine import makeInitLine, packRow, unpackRow, ruleFormula, \
+                      stepPacked
+
+DEBUG = False
+FIRST_JUMP = 6 # exponent of the first jump
+DIRECT_ROWS = 64 # generations per packed block of direct stepping
+PROBE_JUMP = 9 # smallest jump compared with the previous one
+CHAOTIC_GROWTH = 2.5 # new results of a jump / those of the previous
+                     # (half as long) jump, beyond which the evolution
+                     # is stepped directly; about 4 for chaotic rules,
+                     # 2 or less for self-similar and periodic ones
+
+#=======================================================================
+
+class _NodeLimit(Exception):
+    """ Raised in a step when the node limit is reached.
+    """
+
+#=======================================================================
+
+class _Node:
+    """ Node of a line of 2**lvl cells.
+
+    Attributes:
+        lvl (int): Level.
+        l, r (_Node): Left and right halves (None for a single cell).
+        pop (int): Number of live cells.
+        res (dict): Memoized results; j -> node advanced by 2**j.
+    """
+    __slots__ = ("lvl", "l", "r", "pop", "res")
+
+    def __init__(self, lvl, l, r, pop):
+        self.lvl = lvl
+        self.l = l
+        self.r = r
+        self.pop = pop
+        self.res = None
+
+#=======================================================================
+
+class HashLife:
+    """ Unbounded evolution of one rule from a finite first line on a
+    uniform background (0 at generation 0; it follows the rule, so it
+    may flip for rules with f(000) = 1).
+
+    Attributes:
+        ruleNum (int): Rule number (0-255).
+        maxNodes (int): Number of interned nodes that triggers eviction
+            between jumps; a jump reaching it is abandoned and retried
+            in smaller jumps. When the current line alone needs more
+            nodes, the limit grows to twice its node count.
+        t (int): Current generation.
+        root (_Node): Current line (None when stepping directly).
+        origin (int): Absolute position of the first cell of root.
+        direct (tuple): (x0, cells) of the current line when stepping
+            directly; None otherwise.
+        view (tuple): (x0, x1, t1); see setView().
+        misses (int): Number of results computed.
+    """
+    def __init__(self, ruleNum, line=None, origin=None, maxNodes=500000):
+        """
+        Args:
+            ruleNum (int): Rule number (0-255).
+            line (array-like, optional): First line; a single live cell
+                (center seed) if None.
+            origin (int, optional): Absolute position of line[0].
+                By default, the middle cell of the line is at 0.
+            maxNodes (int): See attributes.
+        """
+        if DEBUG: print("HashLife.__init__()")
+
+        self.ruleNum = ruleNum
+        self.lut = [(ruleNum >> i) & 1 for i in range(8)]
+        self.maxNodes = maxNodes
+        self.nodeLimit = maxNodes # node count that triggers evict()
+        self.inStep = False # join() may abandon the step
+        self.maxJump = None # largest jump that fits in the node limit
+        self.view = None
+        self.misses = 0
+        self.nodes = {} # (left, right) -> node
+        self.leaves = (_Node(0, None, None, 0), _Node(0, None, None, 1))
+        self.bgNodes = {} # (value, level) -> uniform node
+        self.extMemo = {} # (node, background) -> extent
+        if line is None: line = [1]
+        self.line0 = makeInitLine(len(line), line)
+        if origin is None: origin = -int(len(line)/2)
+        self.origin0 = origin
+        self.reset()
+
+    #-------------------------------------------------------------------
+
+    def reset(self):
+        """ Go back to generation 0.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("HashLife.reset()")
+
+        self.t = 0
+        self.direct = None
+        self.lastJump = None # (j, results computed)
+        self.root, self.origin = self.fromLine(self.line0, self.origin0, 0)
+
+    #-------------------------------------------------------------------
+
+    def join(self, l, r):
+        """ Interned node of two halves.
+
+        Args:
+            l, r (_Node): Left and right halves of the same level.
+
+        Returns:
+            (_Node): Node of level l.lvl+1.
+        """
+        key = (l, r)
+        nd = self.nodes.get(key)
+        if nd is None:
+            if self.inStep and len(self.nodes) >= self.nodeLimit:
+                raise _NodeLimit()
+            nd = _Node(l.lvl+1, l, r, l.pop + r.pop)
+            self.nodes[key] = nd
+        return nd
+
+    #-------------------------------------------------------------------
+
+    def bgNode(self, b, lvl):
+        """ Uniform node.
+
+        Args:
+            b (int): Cell state (0 or 1).
+            lvl (int): Level.
+
+        Returns:
+            (_Node): Node of 2**lvl cells of state b.
+        """
+        key = (b, lvl)
+        nd = self.bgNodes.get(key)
+        if nd is None:
+            if lvl == 0: nd = self.leaves[b]
+            else:
+                c = self.bgNode(b, lvl-1)
+                nd = self.join(c, c)
+            self.bgNodes[key] = nd
+        return nd
+
+    #-------------------------------------------------------------------
+
+    def bgAt(self, t):
+        """ Background state at generation t.
+
+        Args:
+            t (int): Generation.
+
+        Returns:
+            (int): 0 or 1.
+        """
+        if t == 0 or self.lut[0] == 0: return 0
+        if self.lut[7] == 1: return 1
+        return t % 2
+
+    #-------------------------------------------------------------------
+
+    def fromLine(self, line, origin, b):
+        """ Make a tree of a line padded with background cells.
+
+        Args:
+            line (numpy.ndarray): Cells (uint8).
+            origin (int): Absolute position of line[0].
+            b (int): Background state.
+
+        Returns:
+            root (_Node): Node of level >= 2.
+            origin (int): Absolute position of the first cell of root.
+        """
+        if DEBUG: print("HashLife.fromLine()")
+
+        n = max(4, 1 << (len(line)-1).bit_length())
+        cells = np.full(n, b, np.uint8)
+        cells[:len(line)] = line
+        nodes = [self.leaves[c] for c in cells.tolist()]
+        while len(nodes) > 1:
+            nodes = [self.join(nodes[i], nodes[i+1])
+                        for i in range(0, len(nodes), 2)]
+        return nodes[0], origin
+
+    #-------------------------------------------------------------------
+
+    def center(self, nd):
+        """ Middle half of a node.
+        """
+        return self.join(nd.l.r, nd.r.l)
+
+    #-------------------------------------------------------------------
+
+    def result(self, nd, j):
+        """ Middle half of a node advanced by 2**j generations.
+
+        Args:
+            nd (_Node): Node of level n >= 2.
+            j (int): 0 <= j <= n-2.
+
+        Returns:
+            (_Node): Node of level n-1.
+        """
+        if nd.res is not None:
+            r = nd.res.get(j)
+            if r is not None: return r
+        self.misses += 1
+        n = nd.lvl
+        if n == 2:
+            lut = self.lut
+            a, b = nd.l.l.pop, nd.l.r.pop
+            c, d = nd.r.l.pop, nd.r.r.pop
+            r = self.join(self.leaves[lut[4*a + 2*b + c]],
+                          self.leaves[lut[4*b + 2*c + d]])
+        else:
+            m = self.join(nd.l.r, nd.r.l)
+            if j == n-2: # two half steps of 2**(n-3) generations
+                r0 = self.result(nd.l, n-3)
+                r1 = self.result(m, n-3)
+                r2 = self.result(nd.r, n-3)
+                r = self.join(self.result(self.join(r0, r1), n-3),
+                              self.result(self.join(r1, r2), n-3))
+            else: # no time passes in the first half
+                c0 = self.center(nd.l)
+                c1 = self.center(m)
+                c2 = self.center(nd.r)
+                r = self.join(self.result(self.join(c0, c1), j),
+                              self.result(self.join(c1, c2), j))
+        if nd.res is None: nd.res = {}
+        nd.res[j] = r
+        return r
+
+    #-------------------------------------------------------------------
+
+    def extent(self, nd, b):
+        """ Range of cells different from the background.
+
+        Args:
+            nd (_Node): Node.
+            b (int): Background state.
+
+        Returns:
+            (tuple): (first, last) cell indices within the node,
+                or None if all cells are b.
+        """
+        if nd.pop == (0 if b == 0 else 1 << nd.lvl): return None
+        if nd.lvl == 0: return (0, 0)
+        key = (nd, b)
+        ret = self.extMemo.get(key)
+        if ret is None:
+            half = 1 << (nd.lvl-1)
+            el = self.extent(nd.l, b)
+            er = self.extent(nd.r, b)
+            if el is None: ret = (er[0]+half, er[1]+half)
+            elif er is None: ret = el
+            else: ret = (el[0], er[1]+half)
+            self.extMemo[key] = ret
+        return ret
+
+    #-------------------------------------------------------------------
+
+    def step(self, j):
+        """ Advance by 2**j generations. Raises _NodeLimit (and leaves
+        the line as it was) when the node limit is reached.
+
+        Args:
+            j (int): Exponent.
+
+        Returns: None
+        """
+        if DEBUG: print("HashLife.step()")
+
+        self.inStep = True
+        try: self._step(j)
+        finally: self.inStep = False
+
+    #-------------------------------------------------------------------
+
+    def _step(self, j):
+        T = 1 << j
+        b = self.bgAt(self.t)
+        while True:
+            ext = self.extent(self.root, b)
+            S = 1 << self.root.lvl
+            if ext is None: # only background
+                self.root = self.bgNode(self.bgAt(self.t+T), self.root.lvl)
+                self.t += T
+                return
+            if (self.root.lvl >= j+2 and ext[0] - T >= S//4 and
+              ext[1] + T < 3*S//4): break
+            ### expand the root around its middle
+            bg = self.bgNode(b, self.root.lvl-1)
+            self.root = self.join(self.join(bg, self.root.l),
+                                  self.join(self.root.r, bg))
+            self.origin -= S//2
+        self.root = self.result(self.root, j)
+        self.origin += S//4
+        self.t += T
+
+    #-------------------------------------------------------------------
+
+    def advance(self, nGen):
+        """ Advance by nGen generations. Jumps start at 2**FIRST_JUMP
+        generations and at most double the generation, then take the
+        largest powers of 2 first; see the module description for the
+        switch to direct stepping.
+
+        Args:
+            nGen (int): Number of generations.
+
+        Returns: None
+        """
+        if DEBUG: print("HashLife.advance()")
+
+        if self.view != None and self.t + nGen > self.view[2]:
+            self.view = None
+            if self.direct != None: # cells outside the view were dropped
+                nGen += self.t
+                self.reset()
+        while nGen > 0:
+            if self.direct != None:
+                self.stepDirect(nGen)
+                return
+            j = min(nGen.bit_length(), max(FIRST_JUMP+1,
+                                           self.t.bit_length()+1)) - 1
+            if self.maxJump != None: j = min(j, self.maxJump)
+            m = self.misses
+            try:
+                self.step(j)
+            except _NodeLimit:
+                self.evict()
+                if j <= FIRST_JUMP: self.toDirect()
+                else: self.maxJump = j - 1
+                continue
+            nGen -= 1 << j
+            ### chaotic: new results grow like the light cone area
+            dm = self.misses - m
+            prev = self.lastJump
+            if (j >= PROBE_JUMP and prev != None and prev[0] == j-1 and
+              dm > CHAOTIC_GROWTH * max(1, prev[1])):
+                self.toDirect()
+            self.lastJump = (j, dm)
+            if len(self.nodes) > self.nodeLimit: self.evict()
+
+    #-------------------------------------------------------------------
+
+    def goTo(self, t):
+        """ Go to generation t (from generation 0 if t is in the past).
+
+        Args:
+            t (int): Generation.
+
+        Returns: None
+        """
+        if t < self.t: self.reset()
+        self.advance(t - self.t)
+
+    #-------------------------------------------------------------------
+
+    def setView(self, x0, x1, t1):
+        """ Only cells in [x0, x1) up to generation t1 will be read;
+        direct stepping then drops cells outside the light cone of this
+        view. Going beyond t1 drops the view (and starts again from
+        generation 0 when cells were dropped).
+
+        Args:
+            x0, x1 (int): Absolute positions.
+            t1 (int): Last generation.
+
+        Returns: None
+        """
+        self.view = (x0, x1, t1)
+
+    #-------------------------------------------------------------------
+
+    def toDirect(self):
+        """ Switch to direct stepping from the current line.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("HashLife.toDirect()")
+
+        ext = self.extent(self.root, self.bgAt(self.t))
+        if ext is None: self.direct = (self.origin, np.zeros(0, np.uint8))
+        else:
+            x0 = self.origin + ext[0]
+            self.direct = (x0, self.getRow(x0, self.origin + ext[1] + 1))
+        self.root = None
+        self.nodes = {}
+        self.extMemo = {}
+        self.bgNodes = {}
+
+    #-------------------------------------------------------------------
+
+    def stepDirect(self, nGen):
+        """ Advance by nGen generations with direct (bit-packed) steps
+        of the cells differing from the background and within the
+        light cone of the view. DIRECT_ROWS generations are computed
+        at a time on the cells padded with enough background cells
+        that the wrapped edges are never reached.
+
+        Args:
+            nGen (int): Number of generations.
+
+        Returns: None
+        """
+        if DEBUG: print("HashLife.stepDirect()")
+
+        x0, cur = self.direct
+        formula = ruleFormula(self.ruleNum)
+        while nGen > 0:
+            k = min(nGen, DIRECT_ROWS)
+            b = self.bgAt(self.t)
+            if cur.size > 0:
+                pad = k + 1
+                w = cur.size + 2*pad
+                line = np.full(w, b, np.uint8)
+                line[pad:-pad] = cur
+                words = packRow(line)
+                nxt = np.empty_like(words)
+                for i in range(k):
+                    stepPacked(words, w, self.ruleNum, nxt, formula)
+                    words, nxt = nxt, words
+                cur = unpackRow(words, w)
+                x0 -= pad
+            self.t += k
+            nGen -= k
+            ### trim background cells and cells outside the view's light
+            ### cone
+            nz = np.flatnonzero(cur != self.bgAt(self.t))
+            if nz.size > 0: lo, hi = int(nz[0]), int(nz[-1]) + 1
+            else: lo = hi = 0
+            if self.view != None:
+                m = self.view[2] - self.t # remaining generations
+                lo = max(lo, self.view[0] - m - x0)
+                hi = min(hi, self.view[1] + m - x0)
+            x0 += lo
+            cur = cur[lo:max(lo, hi)]
+        self.direct = (x0, cur.copy())
+
+    #-------------------------------------------------------------------
+
+    def evict(self):
+        """ Drop memoized results and interned nodes that are not
+        reachable from the current root. Called between jumps only, so
+        the memos of a jump in progress are kept.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("HashLife.evict()")
+
+        self.nodes = {}
+        self.extMemo = {}
+        stack = [self.root] + list(self.bgNodes.values())
+        seen = set()
+        while stack:
+            nd = stack.pop()
+            if nd.lvl == 0 or id(nd) in seen: continue
+            seen.add(id(nd))
+            nd.res = None
+            self.nodes[(nd.l, nd.r)] = nd
+            stack.append(nd.l)
+            stack.append(nd.r)
+        self.nodeLimit = max(self.maxNodes, 2 * len(self.nodes))
+
+    #-------------------------------------------------------------------
+
+    def population(self, x0, x1):
+        """ Number of live cells in [x0, x1) at the current generation.
+
+        Args:
+            x0, x1 (int): Absolute positions.
+
+        Returns:
+            (int): Number of live cells.
+        """
+        if self.direct != None:
+            d0, cur = self.direct
+            a = max(x0, d0)
+            z = min(x1, d0 + cur.size)
+            n = 0
+            if a < z: n = int(cur[a-d0:z-d0].sum())
+        else:
+            S = 1 << self.root.lvl
+            a = max(x0, self.origin)
+            z = min(x1, self.origin + S)
+            n = 0
+            if a < z:
+                n = self._pop(self.root, a - self.origin, z - self.origin)
+        if self.bgAt(self.t) == 1: n += (x1 - x0) - max(0, z - a)
+        return n
+
+    #-------------------------------------------------------------------
+
+    def _pop(self, nd, a, z):
+        """ Number of live cells in [a, z) within a node.
+        """
+        S = 1 << nd.lvl
+        if a <= 0 and z >= S: return nd.pop
+        if nd.pop == 0 or nd.pop == S: return nd.pop * (z - a) // S
+        half = S >> 1
+        n = 0
+        if a < half: n += self._pop(nd.l, a, min(z, half))
+        if z > half: n += self._pop(nd.r, max(a, half) - half, z - half)
+        return n
+
+    #-------------------------------------------------------------------
+
+    def getRow(self, x0, x1):
+        """ Cells in [x0, x1) at the current generation.
+
+        Args:
+            x0, x1 (int): Absolute positions.
+
+        Returns:
+            row (numpy.ndarray): Cells (uint8).
+        """
+        if DEBUG: print("HashLife.getRow()")
+
+        row = np.full(x1 - x0, self.bgAt(self.t), np.uint8)
+        if self.direct != None:
+            d0, cur = self.direct
+            a = max(x0, d0)
+            z = min(x1, d0 + cur.size)
+            if a < z: row[a-x0:z-x0] = cur[a-d0:z-d0]
+            return row
+        S = 1 << self.root.lvl
+        a = max(x0, self.origin)
+        z = min(x1, self.origin + S)
+        if a < z:
+            self._fill(self.root, self.origin, a, z, row, x0)
+        return row
+
+    #-------------------------------------------------------------------
+
+    def _fill(self, nd, off, a, z, row, x0):
+        """ Write cells of a node within [a, z) into row.
+        """
+        S = 1 << nd.lvl
+        if nd.pop == 0 or nd.pop == S:
+            row[max(a, off)-x0:min(z, off+S)-x0] = nd.pop // S
+            return
+        half = S >> 1
+        if a < off + half: self._fill(nd.l, off, a, z, row, x0)
+        if z > off + half: self._fill(nd.r, off + half, a, z, row, x0)
+
+    #-------------------------------------------------------------------
+
+    def getDensity(self, x0, x1, nCols):
+        """ Density of live cells at the current generation,
+        downsampled to nCols columns.
+
+        Args:
+            x0, x1 (int): Absolute positions.
+            nCols (int): Number of columns.
+
+        Returns:
+            (numpy.ndarray): Densities (float, 0-1).
+        """
+        edges = [x0 + (x1-x0) * i // nCols for i in range(nCols+1)]
+        return np.array([self.population(edges[i], edges[i+1]) /
+                            max(1, edges[i+1]-edges[i])
+                                for i in range(nCols)])
+
+    #-------------------------------------------------------------------
+
+    def getHistory(self, t1, nRows, x0, x1, nCols=None):
+        """ Downsampled history from generation 0 to t1.
+
+        Args:
+            t1 (int): Last generation.
+            nRows (int): Number of rows; generations are evenly spaced.
+            x0, x1 (int): Absolute positions.
+            nCols (int, optional): Number of columns (densities).
+                Full resolution (cells) if None.
+
+        Returns:
+            gens (list): Generation of each row.
+            hist (numpy.ndarray): Rows, shape (nRows, x1-x0) uint8 or
+                (nRows, nCols) float.
+        """
+        if DEBUG: print("HashLife.getHistory()")
+
+        self.setView(x0, x1, t1)
+        gens = [t1 * i // max(1, nRows-1) for i in range(nRows)]
+        rows = []
+        for t in gens:
+            self.goTo(t)
+            if nCols == None: rows.append(self.getRow(x0, x1))
+            else: rows.append(self.getDensity(x0, x1, nCols))
+        return gens, np.array(rows)
+
+#=======================================================================
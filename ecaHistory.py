@@ -0,0 +1,347 @@
+# coding: UTF-8
+""" On-disk history of a CA run, for runs far beyond RAM.
+
+A history file is a fixed-size text header (JSON with rule, width,
+initial line spec, number of generations and rows done) followed by
+the rows, as uint8 cells or bit-packed uint64 words (see
+ecaEngine.packRow). The whole file is memory-mapped; rows are streamed
+into it in chunks and the header is updated after each chunk, so an
+interrupted run can be resumed from its last row.
+For endless runs, RingHistory keeps only the latest generations in a
+fixed-size ring buffer in memory.
+
+Dependency:
+    Numpy (1.17)
+
+------------------------------------------------------------------------
+Copyright (C) 2019 Jinook Oh, W. Tecumseh Fitch
+- Contact: jinook.oh@univie.ac.at, tecumseh.fitch@univie.ac.at
+
+This program is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your
+option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program.  If not, see <http://www.gnu.org/licenses/>.
+------------------------------------------------------------------------
+"""
+
+import json, hashlib
+
+import numpy as np
+
+from ecaEngine import ruleLUT, stepECA, makeInitLine, packRow, unpackRow, \
+                      runECA
+
+DEBUG = False
+MAGIC = b"ECAHIST1\n"
+HEADER_SZ = 4096 # bytes; keeps the rows aligned to pages
+CHUNK_BYTES = 2**24 # bytes of rows computed between header updates
+
+#=======================================================================
+
+def createHistory(fp, ruleNum, w, h, initL="center seed", seed=None,
+                  packed=True):
+    """ Create a history file and write its first line.
+    The file is created sparse; disk space is used as rows are written.
+
+    Args:
+        fp (str): File path.
+        ruleNum (int): Rule number (0-255).
+        w (int): Width of each line.
+        h (int): Number of generations (including the first line).
+        initL (str or array-like): See ecaEngine.makeInitLine().
+        seed (int, optional): Seed for a random first line.
+        packed (bool): Store 64 cells per uint64 word.
+
+    Returns:
+        (HistoryStore): The history, opened for writing.
+    """
+    if DEBUG: print("createHistory()")
+
+    line = makeInitLine(w, initL, seed)
+    if isinstance(initL, str) and initL.lower() in ('center seed', 'random'):
+        initSpec = initL.lower()
+    else:
+        # the line itself is row 0; the header only identifies it, as
+        # ecaCache.runSpec() does, to stay within HEADER_SZ
+        initSpec = "custom:" + hashlib.sha1(np.packbits(line)).hexdigest()
+    meta = dict(rule=ruleNum, w=w, h=h, initL=initSpec, seed=seed,
+                packed=packed, rowsDone=1)
+    if packed: rowBytes = (w+63)//64 * 8
+    else: rowBytes = w
+    with open(fp, "wb") as f:
+        f.write(_header(meta))
+        f.truncate(HEADER_SZ + h*rowBytes)
+    hist = HistoryStore(fp, "r+")
+    if packed: hist.body[0] = packRow(line)
+    else: hist.body[0] = line
+    hist.flush()
+    return hist
+
+#-----------------------------------------------------------------------
+
+def _header(meta):
+    """ Header bytes of a history file.
+
+    Args:
+        meta (dict): Header values.
+
+    Returns:
+        (bytes): HEADER_SZ bytes.
+    """
+    b = MAGIC + json.dumps(meta, sort_keys=True).encode("utf-8")
+    if len(b) >= HEADER_SZ: raise ValueError("header is too long")
+    return b + b" " * (HEADER_SZ - len(b) - 1) + b"\n"
+
+#=======================================================================
+
+class HistoryStore:
+    """ Memory-mapped history of a CA run.
+    Indexing ([rows] or [rows, columns]) reads only the requested part
+    and returns cells as uint8 (0 or 1), unpacking packed rows, so it
+    can be given to ecaRender.Pyramid or exporters as a result array.
+
+    Attributes:
+        fp (str): File path.
+        meta (dict): Header; rule, w, h, initL, seed, packed, rowsDone.
+        body (numpy.ndarray): Memory-mapped rows, shape (h, w) uint8 or
+            (h, ceil(w/64)) uint64 when packed.
+    """
+    def __init__(self, fp, mode="r"):
+        """
+        Args:
+            fp (str): File path of a history made with createHistory().
+            mode (str): 'r' (read only) or 'r+' (read and write).
+        """
+        if DEBUG: print("HistoryStore.__init__()")
+
+        self.fp = fp
+        with open(fp, "rb") as f: head = f.read(HEADER_SZ)
+        if not head.startswith(MAGIC) or len(head) < HEADER_SZ:
+            raise ValueError("%s is not a CA history file"%(fp))
+        self.meta = json.loads(head[len(MAGIC):].decode("utf-8"))
+        w, h = self.meta["w"], self.meta["h"]
+        if self.meta["packed"]: shape = (h, (w+63)//64); dtype = np.uint64
+        else: shape = (h, w); dtype = np.uint8
+        self.mm = np.memmap(fp, np.uint8, mode)
+        self.body = self.mm[HEADER_SZ:].view(dtype).reshape(shape)
+
+    #-------------------------------------------------------------------
+
+    @property
+    def shape(self):
+        return (self.meta["h"], self.meta["w"])
+
+    #-------------------------------------------------------------------
+
+    @property
+    def rowsDone(self):
+        return self.meta["rowsDone"]
+
+    #-------------------------------------------------------------------
+
+    def __len__(self):
+        return self.meta["h"]
+
+    #-------------------------------------------------------------------
+
+    def __getitem__(self, key):
+        """ Cells of rows (and columns) as uint8.
+
+        Args:
+            key (int, slice or tuple): Row index/slice, optionally
+                followed by a column index/slice.
+
+        Returns:
+            (numpy.ndarray): Cells (uint8, 0 or 1).
+        """
+        if isinstance(key, tuple): rows, cols = key
+        else: rows, cols = key, slice(None)
+        if not self.meta["packed"]: return self.body[rows, cols]
+        words = self.body[rows]
+        w = self.meta["w"]
+        if isinstance(cols, slice) and cols.step in (None, 1):
+            # unpack only the words covering the columns
+            c0, c1, _ = cols.indices(w)
+            c1 = max(c0, c1)
+            w0 = c0 // 64
+            w1 = (c1 + 63) // 64
+            cells = unpackRow(words[..., w0:w1], (w1-w0)*64)
+            return cells[..., c0-w0*64:c1-w0*64]
+        return unpackRow(words, w)[..., cols]
+
+    #-------------------------------------------------------------------
+
+    def flush(self):
+        """ Write the header and the mapped rows to the disk.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("HistoryStore.flush()")
+
+        self.mm[:HEADER_SZ] = np.frombuffer(_header(self.meta), np.uint8)
+        self.mm.flush()
+
+    #-------------------------------------------------------------------
+
+    def run(self, callback=None, chunkRows=None, detectCycle=False,
+            cancel=None):
+        """ Compute the remaining rows, continuing from the last row
+        done; the header is updated after each chunk of rows.
+
+        Args:
+            callback (function, optional): Called as
+                callback(row0, row1, self) after rows [row0, row1) were
+                written.
+            chunkRows (int, optional): Rows per chunk; about
+                CHUNK_BYTES of rows when None.
+            detectCycle (bool): See ecaEngine.runECA(). Off by default,
+                as it keeps every generation of the run in memory; a
+                resumed run only finds cycles within its own rows.
+            cancel (threading.Event, optional): Cancellation token.
+
+        Returns:
+            info (dict): Run information as ecaEngine.runECA() returns,
+                with rows counted from the first line of the history.
+        """
+        if DEBUG: print("HistoryStore.run()")
+
+        meta = self.meta
+        r = meta["rowsDone"] - 1 # the run continues from this row
+        if chunkRows == None:
+            chunkRows = max(1, CHUNK_BYTES // self.body[0].nbytes)
+        line = self[r]
+
+        def cb(row0, row1, out):
+            meta["rowsDone"] = r + row1
+            self.flush()
+            if callback != None: callback(r+row0, r+row1, self)
+        _, info = runECA(meta["rule"], meta["w"], meta["h"]-r, line,
+                         out=self.body[r:], packed=meta["packed"],
+                         callback=cb, chunkRows=chunkRows,
+                         detectCycle=detectCycle, cancel=cancel)
+        if info["period"] != None: info["transient"] += r
+        info.update(h=meta["h"], initL=meta["initL"], seed=meta["seed"],
+                    rowsDone=meta["rowsDone"], resumedFrom=r)
+        return info
+
+    #-------------------------------------------------------------------
+
+    def close(self):
+        """ Flush (when writable) and unmap the file.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("HistoryStore.close()")
+
+        if self.mm.mode != "r": self.flush()
+        self.body = None
+        self.mm = None
+
+#=======================================================================
+
+class RingHistory:
+    """ The latest generations of an endless run, in a ring buffer of
+    fixed capacity; memory does not grow with the number of
+    generations. Only a range of columns (e.g. the visible ones) may
+    be kept; the whole line is still computed.
+
+    Attributes:
+        ruleNum (int): Rule number (0-255).
+        cols (tuple): (x0, x1); columns kept in the ring.
+        buf (numpy.ndarray): Ring of lines (uint8), shape
+            (capacity, x1-x0); generation g is in row g % capacity.
+        gen (int): Latest generation.
+    """
+    def __init__(self, ruleNum, w, capacity, initL="center seed",
+                 seed=None, cols=None):
+        """
+        Args:
+            ruleNum (int): Rule number (0-255).
+            w (int): Width of each line.
+            capacity (int): Number of generations kept.
+            initL (str or array-like): See ecaEngine.makeInitLine().
+            seed (int, optional): Seed for a random first line.
+            cols (tuple, optional): (x0, x1); all columns if None.
+        """
+        if DEBUG: print("RingHistory.__init__()")
+
+        self.ruleNum = ruleNum
+        self.lut = ruleLUT(ruleNum)
+        if cols == None: cols = (0, w)
+        self.cols = cols
+        self.line = makeInitLine(w, initL, seed).copy() # latest line
+        self.nxt = np.empty(w, np.uint8) # buffer for the next line
+        self.buf = np.zeros((capacity, cols[1]-cols[0]), np.uint8)
+        self.buf[0] = self.line[cols[0]:cols[1]]
+        self.idx = np.empty(w, np.uint8) # buffer for neighborhood index
+        self.gen = 0
+
+    #-------------------------------------------------------------------
+
+    @property
+    def capacity(self):
+        return self.buf.shape[0]
+
+    #-------------------------------------------------------------------
+
+    @property
+    def first(self):
+        """ Oldest generation still kept.
+        """
+        return max(0, self.gen - self.capacity + 1)
+
+    #-------------------------------------------------------------------
+
+    def step(self, n=1):
+        """ Compute the next n generations in place.
+
+        Args:
+            n (int): Number of generations.
+
+        Returns:
+            (int): The latest generation.
+        """
+        cap = self.capacity
+        x0, x1 = self.cols
+        for i in range(n):
+            stepECA(self.line, self.lut, self.nxt, self.idx)
+            self.line, self.nxt = self.nxt, self.line
+            self.gen += 1
+            self.buf[self.gen % cap] = self.line[x0:x1]
+        return self.gen
+
+    #-------------------------------------------------------------------
+
+    def rows(self, g0, g1):
+        """ Lines of generations [g0, g1) in order.
+
+        Args:
+            g0, g1 (int): Generations; must still be kept (first to
+                gen+1).
+
+        Returns:
+            (numpy.ndarray): Lines (uint8), shape (g1-g0, x1-x0) (see
+                cols); a view of the ring when the rows do not wrap,
+                otherwise a copy.
+        """
+        if g0 < self.first or g1 > self.gen + 1:
+            raise IndexError("generations %i-%i are not kept"%(g0, g1))
+        if g1 <= g0: return self.buf[:0]
+        cap = self.capacity
+        r0, r1 = g0 % cap, (g1 - 1) % cap + 1
+        if r0 < r1: return self.buf[r0:r1]
+        return np.concatenate((self.buf[r0:], self.buf[:r1]))
+
+#=======================================================================
@@ -0,0 +1,150 @@
+# coding: UTF-8
+""" Queue of CA runs executed one after another in a persistent worker
+thread, with cancellation of the running job.
+
+------------------------------------------------------------------------
+Copyright (C) 2019 Jinook Oh, W. Tecumseh Fitch
+- Contact: jinook.oh@univie.ac.at, tecumseh.fitch@univie.ac.at
+
+This program is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your
+option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program.  If not, see <http://www.gnu.org/licenses/>.
+------------------------------------------------------------------------
+"""
+
+import traceback
+from threading import Thread, Condition, Event
+from collections import deque
+
+DEBUG = False
+
+#=======================================================================
+
+class JobRunner:
+    """ Run jobs back-to-back in one worker thread.
+    A job is a function called as func(job, cancel) in the worker
+    thread, where 'cancel' (threading.Event) is set when the job should
+    stop; it is checked by the engine between chunks of rows.
+
+    Attributes:
+        func (function): Function running a job.
+        jobs (deque): Queued jobs.
+        current: Running job (None when idle).
+        maxJobs (int): Maximum number of queued jobs; the oldest queued
+            job is dropped when it is exceeded.
+        onError (function): Called in the worker thread as
+            onError(job, exc) when a job raised an exception; the
+            worker then goes on with the next job.
+    """
+    def __init__(self, func, maxJobs=16, onError=None):
+        if DEBUG: print("JobRunner.__init__()")
+
+        self.func = func
+        self.maxJobs = maxJobs
+        self.onError = onError
+        self.jobs = deque()
+        self.current = None
+        self.cancelEvt = None
+        self.cond = Condition()
+        self.stopped = False
+        self.th = Thread(target=self._loop, daemon=True)
+        self.th.start()
+
+    #-------------------------------------------------------------------
+
+    def submit(self, job, preempt=False):
+        """ Add a job.
+
+        Args:
+            job: Job passed to self.func.
+            preempt (bool): Cancel the running job and drop queued jobs
+                so that this job starts right away.
+
+        Returns: None
+        """
+        if DEBUG: print("JobRunner.submit()")
+
+        with self.cond:
+            if preempt: self._cancel(True)
+            self.jobs.append(job)
+            if len(self.jobs) > self.maxJobs: self.jobs.popleft()
+            self.cond.notify()
+
+    #-------------------------------------------------------------------
+
+    def cancel(self, clear=True):
+        """ Cancel the running job.
+
+        Args:
+            clear (bool): Also drop queued jobs.
+
+        Returns: None
+        """
+        if DEBUG: print("JobRunner.cancel()")
+
+        with self.cond: self._cancel(clear)
+
+    #-------------------------------------------------------------------
+
+    def _cancel(self, clear):
+        if clear: self.jobs.clear()
+        if self.cancelEvt != None: self.cancelEvt.set()
+
+    #-------------------------------------------------------------------
+
+    def nQueued(self):
+        """ Number of queued jobs (not including the running one).
+        """
+        with self.cond: return len(self.jobs)
+
+    #-------------------------------------------------------------------
+
+    def stop(self, timeout=None):
+        """ Cancel all jobs and end the worker thread.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the thread.
+
+        Returns: None
+        """
+        if DEBUG: print("JobRunner.stop()")
+
+        with self.cond:
+            self.stopped = True
+            self._cancel(True)
+            self.cond.notify()
+        self.th.join(timeout)
+
+    #-------------------------------------------------------------------
+
+    def _loop(self):
+        """ Worker thread; run queued jobs one after another.
+        """
+        while True:
+            with self.cond:
+                while not self.jobs and not self.stopped: self.cond.wait()
+                if self.stopped: return
+                job = self.jobs.popleft()
+                self.current = job
+                self.cancelEvt = Event()
+                cancel = self.cancelEvt
+            try:
+                self.func(job, cancel)
+            except Exception as e:
+                if self.onError != None: self.onError(job, e)
+                else: traceback.print_exc()
+            finally:
+                with self.cond:
+                    self.current = None
+                    self.cancelEvt = None
+
+#=======================================================================
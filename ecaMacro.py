@@ -0,0 +1,228 @@
+# coding: UTF-8
+""" Multi-generation (macro-step) lookup tables.
+
+A block of 2k+m cells determines the m cells in its middle k
+generations later. A table of 2**(2k+m) entries per rule replaces k*m
+single cell updates with one lookup. This is meant for long runs where
+only every k-th row or the final state is needed.
+
+Dependency:
+    Numpy (1.17)
+
+------------------------------------------------------------------------
+Copyright (C) 2019 Jinook Oh, W. Tecumseh Fitch
+- Contact: jinook.oh@univie.ac.at, tecumseh.fitch@univie.ac.at
+
+This program is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your
+option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program.  If not, see <http://www.gnu.org/licenses/>.
+------------------------------------------------------------------------
+"""
+
+import numpy as np
+
+from ecaEngine import ruleLUT, stepECA, makeInitLine, runECA
+
+DEBUG = False
+CACHE_BYTES = 2**16 # size of a table; should fit in L2 cache
+
+_tables = {} # (ruleNum, k, m) -> table
+
+#=======================================================================
+
+def chooseMacro(cacheBytes=CACHE_BYTES, maxK=None):
+    """ Choose k (generations) and m (output cells) of a macro step,
+    maximizing k*m with a table that fits in 'cacheBytes'.
+
+    Args:
+        cacheBytes (int): Maximum table size in bytes.
+        maxK (int, optional): Upper limit of k.
+
+    Returns:
+        k (int): Number of generations per lookup.
+        m (int): Number of output cells per lookup.
+    """
+    if DEBUG: print("chooseMacro()")
+
+    best = (1, 1)
+    for m in range(1, 17):
+        itemSz = 1 if m <= 8 else 2
+        k = 1
+        while (2**(2*(k+1)+m)) * itemSz <= cacheBytes: k += 1
+        if maxK != None: k = min(k, maxK)
+        if (2**(2*k+m)) * itemSz > cacheBytes: continue
+        if k*m > best[0]*best[1] or (k*m == best[0]*best[1] and m == 8):
+            best = (k, m)
+    return best
+
+#-----------------------------------------------------------------------
+
+def macroLUT(ruleNum, k, m):
+    """ Make (or get the cached) macro-step table of a rule.
+
+    Args:
+        ruleNum (int): Rule number (0-255).
+        k (int): Number of generations.
+        m (int): Number of output cells (<= 16).
+
+    Returns:
+        table (numpy.ndarray): 2**(2k+m) entries (uint8 if m <= 8, else
+            uint16). Index bits are the 2k+m input cells, output bits the
+            m middle cells k generations later; leftmost cell is the most
+            significant bit.
+    """
+    if DEBUG: print("macroLUT()")
+
+    key = (ruleNum, k, m)
+    if key in _tables: return _tables[key]
+    n = 2*k + m
+    lut = ruleLUT(ruleNum)
+    vals = np.arange(2**n, dtype=np.uint32)
+    shifts = np.arange(n-1, -1, -1, dtype=np.uint32)
+    cur = ((vals[:, None] >> shifts) & 1).astype(np.uint8)
+    for g in range(k): # each generation loses one cell on each side
+        idx = (cur[:, :-2] << 2) | (cur[:, 1:-1] << 1) | cur[:, 2:]
+        cur = lut[idx]
+    dtype = np.uint8 if m <= 8 else np.uint16
+    table = np.zeros(2**n, dtype)
+    for t in range(m): table |= cur[:, t].astype(dtype) << (m-1-t)
+    _tables[key] = table
+    return table
+
+#-----------------------------------------------------------------------
+
+def macroStep(line, table, k, m, out=None, pos=None):
+    """ Advance a line (periodic boundary) by k generations.
+
+    Args:
+        line (numpy.ndarray): Current line (uint8, 0 or 1).
+        table (numpy.ndarray): Table from macroLUT(ruleNum, k, m).
+        k (int): Number of generations of the table.
+        m (int): Number of output cells of the table.
+        out (numpy.ndarray, optional): Array to write the result.
+        pos (numpy.ndarray, optional): Cached result of
+            macroPositions(w, k, m).
+
+    Returns:
+        out (numpy.ndarray): The line k generations later.
+    """
+    w = line.shape[0]
+    if pos is None: pos = macroPositions(w, k, m)
+    n = 2*k + m
+    nb = (pos.shape[0] - 2*k) // m # number of blocks
+    iType = np.uint16 if n <= 16 else np.uint32
+    ext = line[pos].astype(iType) # wrapped input cells
+    idx = ext[0:nb*m:m] << iType(n-1)
+    for t in range(1, n):
+        idx |= ext[t:t+nb*m:m] << iType(n-1-t)
+    v = table[idx]
+    if m == 8:
+        bits = np.unpackbits(v)
+    else:
+        shifts = np.arange(m-1, -1, -1, dtype=v.dtype)
+        bits = ((v[:, None] >> shifts) & 1).astype(np.uint8).ravel()
+    if out is None: out = np.empty(w, np.uint8)
+    out[:] = bits[:w]
+    return out
+
+#-----------------------------------------------------------------------
+
+def macroPositions(w, k, m):
+    """ Indices of the wrapped input cells of all blocks of a line.
+
+    Args:
+        w (int): Width of the line.
+        k (int): Number of generations of the table.
+        m (int): Number of output cells of the table.
+
+    Returns:
+        pos (numpy.ndarray): Cell indices; length ceil(w/m)*m + 2k.
+    """
+    nb = (w + m - 1) // m
+    return np.arange(-k, nb*m + k) % w
+
+#-----------------------------------------------------------------------
+
+def runMacro(ruleNum, w, nGen, initL="center seed", seed=None, every=None,
+             k=None, m=None, cacheBytes=CACHE_BYTES):
+    """ Run CA with macro steps, keeping every 'every'-th generation or
+    only the final state.
+
+    Args:
+        ruleNum (int): Rule number (0-255).
+        w (int): Width of each line.
+        nGen (int): Number of generations to advance.
+        initL (str or array-like): See ecaEngine.makeInitLine().
+        seed (int, optional): Seed for a random first line.
+        every (int, optional): Keep generations 0, every, 2*every, ..
+            (every >= 1). When None, only the generation 'nGen' is
+            returned.
+        k (int, optional): Generations per table lookup.
+        m (int, optional): Output cells per table lookup.
+            k and m are chosen with chooseMacro() when not given.
+        cacheBytes (int): Maximum table size for chooseMacro().
+
+    Returns:
+        rows (numpy.ndarray): Kept generations, shape (n, w) uint8.
+    """
+    if DEBUG: print("runMacro()")
+
+    if every == None: stride = nGen
+    elif every < 1: raise ValueError("every must be 1 or more")
+    else: stride = every
+    if k == None or m == None:
+        k, m = chooseMacro(cacheBytes, maxK=max(1, stride))
+    k = max(1, min(k, stride))
+    table = macroLUT(ruleNum, k, m)
+    pos = macroPositions(w, k, m)
+    lut = ruleLUT(ruleNum)
+    q, r = divmod(stride, k) if stride > 0 else (0, 0)
+
+    line = makeInitLine(w, initL, seed).copy() # stepped in place
+    buf = np.empty(w, np.uint8)
+    if every == None: rows = np.zeros((1, w), np.uint8)
+    else:
+        rows = np.zeros((nGen//stride + 1, w), np.uint8)
+        rows[0] = line
+    for ri in range(len(rows) - (every != None)):
+        for i in range(q):
+            macroStep(line, table, k, m, buf, pos)
+            line, buf = buf, line
+        for i in range(r):
+            stepECA(line, lut, buf)
+            line, buf = buf, line
+        rows[ri + (every != None)] = line
+    return rows
+
+#-----------------------------------------------------------------------
+
+def verifyMacro(ruleNum, w=257, nGen=100, seed=0, k=None, m=None):
+    """ Compare runMacro() with the single step engine.
+
+    Args:
+        ruleNum (int): Rule number (0-255).
+        w (int): Width of the line.
+        nGen (int): Number of generations.
+        seed (int): Seed for a random first line.
+        k, m (int, optional): Macro step parameters.
+
+    Returns:
+        (bool): True if every kept generation is identical.
+    """
+    if DEBUG: print("verifyMacro()")
+
+    if k == None or m == None: k, m = chooseMacro()
+    ref, _ = runECA(ruleNum, w, nGen+1, "random", seed, detectCycle=False)
+    rows = runMacro(ruleNum, w, nGen, "random", seed, every=k, k=k, m=m)
+    return bool((rows == ref[::k]).all())
+
+#=======================================================================
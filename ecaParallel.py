@@ -0,0 +1,235 @@
+# coding: UTF-8
+""" Multithreaded stepping of very wide lines.
+
+Each line is split into contiguous segments, one per thread of a
+persistent pool. A thread reads its segment plus 'halo' cells on each
+side (wrapped) from the last finished row and advances it locally for
+up to 'halo' generations, one cell of the halo becoming invalid on
+each side per generation. Threads meet at a barrier after each such
+block, so one barrier covers 'halo' generations. NumPy releases the
+GIL inside the array operations, so the threads run in parallel.
+
+Dependency:
+    Numpy (1.17)
+
+------------------------------------------------------------------------
+Copyright (C) 2019 Jinook Oh, W. Tecumseh Fitch
+- Contact: jinook.oh@univie.ac.at, tecumseh.fitch@univie.ac.at
+
+This program is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your
+option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program.  If not, see <http://www.gnu.org/licenses/>.
+------------------------------------------------------------------------
+"""
+
+import os
+from time import time
+from threading import Thread, Barrier, BrokenBarrierError
+
+import numpy as np
+
+from ecaEngine import ruleLUT, makeInitLine
+
+DEBUG = False
+
+#=======================================================================
+
+def readWrapped(row, x0, x1, dst):
+    """ Copy cells [x0, x1) of a periodic line; x0 may be negative and
+    x1 may exceed the width.
+
+    Args:
+        row (numpy.ndarray): Line.
+        x0, x1 (int): Cell range.
+        dst (numpy.ndarray): Array of length x1-x0 to write the cells.
+
+    Returns: None
+    """
+    w = row.shape[0]
+    i = 0
+    x = x0
+    while x < x1:
+        xm = x % w
+        n = min(x1 - x, w - xm)
+        dst[i:i+n] = row[xm:xm+n]
+        i += n
+        x += n
+
+#=======================================================================
+
+class ParallelStepper:
+    """ Persistent thread pool advancing segments of a line.
+
+    Attributes:
+        nThreads (int): Number of worker threads (and segments).
+        halo (int): Halo cells per side; generations per barrier.
+    """
+    def __init__(self, nThreads=None, halo=8):
+        if DEBUG: print("ParallelStepper.__init__()")
+
+        if nThreads == None: nThreads = os.cpu_count() or 1
+        self.nThreads = nThreads
+        self.halo = halo
+        self.task = None # (out, lut, first row, last row)
+        self.error = None
+        self.segs = []
+        self.bufs = []
+        self.start = Barrier(nThreads + 1) # a task is ready
+        self.done = Barrier(nThreads + 1) # all threads finished the task
+        self.sync = Barrier(nThreads) # between blocks of generations
+        self.threads = []
+        for ti in range(nThreads):
+            th = Thread(target=self._loop, args=(ti,), daemon=True)
+            th.start()
+            self.threads.append(th)
+
+    #-------------------------------------------------------------------
+
+    def _loop(self, ti):
+        """ Worker thread; run the blocks of each task on segment ti.
+        """
+        while True:
+            self.start.wait()
+            task = self.task
+            if task is None: return
+            try:
+                self._runSegment(ti, *task)
+            except BrokenBarrierError:
+                pass # another thread failed
+            except Exception as e:
+                self.error = e
+                self.sync.abort()
+            self.done.wait()
+
+    #-------------------------------------------------------------------
+
+    def _runSegment(self, ti, out, lut, r0, r1):
+        """ Compute rows r0+1 to r1 of segment ti from row r0.
+        """
+        s0, s1 = self.segs[ti]
+        segLen = s1 - s0
+        bufs = self.bufs[ti]
+        idxBuf = bufs[2]
+        R = r0
+        while R < r1:
+            n = min(self.halo, r1 - R) # generations of this block
+            L = segLen + 2*n
+            cur = bufs[0][:L]
+            readWrapped(out[R], s0-n, s1+n, cur)
+            for t in range(1, n+1):
+                m = L - 2*t
+                idx = idxBuf[:m]
+                np.left_shift(cur[:-2], 1, out=idx)
+                idx |= cur[1:-1]
+                idx <<= 1
+                idx |= cur[2:]
+                nxt = bufs[t % 2][:m]
+                np.take(lut, idx, out=nxt)
+                out[R+t, s0:s1] = nxt[n-t:n-t+segLen]
+                cur = nxt
+            self.sync.wait() # row R+n is complete
+            R += n
+
+    #-------------------------------------------------------------------
+
+    def _setup(self, w):
+        """ Segments and buffers for lines of width w.
+        """
+        if len(self.segs) == self.nThreads and self.segs[-1][1] == w: return
+        b = [w * i // self.nThreads for i in range(self.nThreads + 1)]
+        self.segs = [(b[i], b[i+1]) for i in range(self.nThreads)]
+        self.bufs = []
+        for s0, s1 in self.segs:
+            L = s1 - s0 + 2*self.halo
+            self.bufs.append((np.empty(L, np.uint8), np.empty(L, np.uint8),
+                              np.empty(L, np.uint8)))
+
+    #-------------------------------------------------------------------
+
+    def step(self, out, ruleNum, r0, r1):
+        """ Compute rows r0+1 to r1 of 'out' from row r0 in the threads.
+
+        Args:
+            out (numpy.ndarray): Result array (uint8), shape (h, w).
+            ruleNum (int): Rule number (0-255).
+            r0 (int): Last finished row.
+            r1 (int): Last row to compute.
+
+        Returns: None
+        """
+        if DEBUG: print("ParallelStepper.step()")
+
+        if r1 <= r0: return
+        self._setup(out.shape[1])
+        self.error = None
+        self.task = (out, ruleLUT(ruleNum), r0, r1)
+        self.start.wait()
+        self.done.wait()
+        self.task = None
+        if self.error != None:
+            self.sync.reset()
+            raise self.error
+
+    #-------------------------------------------------------------------
+
+    def run(self, ruleNum, w, h, initL="center seed", seed=None, out=None,
+            callback=None, chunkRows=256, cancel=None):
+        """ Run CA; the same as ecaEngine.runECA() without cycle
+        detection and the packed backend.
+
+        Args:
+            ruleNum, w, h, initL, seed, out, callback, chunkRows, cancel:
+                See ecaEngine.runECA().
+
+        Returns:
+            out (numpy.ndarray): Result array.
+            info (dict): Run information, with 'nThreads' and 'halo'.
+        """
+        if DEBUG: print("ParallelStepper.run()")
+
+        t0 = time()
+        if out is None: out = np.zeros((h, w), np.uint8)
+        out[0] = makeInitLine(w, initL, seed)
+        row0 = 0
+        cancelled = False
+        while row0 < h:
+            if cancel != None and cancel.is_set():
+                cancelled = True
+                break
+            row1 = min(h, row0 + chunkRows)
+            self.step(out, ruleNum, max(1, row0) - 1, row1 - 1)
+            if callback != None: callback(row0, row1, out)
+            row0 = row1
+        if isinstance(initL, str): initSpec = initL.lower()
+        else: initSpec = 'custom'
+        info = dict(rule=ruleNum, w=w, h=h, initL=initSpec, seed=seed,
+                    packed=False, transient=None, period=None,
+                    cancelled=cancelled, rowsDone=row0, elapsed=time()-t0,
+                    nThreads=self.nThreads, halo=self.halo)
+        return out, info
+
+    #-------------------------------------------------------------------
+
+    def close(self):
+        """ End the worker threads.
+
+        Args: None
+
+        Returns: None
+        """
+        if DEBUG: print("ParallelStepper.close()")
+
+        self.task = None
+        self.start.wait()
+        for th in self.threads: th.join()
+
+#=======================================================================
@@ -0,0 +1,299 @@
+# coding: UTF-8
+""" Runtime-switchable timing instrumentation.
+
+Spans (named, timed sections such as a chunk of simulation, a progress
+event or a paint) and counters (generation rate, queue latency, ..)
+are recorded only while the profiler is enabled; when it is disabled,
+span() returns a shared no-op context and costs about one attribute
+check. Records can be summarized (e.g. for the status bar) and saved as
+JSON or as a Chrome trace (chrome://tracing, Perfetto).
+
+Dependency:
+    Numpy (1.17)
+
+------------------------------------------------------------------------
+Copyright (C) 2019 Jinook Oh, W. Tecumseh Fitch
+- Contact: jinook.oh@univie.ac.at, tecumseh.fitch@univie.ac.at
+
+This program is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your
+option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program.  If not, see <http://www.gnu.org/licenses/>.
+------------------------------------------------------------------------
+"""
+
+import os, sys, json, threading
+from time import perf_counter
+from collections import deque
+
+try:
+    import resource # not on Windows
+except ImportError:
+    resource = None
+
+DEBUG = False
+
+#=======================================================================
+
+def peakMemory():
+    """ Peak resident memory of this process in bytes (None if not
+    available).
+    """
+    if resource == None: return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin": return rss # bytes on Mac OS
+    return rss * 1024 # kilobytes on Linux
+
+#=======================================================================
+
+class _NullSpan:
+    """ Span context of a disabled profiler.
+    """
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NULL_SPAN = _NullSpan()
+
+#=======================================================================
+
+class _Span:
+    """ Span context of an enabled profiler.
+    """
+    def __init__(self, prof, name, args):
+        self.prof = prof
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.t0 = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.prof.record(self.name, self.t0, perf_counter()-self.t0,
+                         **self.args)
+        return False
+
+#=======================================================================
+
+class Profiler:
+    """ Collects spans and counters from any thread.
+
+    Attributes:
+        enabled (bool): Record only when True; switch at any time.
+        events (deque): Recent records; (kind, name, thread id, start,
+            duration or value, args). 'kind' is 'X' (span) or 'C'
+            (counter).
+        stats (dict): Name -> [count, total, max, last] of all spans
+            and counters since the last reset().
+    """
+    def __init__(self, enabled=False, maxEvents=100000):
+        if DEBUG: print("Profiler.__init__()")
+
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.events = deque(maxlen=maxEvents)
+        self.stats = {}
+        self.t0 = perf_counter()
+
+    #-------------------------------------------------------------------
+
+    def reset(self):
+        """ Drop all records.
+        """
+        with self.lock:
+            self.events.clear()
+            self.stats = {}
+            self.t0 = perf_counter()
+
+    #-------------------------------------------------------------------
+
+    def span(self, name, **args):
+        """ Context manager timing a section.
+
+        Args:
+            name (str): Span name.
+            args: Values stored with the span.
+
+        Returns:
+            Context manager.
+        """
+        if not self.enabled: return _NULL_SPAN
+        return _Span(self, name, args)
+
+    #-------------------------------------------------------------------
+
+    def record(self, name, t0, dur, **args):
+        """ Record a span measured by the caller.
+
+        Args:
+            name (str): Span name.
+            t0 (float): Start (time.perf_counter()).
+            dur (float): Duration in seconds.
+            args: Values stored with the span.
+
+        Returns: None
+        """
+        if not self.enabled: return
+        self._add("X", name, t0, dur, args)
+
+    #-------------------------------------------------------------------
+
+    def counter(self, name, value):
+        """ Record a counter value (rate, latency, memory, ..).
+
+        Args:
+            name (str): Counter name.
+            value (float): Value.
+
+        Returns: None
+        """
+        if not self.enabled: return
+        self._add("C", name, perf_counter(), value, None)
+
+    #-------------------------------------------------------------------
+
+    def _add(self, kind, name, t, v, args):
+        with self.lock:
+            self.events.append((kind, name, threading.get_ident(), t, v,
+                                args))
+            st = self.stats.get(name)
+            if st == None: self.stats[name] = [1, v, v, v]
+            else:
+                st[0] += 1
+                st[1] += v
+                if v > st[2]: st[2] = v
+                st[3] = v
+
+    #-------------------------------------------------------------------
+
+    def summary(self):
+        """ Aggregates of spans and counters.
+
+        Args: None
+
+        Returns:
+            (dict): Name -> dict(count, total, mean, max, last).
+        """
+        with self.lock:
+            return {k: dict(count=c, total=t, mean=t/c, max=m, last=l)
+                    for k, (c, t, m, l) in self.stats.items()}
+
+    #-------------------------------------------------------------------
+
+    def statusText(self):
+        """ Short text of the latest values, for a status bar.
+
+        Args: None
+
+        Returns:
+            (str)
+        """
+        sm = self.summary()
+        items = []
+        if "genPerSec" in sm:
+            items.append("%.3g gen/s"%(sm["genPerSec"]["last"]))
+        for name, label in [("simulate", "sim"), ("pyramid", "lod"),
+                            ("queueLatency", "queue"), ("paint", "paint"),
+                            ("tileBitmap", "tile")]:
+            if name in sm:
+                items.append("%s %.1f ms"%(label, sm[name]["mean"]*1000))
+        peak = peakMemory()
+        if peak != None: items.append("peak %.0f MB"%(peak / 2**20))
+        return " | ".join(items)
+
+    #-------------------------------------------------------------------
+
+    def exportJSON(self, fp):
+        """ Save the summary and all records as JSON.
+
+        Args:
+            fp (str): File path.
+
+        Returns: None
+        """
+        if DEBUG: print("Profiler.exportJSON()")
+
+        with self.lock: events = list(self.events)
+        recs = [dict(kind=k, name=n, thread=tid, t=t-self.t0, value=v,
+                     args=a) for k, n, tid, t, v, a in events]
+        with open(fp, "w") as f:
+            json.dump(dict(summary=self.summary(), peakMemory=peakMemory(),
+                           events=recs), f, indent=1)
+
+    #-------------------------------------------------------------------
+
+    def exportChromeTrace(self, fp):
+        """ Save records in the Chrome trace event format.
+
+        Args:
+            fp (str): File path.
+
+        Returns: None
+        """
+        if DEBUG: print("Profiler.exportChromeTrace()")
+
+        with self.lock: events = list(self.events)
+        pid = os.getpid()
+        trace = []
+        for k, n, tid, t, v, a in events:
+            ts = (t - self.t0) * 1e6 # microseconds
+            if k == "X":
+                trace.append(dict(name=n, ph="X", ts=ts, dur=v*1e6,
+                                  pid=pid, tid=tid, args=a or {}))
+            else:
+                trace.append(dict(name=n, ph="C", ts=ts, pid=pid, tid=tid,
+                                  args={n: v}))
+        with open(fp, "w") as f:
+            json.dump(dict(traceEvents=trace, displayTimeUnit="ms"), f)
+
+    #-------------------------------------------------------------------
+
+    def export(self, fp):
+        """ Save as a Chrome trace when fp ends with '.trace.json' or
+        '.trace', otherwise as JSON (see exportJSON()).
+        """
+        if fp.endswith(".trace.json") or fp.endswith(".trace"):
+            self.exportChromeTrace(fp)
+        else:
+            self.exportJSON(fp)
+
+#=======================================================================
+
+def chunkTimer(callback=None, prof=None):
+    """ Wrap a chunk callback of ecaEngine.runECA() (and the other
+    engines) to record the time spent computing each chunk ('simulate'
+    span) and the generation rate ('genPerSec' counter).
+
+    Args:
+        callback (function, optional): Called as callback(row0, row1, out)
+            after recording.
+        prof (Profiler, optional): Profiler; PROFILER by default.
+
+    Returns:
+        (function): Chunk callback.
+    """
+    if prof == None: prof = PROFILER
+    last = [perf_counter()] # end of the previous callback
+    def timedCallback(row0, row1, out):
+        if prof.enabled:
+            dur = perf_counter() - last[0]
+            prof.record("simulate", last[0], dur, rows=row1-row0)
+            prof.counter("genPerSec", (row1-row0) / max(dur, 1e-9))
+        if callback != None: callback(row0, row1, out)
+        last[0] = perf_counter()
+    return timedCallback
+
+#=======================================================================
+
+# profiler shared by the modules; enabled with ECA_PROFILE=1 or at runtime
+PROFILER = Profiler(enabled=os.environ.get("ECA_PROFILE", "") == "1")
+
+#=======================================================================
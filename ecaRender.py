@@ -0,0 +1,191 @@
+# coding: UTF-8
+""" Converting CA results to images (without wxPython).
+
+Dependency:
+    Numpy (1.17)
+
+------------------------------------------------------------------------
+Copyright (C) 2019 Jinook Oh, W. Tecumseh Fitch
+- Contact: jinook.oh@univie.ac.at, tecumseh.fitch@univie.ac.at
+
+This program is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your
+option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program.  If not, see <http://www.gnu.org/licenses/>.
+------------------------------------------------------------------------
+"""
+
+import numpy as np
+
+DEBUG = False
+
+# RGB color of each cell state; 0: white, 1: black
+PALETTE = np.array([[255, 255, 255], [0, 0, 0]], np.uint8)
+
+#=======================================================================
+
+def toRGB(arr, palette=PALETTE):
+    """ Convert a CA result array to an RGB image array with a palette
+    lookup table. The result array is not modified.
+
+    Args:
+        arr (numpy.ndarray): Cell states (uint8), shape (h, w).
+        palette (numpy.ndarray): RGB color (uint8) of each state.
+
+    Returns:
+        (numpy.ndarray): Contiguous RGB array (uint8), shape (h, w, 3).
+    """
+    if DEBUG: print("toRGB()")
+
+    return np.take(palette, arr, axis=0)
+
+#=======================================================================
+
+# RGB color of each density (0: no live cell, 255: all cells live)
+DENSITY_PALETTE = np.repeat(np.arange(255, -1, -1, dtype=np.uint8), 3
+                            ).reshape(256, 3)
+
+#-----------------------------------------------------------------------
+
+def downsample(src, r0, r1, scale=1):
+    """ Average 2x2 blocks of rows [2*r0, 2*r1) of an array.
+    Blocks at odd edges are completed by repeating the edge cells.
+
+    Args:
+        src (numpy.ndarray): Array (uint8), shape (h, w).
+        r0, r1 (int): Output rows.
+        scale (int): Multiplier applied to src values (255 for cell
+            states, 1 for densities).
+
+    Returns:
+        (numpy.ndarray): Densities (uint8), shape (r1-r0, ceil(w/2)).
+    """
+    h, w = src.shape
+    blk = np.asarray(src[2*r0:min(h, 2*r1)], np.uint16)
+    if blk.shape[0] < 2*(r1-r0): blk = np.concatenate((blk, blk[-1:]), 0)
+    if w % 2 == 1: blk = np.concatenate((blk, blk[:, -1:]), 1)
+    s = blk[0::2, 0::2] + blk[1::2, 0::2] + blk[0::2, 1::2] + blk[1::2, 1::2]
+    return ((s * scale + 2) // 4).astype(np.uint8)
+
+#=======================================================================
+
+class Pyramid:
+    """ Multi-resolution pyramid of a CA result for level-of-detail
+    rendering. Level 0 is the result itself (cell states); level k
+    holds the density (0-255) of 2**k x 2**k blocks of cells.
+
+    Attributes:
+        src (array-like): Result; anything with 'shape' and 2-D slicing
+            (numpy.ndarray, numpy.memmap, ..).
+        tileSz (int): Tile size in pixels of a level.
+        levels (list): Arrays of levels >= 1 (level 0 is src).
+    """
+    def __init__(self, src, tileSz=256, chunkRows=4096, build=True,
+                 fp=None):
+        """
+        Args:
+            src (array-like): See attributes.
+            tileSz (int): See attributes.
+            chunkRows (int): Rows of a level computed at once.
+            build (bool): Compute levels now; otherwise they are
+                computed by update() as rows of src become ready.
+            fp (str, optional): File to keep the levels in (memory-
+                mapped), for results too large for memory.
+        """
+        if DEBUG: print("Pyramid.__init__()")
+
+        self.src = src
+        self.tileSz = tileSz
+        self.chunkRows = chunkRows
+        h, w = src.shape
+        shapes = []
+        while max(h, w) > tileSz:
+            h, w = (h+1)//2, (w+1)//2
+            shapes.append((h, w))
+        self.levels = []
+        if fp == None:
+            for shape in shapes: self.levels.append(np.zeros(shape, np.uint8))
+        else:
+            mm = np.memmap(fp, np.uint8, "w+",
+                           shape=(max(1, sum(h*w for h, w in shapes)),))
+            i = 0
+            for h, w in shapes:
+                self.levels.append(mm[i:i+h*w].reshape((h, w)))
+                i += h*w
+        if build: self.update(0, src.shape[0])
+
+    #-------------------------------------------------------------------
+
+    @property
+    def nLevels(self):
+        return len(self.levels) + 1
+
+    #-------------------------------------------------------------------
+
+    def shape(self, lvl):
+        """ Shape of a level.
+        """
+        if lvl == 0: return self.src.shape
+        return self.levels[lvl-1].shape
+
+    #-------------------------------------------------------------------
+
+    def update(self, r0, r1):
+        """ Recompute levels >= 1 over source rows [r0, r1),
+        chunk by chunk.
+
+        Args:
+            r0, r1 (int): Rows of the source that changed.
+
+        Returns: None
+        """
+        if DEBUG: print("Pyramid.update()")
+
+        prev = self.src
+        scale = 255
+        for lvl in self.levels:
+            r0, r1 = r0//2, min(lvl.shape[0], (r1+1)//2)
+            for c0 in range(r0, r1, self.chunkRows):
+                c1 = min(r1, c0 + self.chunkRows)
+                lvl[c0:c1] = downsample(prev, c0, c1, scale)
+            prev = lvl
+            scale = 1
+
+    #-------------------------------------------------------------------
+
+    def tile(self, lvl, ty, tx, tileSz=None):
+        """ Densities of a tile.
+
+        Args:
+            lvl (int): Level.
+            ty, tx (int): Tile row and column.
+            tileSz (int, optional): Tile size; self.tileSz if None.
+
+        Returns:
+            (numpy.ndarray): Densities (uint8, 0-255); tiles at the
+                right/bottom edges are smaller.
+        """
+        if tileSz == None: tileSz = self.tileSz
+        y0, x0 = ty*tileSz, tx*tileSz
+        if lvl == 0:
+            t = np.asarray(self.src[y0:y0+tileSz, x0:x0+tileSz], np.uint8)
+            return t * np.uint8(255)
+        return self.levels[lvl-1][y0:y0+tileSz, x0:x0+tileSz]
+
+    #-------------------------------------------------------------------
+
+    def tileRGB(self, lvl, ty, tx, tileSz=None):
+        """ RGB image of a tile; see tile().
+        """
+        return np.take(DENSITY_PALETTE, self.tile(lvl, ty, tx, tileSz),
+                       axis=0)
+
+#=======================================================================
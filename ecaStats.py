@@ -0,0 +1,286 @@
+# coding: UTF-8
+""" Streaming statistics of CA runs.
+
+Generations are produced one at a time by iterGenerations() and
+consumed by reducers, each keeping only its summary series, so memory
+is O(w) however many generations are run. Results are saved as compact
+arrays with the run specification (.npz).
+
+Dependency:
+    Numpy (1.17)
+
+------------------------------------------------------------------------
+Copyright (C) 2019 Jinook Oh, W. Tecumseh Fitch
+- Contact: jinook.oh@univie.ac.at, tecumseh.fitch@univie.ac.at
+
+This program is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your
+option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program.  If not, see <http://www.gnu.org/licenses/>.
+------------------------------------------------------------------------
+"""
+
+import json
+from time import time
+
+import numpy as np
+
+from ecaEngine import ruleLUT, stepECA, makeInitLine
+from ecaCache import runSpec
+
+DEBUG = False
+
+#=======================================================================
+
+def iterGenerations(ruleNum, w, nGen, initL="center seed", seed=None):
+    """ Generate the lines of a run one by one.
+
+    Args:
+        ruleNum (int): Rule number (0-255).
+        w (int): Width of each line.
+        nGen (int): Number of generations to advance.
+        initL (str or array-like): See ecaEngine.makeInitLine().
+        seed (int, optional): Seed for a random first line.
+
+    Yields:
+        g (int): Generation (0 to nGen).
+        line (numpy.ndarray): Its line (uint8); the buffer is reused,
+            so copy it to keep it beyond the next iteration.
+    """
+    if DEBUG: print("iterGenerations()")
+
+    lut = ruleLUT(ruleNum)
+    line = makeInitLine(w, initL, seed).copy()
+    buf = np.empty(w, np.uint8)
+    idx = np.empty(w, np.uint8) # buffer for neighborhood index
+    yield 0, line
+    for g in range(1, nGen+1):
+        stepECA(line, lut, buf, idx)
+        line, buf = buf, line
+        yield g, line
+
+#-----------------------------------------------------------------------
+
+def blockIndex(line, k):
+    """ Index of the k-cell block starting at each cell (periodic).
+
+    Args:
+        line (numpy.ndarray): Line (uint8, 0 or 1).
+        k (int): Block length (1 to 16, and at most the width).
+
+    Returns:
+        idx (numpy.ndarray): Block values (uint16), leftmost cell is
+            the most significant bit.
+    """
+    w = line.shape[0]
+    if not 1 <= k <= min(16, w):
+        raise ValueError("Block length %i is not in 1-%i"%(k, min(16, w)))
+    ext = np.concatenate((line, line[:k-1])).astype(np.uint16)
+    idx = ext[:w].copy()
+    for j in range(1, k):
+        idx <<= np.uint16(1)
+        idx |= ext[j:j+w]
+    return idx
+
+#=======================================================================
+
+class Reducer:
+    """ Base of streaming reducers. update() is called with every
+    generation in order; a value is recorded every 'every' generations.
+
+    Attributes:
+        name (str): Name of the result array.
+        every (int): Recording interval in generations.
+        values (list): Recorded values.
+    """
+    def __init__(self, name, every=1):
+        self.name = name
+        self.every = every
+        self.values = []
+
+    #-------------------------------------------------------------------
+
+    def update(self, g, line):
+        """ Consume generation g.
+
+        Args:
+            g (int): Generation.
+            line (numpy.ndarray): Its line (uint8).
+
+        Returns: None
+        """
+        if g % self.every == 0: self.values.append(self.measure(g, line))
+
+    #-------------------------------------------------------------------
+
+    def measure(self, g, line):
+        raise NotImplementedError
+
+    #-------------------------------------------------------------------
+
+    def result(self):
+        """ Recorded values as an array.
+        """
+        return np.array(self.values)
+
+#=======================================================================
+
+class Density(Reducer):
+    """ Fraction of 1 cells.
+    """
+    def __init__(self, every=1):
+        Reducer.__init__(self, "density", every)
+
+    #-------------------------------------------------------------------
+
+    def measure(self, g, line):
+        return line.mean()
+
+#=======================================================================
+
+class BlockEntropy(Reducer):
+    """ Shannon entropy (bits) of the distribution of k-cell blocks.
+    """
+    def __init__(self, k=3, every=1):
+        Reducer.__init__(self, "entropy%i"%(k), every)
+        self.k = k
+
+    #-------------------------------------------------------------------
+
+    def measure(self, g, line):
+        cnt = np.bincount(blockIndex(line, self.k), minlength=2**self.k)
+        p = cnt[cnt > 0] / line.shape[0]
+        return float(-(p * np.log2(p)).sum())
+
+#=======================================================================
+
+class DistinctPatterns(Reducer):
+    """ Number of distinct k-cell blocks present in a line.
+    """
+    def __init__(self, k=3, every=1):
+        Reducer.__init__(self, "patterns%i"%(k), every)
+        self.k = k
+
+    #-------------------------------------------------------------------
+
+    def measure(self, g, line):
+        cnt = np.bincount(blockIndex(line, self.k), minlength=2**self.k)
+        return int(np.count_nonzero(cnt))
+
+#=======================================================================
+
+class Damage(Reducer):
+    """ Damage spreading: Hamming distance between the run and a twin
+    whose first line differs in the given cells. The twin is advanced
+    alongside the run, so update() must get every generation.
+    """
+    def __init__(self, ruleNum, flip=None, every=1):
+        """
+        Args:
+            ruleNum (int): Rule number of the run.
+            flip (list, optional): Cells flipped in the twin; the
+                center cell when None.
+            every (int): Recording interval in generations.
+        """
+        Reducer.__init__(self, "damage", every)
+        self.lut = ruleLUT(ruleNum)
+        self.flip = flip
+        self.twin = None
+        self.buf = None
+
+    #-------------------------------------------------------------------
+
+    def update(self, g, line):
+        if g == 0:
+            self.twin = line.copy()
+            if self.flip == None: flip = [line.shape[0]//2]
+            else: flip = self.flip
+            self.twin[flip] ^= 1
+            self.buf = np.empty_like(self.twin)
+        else:
+            stepECA(self.twin, self.lut, self.buf)
+            self.twin, self.buf = self.buf, self.twin
+        Reducer.update(self, g, line)
+
+    #-------------------------------------------------------------------
+
+    def measure(self, g, line):
+        return int(np.count_nonzero(line != self.twin))
+
+#=======================================================================
+
+def runStats(ruleNum, w, nGen, initL="center seed", seed=None,
+             reducers=None):
+    """ Run CA and feed every generation to reducers.
+
+    Args:
+        ruleNum (int): Rule number (0-255).
+        w (int): Width of each line.
+        nGen (int): Number of generations to advance.
+        initL (str or array-like): See ecaEngine.makeInitLine().
+        seed (int, optional): Seed for a random first line.
+        reducers (list, optional): Reducer instances; Density() if None.
+
+    Returns:
+        res (dict): Result array of each reducer, keyed by its name.
+        spec (dict): Run specification (see ecaCache.runSpec()) with
+            nGen and elapsed time.
+    """
+    if DEBUG: print("runStats()")
+
+    t0 = time()
+    if reducers == None: reducers = [Density()]
+    for g, line in iterGenerations(ruleNum, w, nGen, initL, seed):
+        for r in reducers: r.update(g, line)
+    res = {}
+    for r in reducers:
+        res[r.name] = r.result()
+        res[r.name + "_every"] = np.array(r.every)
+    spec = dict(runSpec(ruleNum, w, nGen+1, initL, seed), nGen=nGen,
+                elapsed=time()-t0)
+    return res, spec
+
+#-----------------------------------------------------------------------
+
+def saveStats(fp, res, spec):
+    """ Save results of runStats() with the run specification.
+
+    Args:
+        fp (str): File path (.npz).
+        res (dict): Result arrays.
+        spec (dict): Run specification.
+
+    Returns: None
+    """
+    if DEBUG: print("saveStats()")
+
+    np.savez_compressed(fp, spec=np.array(json.dumps(spec)), **res)
+
+#-----------------------------------------------------------------------
+
+def loadStats(fp):
+    """ Load results saved with saveStats().
+
+    Args:
+        fp (str): File path.
+
+    Returns:
+        res (dict): Result arrays.
+        spec (dict): Run specification.
+    """
+    if DEBUG: print("loadStats()")
+
+    with np.load(fp) as f:
+        res = {k: f[k] for k in f.files if k != "spec"}
+        spec = json.loads(str(f["spec"]))
+    return res, spec
+
+#=======================================================================
@@ -0,0 +1,182 @@
+# coding: UTF-8
+""" Running many (rule, seed) combinations of elementary cellular
+automata over a process pool.
+
+Each worker writes its result directly into a preallocated block
+(a NumPy .npy memmap file, on /dev/shm when available), so results are
+never pickled back to the main process.
+
+Dependency:
+    Numpy (1.17)
+
+------------------------------------------------------------------------
+Copyright (C) 2019 Jinook Oh, W. Tecumseh Fitch
+- Contact: jinook.oh@univie.ac.at, tecumseh.fitch@univie.ac.at
+
+This program is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your
+option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program.  If not, see <http://www.gnu.org/licenses/>.
+------------------------------------------------------------------------
+"""
+
+import os, tempfile
+from time import time
+from collections import OrderedDict
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+from ecaEngine import makeInitLine, runECA
+from ecaSymmetry import ruleClass, canonicalLine, transformHistory
+
+DEBUG = False
+
+_wBlk = None # result block opened in a worker process
+_wArgs = None # (w, h, initL, packed) in a worker process
+
+#=======================================================================
+
+def _initWorker(fp, w, h, initL, packed):
+    """ Initialize a worker process; open the shared result block.
+    """
+    global _wBlk, _wArgs
+    _wBlk = np.load(fp, mmap_mode="r+")
+    _wArgs = (w, h, initL, packed)
+
+#-----------------------------------------------------------------------
+
+def _runJob(job):
+    """ Run one (rule, seed) job in a worker process; for a canonical
+    run, also derive the runs of its symmetry group.
+
+    Args:
+        job (tuple): (job index, rule number, seed, first line or None,
+            members or None); members is a list of (job index,
+            transform) of the runs derived from this one (including
+            itself, first).
+
+    Returns:
+        elapsed (float): Time spent on this job.
+    """
+    ji, ruleNum, seed, line, members = job
+    w, h, initL, packed = _wArgs
+    if line is None: line = initL
+    _, info = runECA(ruleNum, w, h, line, seed, out=_wBlk[ji],
+                     packed=packed, chunkRows=h)
+    if members != None:
+        src = _wBlk[ji]
+        for mji, trans in members[1:]:
+            transformHistory(src, *trans, out=_wBlk[mji])
+        transformHistory(src, *members[0][1], out=src)
+    return info["elapsed"]
+
+#-----------------------------------------------------------------------
+
+def sweepJobs(rules=range(256), seeds=(None,)):
+    """ Make a list of jobs.
+
+    Args:
+        rules (iterable): Rule numbers.
+        seeds (iterable): Seeds of random initial lines.
+
+    Returns:
+        jobs (list): List of (rule, seed) tuples.
+    """
+    if DEBUG: print("sweepJobs()")
+
+    return [(r, s) for r in rules for s in seeds]
+
+#-----------------------------------------------------------------------
+
+def runSweep(w, h, rules=range(256), seeds=(None,), initL="center seed",
+             fp=None, nProc=None, packed=False, useSymmetry=False):
+    """ Run all (rule, seed) combinations over a process pool.
+
+    Args:
+        w (int): Width of each line.
+        h (int): Number of generations.
+        rules (iterable): Rule numbers.
+        seeds (iterable): Seeds of random initial lines.
+        initL (str): Initial line; see ecaEngine.makeInitLine().
+        fp (str, optional): Path of the result .npy file. When None,
+            a temporary file is used and removed once mapped.
+        nProc (int, optional): Number of processes; all cores if None.
+        packed (bool): Use the bit-packed backend.
+        useSymmetry (bool): Simulate only one run per canonical run
+            (see ecaSymmetry) and derive the others from it.
+            Not available with the packed backend.
+
+    Returns:
+        blk (numpy.memmap): Results, shape (number of jobs, h, w) uint8
+            or (number of jobs, h, ceil(w/64)) uint64 when packed.
+        info (dict): Jobs and throughput.
+    """
+    if DEBUG: print("runSweep()")
+
+    if packed and useSymmetry:
+        raise ValueError("useSymmetry is not available with packed=True")
+    jobs = sweepJobs(rules, seeds)
+    if nProc == None: nProc = cpu_count()
+    if packed: shape = (len(jobs), h, (w+63)//64); dtype = np.uint64
+    else: shape = (len(jobs), h, w); dtype = np.uint8
+
+    tmp = fp == None
+    if tmp:
+        if os.path.isdir("/dev/shm"): tmpDir = "/dev/shm"
+        else: tmpDir = None
+        fd, fp = tempfile.mkstemp(suffix=".npy", dir=tmpDir)
+        os.close(fd)
+    blk = np.lib.format.open_memmap(fp, mode="w+", dtype=dtype, shape=shape)
+    blk.flush()
+
+    t0 = time()
+    if useSymmetry:
+        # random lines: skip the rotation search (see canonicalLine())
+        rotate = initL.lower() != "random"
+        canon = {} # (seed, refl, comp) -> (canonical line, shift)
+        groups = OrderedDict() # canonical run -> [(job, transform), ..]
+        for ji, (r, s) in enumerate(jobs):
+            rep, refl, comp = ruleClass(r)
+            ck = (s, refl, comp)
+            if not ck in canon:
+                canon[ck] = canonicalLine(makeInitLine(w, initL, s), refl,
+                                          comp, rotate)
+            lineC, k = canon[ck]
+            key = (rep, lineC.tobytes())
+            if not key in groups: groups[key] = (rep, lineC, [])
+            groups[key][2].append(((ji, r, s), (refl, comp, k)))
+        jobArgs = []
+        for rep, lineC, members in groups.values():
+            if len(members) == 1: # nothing to share; run it as it is
+                jobArgs.append(members[0][0] + (None, None))
+            else:
+                jobArgs.append((members[0][0][0], rep, None, lineC,
+                                [(m[0], trans) for m, trans in members]))
+    else:
+        jobArgs = [(ji, r, s, None, None) for ji, (r, s) in enumerate(jobs)]
+    cs = max(1, int(len(jobArgs) / (nProc * 4))) # chunk size
+    with Pool(nProc, _initWorker, (fp, w, h, initL, packed)) as pool:
+        cpuTime = sum(pool.imap_unordered(_runJob, jobArgs, cs))
+    elapsed = time() - t0
+    if tmp:
+        try: os.remove(fp) # the mapping stays valid
+        except OSError: pass
+        fp = None
+
+    nGen = len(jobs) * (h-1)
+    info = dict(jobs=jobs, w=w, h=h, initL=initL, packed=packed, fp=fp,
+                nProc=nProc, nSimulated=len(jobArgs),
+                elapsed=elapsed, cpuTime=cpuTime,
+                genPerSec=nGen/elapsed, cellsPerSec=nGen*w/elapsed)
+    return blk, info
+
+#=======================================================================
@@ -0,0 +1,206 @@
+# coding: UTF-8
+""" Symmetry classes of Wolfram's 256 elementary rules.
+
+Under left-right reflection and black-white complement the 256 rules
+fall into 88 equivalence classes. For a rule f = T(g) (T: reflection
+and/or complement) and a first line L,
+    history(f, L) = T(history(g, T(L))),
+and because the lattice is periodic, rotating the first line rotates
+the whole history. So a run is mapped to (class representative,
+first line in its least rotation), and equivalent runs are derived from
+one computed history by flipping columns, inverting bits and rotating.
+
+Dependency:
+    Numpy (1.17)
+
+------------------------------------------------------------------------
+Copyright (C) 2019 Jinook Oh, W. Tecumseh Fitch
+- Contact: jinook.oh@univie.ac.at, tecumseh.fitch@univie.ac.at
+
+This program is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your
+option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program.  If not, see <http://www.gnu.org/licenses/>.
+------------------------------------------------------------------------
+"""
+
+import numpy as np
+
+DEBUG = False
+
+#=======================================================================
+
+def reflectRule(ruleNum):
+    """ Left-right reflection of a rule; f'(l,c,r) = f(r,c,l).
+
+    Args:
+        ruleNum (int): Rule number (0-255).
+
+    Returns:
+        (int): Rule number of the reflected rule.
+    """
+    ret = 0
+    for i in range(8):
+        l, c, r = (i>>2)&1, (i>>1)&1, i&1
+        ret |= ((ruleNum >> (4*r + 2*c + l)) & 1) << i
+    return ret
+
+#-----------------------------------------------------------------------
+
+def complementRule(ruleNum):
+    """ Black-white complement of a rule; f'(l,c,r) = 1-f(1-l,1-c,1-r).
+
+    Args:
+        ruleNum (int): Rule number (0-255).
+
+    Returns:
+        (int): Rule number of the complemented rule.
+    """
+    ret = 0
+    for i in range(8):
+        ret |= (1 - ((ruleNum >> (7-i)) & 1)) << i
+    return ret
+
+#-----------------------------------------------------------------------
+
+def ruleClass(ruleNum):
+    """ Find the class representative of a rule.
+
+    Args:
+        ruleNum (int): Rule number (0-255).
+
+    Returns:
+        rep (int): Representative (smallest rule number) of the class.
+        refl (bool): Whether ruleNum is the reflection ...
+        comp (bool): ... and/or the complement of rep.
+    """
+    if DEBUG: print("ruleClass()")
+
+    cands = []
+    for refl in (False, True):
+        for comp in (False, True):
+            rn = ruleNum
+            if refl: rn = reflectRule(rn)
+            if comp: rn = complementRule(rn)
+            cands.append((rn, refl, comp))
+    return min(cands)
+
+#-----------------------------------------------------------------------
+
+def ruleClasses():
+    """ All equivalence classes of the 256 rules.
+
+    Args: None
+
+    Returns:
+        classes (dict): Representative -> list of rule numbers (88 keys).
+    """
+    if DEBUG: print("ruleClasses()")
+
+    classes = {}
+    for rn in range(256): classes.setdefault(ruleClass(rn)[0], []).append(rn)
+    return classes
+
+#-----------------------------------------------------------------------
+
+def leastRotation(line):
+    """ Index of the lexicographically least rotation of a line
+    (Booth's algorithm, linear time).
+
+    Args:
+        line (numpy.ndarray): Line (uint8).
+
+    Returns:
+        k (int): np.roll(line, -k) is the least rotation.
+    """
+    s = line.tobytes()
+    n = len(s)
+    f = [-1] * (2*n)
+    k = 0
+    for j in range(1, 2*n):
+        sj = s[j % n]
+        i = f[j-k-1]
+        while i != -1 and sj != s[(k+i+1) % n]:
+            if sj < s[(k+i+1) % n]: k = j-i-1
+            i = f[i]
+        if sj != s[(k+i+1) % n]: # i == -1
+            if sj < s[k % n]: k = j # (k+i+1) == k
+            f[j-k] = -1
+        else:
+            f[j-k] = i+1
+    return k % n
+
+#-----------------------------------------------------------------------
+
+def transformHistory(arr, refl, comp, shift=0, out=None):
+    """ Apply a symmetry transform to a history (or a line).
+
+    Args:
+        arr (numpy.ndarray): History (uint8, 0 or 1); last axis is space.
+        refl (bool): Flip columns.
+        comp (bool): Invert bits.
+        shift (int): Rotate columns by 'shift' before the flip/invert.
+        out (numpy.ndarray, optional): Array to write the result.
+            May be 'arr' itself.
+
+    Returns:
+        out (numpy.ndarray): Transformed history.
+    """
+    if shift != 0: arr = np.roll(arr, shift, axis=-1)
+    if refl: arr = arr[..., ::-1]
+    if out is None: out = np.empty(arr.shape, np.uint8)
+    if comp: np.bitwise_xor(arr, 1, out=out)
+    elif not out is arr: out[...] = arr
+    return out
+
+#-----------------------------------------------------------------------
+
+def canonicalLine(line, refl, comp, rotate=True):
+    """ Transform a first line and bring it to its least rotation.
+
+    Args:
+        line (numpy.ndarray): First line (uint8).
+        refl (bool): Flip the line.
+        comp (bool): Invert its bits.
+        rotate (bool): Look for the least rotation; without it, the
+            shift is 0 (e.g. for random lines, whose rotations
+            practically never match another line of a sweep).
+
+    Returns:
+        lineC (numpy.ndarray): Canonical first line.
+        shift (int): Rotation of lineC to get the transformed line.
+    """
+    lineT = transformHistory(line, refl, comp)
+    if not rotate: return lineT, 0
+    k = leastRotation(lineT)
+    return np.roll(lineT, -k), k
+
+#-----------------------------------------------------------------------
+
+def canonicalRun(ruleNum, line, rotate=True):
+    """ Map a rule and a first line to the canonical run.
+
+    Args:
+        ruleNum (int): Rule number (0-255).
+        line (numpy.ndarray): First line (uint8).
+        rotate (bool): See canonicalLine().
+
+    Returns:
+        rep (int): Representative rule.
+        lineC (numpy.ndarray): Canonical first line for 'rep'.
+        trans (tuple): (refl, comp, shift) for transformHistory(), to get
+            history(ruleNum, line) from history(rep, lineC).
+    """
+    rep, refl, comp = ruleClass(ruleNum)
+    lineC, k = canonicalLine(line, refl, comp, rotate)
+    return rep, lineC, (refl, comp, k)
+
+#=======================================================================
@@ -0,0 +1,8 @@
+# coding: UTF-8
+""" The modules are in the repository root (no package); make them
+importable from the tests.
+"""
+
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,130 @@
+# coding: UTF-8
+""" Each backend against the plain step (ecaEngine.stepECA()) over all
+256 rules, at widths including 1 and widths that are not multiples of
+64.
+"""
+
+import numpy as np
+import pytest
+
+from ecaEngine import ruleLUT, stepECA, makeInitLine, runECA, packRow, \
+                      unpackRow, runUnbounded
+from ecaMacro import runMacro
+from ecaHashLife import HashLife
+from ecaParallel import ParallelStepper
+
+RULES = range(256)
+WIDTHS = (1, 2, 3, 7, 63, 64, 65, 130)
+H = 40 # generations per run
+
+#=======================================================================
+
+def reference(ruleNum, w, h, line):
+    """ History of h generations with stepECA() only.
+    """
+    lut = ruleLUT(ruleNum)
+    out = np.zeros((h, w), np.uint8)
+    out[0] = line
+    for g in range(1, h): stepECA(out[g-1], lut, out[g])
+    return out
+
+#-----------------------------------------------------------------------
+
+def firstLine(w, ruleNum):
+    """ A random first line (seeded by the rule number).
+    """
+    return makeInitLine(w, "random", ruleNum)
+
+#=======================================================================
+
+@pytest.mark.parametrize("w", WIDTHS)
+def test_packed(w):
+    for ruleNum in RULES:
+        line = firstLine(w, ruleNum)
+        ref = reference(ruleNum, w, H, line)
+        arr, info = runECA(ruleNum, w, H, line, packed=True,
+                           detectCycle=False)
+        assert np.array_equal(unpackRow(arr, w), ref), ruleNum
+        assert np.array_equal(arr[-1], packRow(ref[-1])), ruleNum
+
+#-----------------------------------------------------------------------
+
+@pytest.mark.parametrize("packed", (False, True))
+@pytest.mark.parametrize("w", WIDTHS)
+def test_cycle_detection(w, packed):
+    for ruleNum in RULES:
+        line = firstLine(w, ruleNum)
+        ref = reference(ruleNum, w, H, line)
+        arr, info = runECA(ruleNum, w, H, line, packed=packed)
+        if packed: arr = unpackRow(arr, w)
+        assert np.array_equal(arr, ref), ruleNum
+        t, p = info["transient"], info["period"]
+        if p != None: # first repetition of the row t
+            assert np.array_equal(ref[t], ref[t+p])
+            assert not any(np.array_equal(ref[i], ref[t+p])
+                           for i in range(t))
+        else:
+            assert len(set(row.tobytes() for row in ref)) == H
+
+#-----------------------------------------------------------------------
+
+@pytest.mark.parametrize("w", WIDTHS)
+def test_macro(w):
+    for ruleNum in RULES:
+        line = firstLine(w, ruleNum)
+        ref = reference(ruleNum, w, H, line)
+        for every in (1, 3, 8):
+            rows = runMacro(ruleNum, w, H-1, line, every=every)
+            assert np.array_equal(rows, ref[::every]), (ruleNum, every)
+        last = runMacro(ruleNum, w, H-1, line)
+        assert np.array_equal(last[-1], ref[-1]), ruleNum
+
+#-----------------------------------------------------------------------
+
+@pytest.mark.parametrize("w", WIDTHS)
+def test_parallel(w):
+    stepper = ParallelStepper(nThreads=3, halo=4)
+    try:
+        for ruleNum in RULES:
+            line = firstLine(w, ruleNum)
+            ref = reference(ruleNum, w, H, line)
+            arr, info = stepper.run(ruleNum, w, H, line, chunkRows=7)
+            assert np.array_equal(arr, ref), ruleNum
+    finally:
+        stepper.close()
+
+#-----------------------------------------------------------------------
+
+@pytest.mark.parametrize("n", (1, 2, 7, 65))
+def test_hashlife(n):
+    # a ring wide enough that the wrapped edges are never reached
+    # behaves like the unbounded lattice
+    pad = H + 1
+    w = n + 2*pad
+    for ruleNum in RULES:
+        line = firstLine(n, ruleNum)
+        ext = np.zeros(w, np.uint8)
+        ext[pad:pad+n] = line
+        ref = reference(ruleNum, w, H, ext)
+        hl = HashLife(ruleNum, line, origin=0)
+        for t in (0, 1, 2, 5, 16, H-1, 3):
+            hl.goTo(t)
+            assert np.array_equal(hl.getRow(-pad, n+pad), ref[t]), \
+                (ruleNum, t)
+
+#-----------------------------------------------------------------------
+
+@pytest.mark.parametrize("w", (1, 2, 7, 65))
+def test_unbounded(w):
+    # as for HashLife, a wide ring stands for the unbounded lattice;
+    # odd rules map 000 to 1, so their background is not 0 after
+    # generation 0 (and alternates when they also map 111 to 0)
+    pad = H + 1
+    for ruleNum in RULES:
+        for line in (firstLine(w, ruleNum), np.zeros(w, np.uint8)):
+            ext = np.zeros(w + 2*pad, np.uint8)
+            ext[pad:pad+w] = line
+            ref = reference(ruleNum, w + 2*pad, H, ext)[:, pad:pad+w]
+            arr, info = runUnbounded(ruleNum, w, H, line, chunkRows=7)
+            assert np.array_equal(arr, ref), ruleNum
+            assert info["rowsDone"] == H
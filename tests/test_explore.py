@@ -0,0 +1,41 @@
+# coding: UTF-8
+""" Tests of ecaExplore.
+"""
+
+import time
+from threading import Event
+
+import ecaExplore
+from ecaExplore import ThumbnailCache
+
+#=======================================================================
+
+def test_failing_batch_does_not_stop_the_workers(monkeypatch):
+    thumbnails = ecaExplore.thumbnails
+    def failOn30(rules, initL="center seed", seed=None):
+        if 30 in rules: raise ValueError("bad batch")
+        return thumbnails(rules, initL, seed)
+    monkeypatch.setattr(ecaExplore, "thumbnails", failOn30)
+    done = Event()
+    cache = ThumbnailCache(lambda keys: done.set(), nThreads=1)
+    try:
+        with cache.cond: # the latest request is computed first
+            cache.request([110])
+            cache.request([30])
+        assert done.wait(5)
+        assert cache.get(110) is not None
+        assert cache.get(30) is None
+        # the failed thumbnail is no longer pending, so it is queued
+        # again when requested
+        t0 = time.time()
+        while cache.pending and time.time() - t0 < 5: time.sleep(0.01)
+        assert cache.pending == set()
+        monkeypatch.setattr(ecaExplore, "thumbnails", thumbnails)
+        done.clear()
+        cache.request([30])
+        assert done.wait(5)
+        assert cache.get(30) is not None
+    finally:
+        cache.close()
+
+#=======================================================================
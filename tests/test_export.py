@@ -0,0 +1,131 @@
+# coding: UTF-8
+""" Exports read back: PNG (decoded with zlib), .npz, .npy with .json
+and the row-delta stream, from cells, packed rows and histories.
+"""
+
+import json, zlib, struct
+
+import numpy as np
+import pytest
+
+from ecaEngine import runECA, packRow
+from ecaHistory import createHistory
+from ecaExport import FORMATS, packedBits, iterChunks, loadArray, \
+                      RLEReader, exportResult, exportRun, exportSweep
+from ecaSweep import runSweep
+
+WIDTHS = (1, 7, 8, 63, 64, 65, 130)
+H = 37
+CHUNK_ROWS = 10 # several chunks per run, the last one shorter
+
+#=======================================================================
+
+def readPNG(fp):
+    """ Cells of a 1-bit PNG written by PNGWriter.
+    """
+    with open(fp, "rb") as f: data = f.read()
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    pos = 8
+    chunks = {}
+    while pos < len(data):
+        n, = struct.unpack(">I", data[pos:pos+4])
+        tag = data[pos+4:pos+8]
+        body = data[pos+8:pos+8+n]
+        crc, = struct.unpack(">I", data[pos+8+n:pos+12+n])
+        assert crc == zlib.crc32(tag + body) & 0xffffffff
+        chunks[tag] = chunks.get(tag, b"") + body
+        pos += 12 + n
+    w, h, depth, colorType = struct.unpack(">IIBB", chunks[b"IHDR"][:10])
+    assert (depth, colorType) == (1, 3)
+    raw = np.frombuffer(zlib.decompress(chunks[b"IDAT"]), np.uint8)
+    raw = raw.reshape(h, (w+7)//8 + 1)
+    assert not raw[:, 0].any() # filter type 0
+    return np.unpackbits(raw[:, 1:], axis=1, count=w)
+
+#-----------------------------------------------------------------------
+
+def readBack(fp):
+    """ Cells of an export in any of FORMATS.
+    """
+    if fp.endswith(".png"): return readPNG(fp)
+    if fp.endswith(".ecarle"): return RLEReader(fp).read()
+    arr, meta = loadArray(fp)
+    return arr
+
+#-----------------------------------------------------------------------
+
+def run(w, ruleNum=110):
+    return runECA(ruleNum, w, H, "random", w, detectCycle=False)
+
+#=======================================================================
+
+@pytest.mark.parametrize("w", WIDTHS)
+def test_packed_bits(w):
+    cells, info = run(w)
+    exp = np.packbits(cells, axis=1)
+    assert np.array_equal(packedBits(packRow(cells), w), exp)
+    for bits in (False, True):
+        got = np.concatenate(list(iterChunks(packRow(cells), w, H,
+                                             CHUNK_ROWS, bits)))
+        assert np.array_equal(got, exp if bits else cells)
+
+#-----------------------------------------------------------------------
+
+@pytest.mark.parametrize("ext", FORMATS)
+@pytest.mark.parametrize("w", WIDTHS)
+def test_export_result(tmp_path, w, ext):
+    cells, info = run(w)
+    for name, src in (("cells", cells), ("packed", packRow(cells))):
+        fp = str(tmp_path / (name + ext))
+        exportResult(fp, src, dict(info, w=w), chunkRows=CHUNK_ROWS)
+        assert np.array_equal(readBack(fp), cells), name
+    if ext == ".npy":
+        with open(fp + ".json") as f: meta = json.load(f)
+        assert (meta["w"], meta["h"]) == (w, H)
+
+#-----------------------------------------------------------------------
+
+@pytest.mark.parametrize("ext", FORMATS)
+@pytest.mark.parametrize("packed", (False, True))
+def test_export_history(tmp_path, packed, ext):
+    w = 100
+    cells, info = run(w, 30)
+    hist = createHistory(str(tmp_path / "run.hist"), 30, w, H, "random",
+                         seed=w, packed=packed)
+    hist.run()
+    fp = str(tmp_path / ("run" + ext))
+    exportResult(fp, hist, chunkRows=CHUNK_ROWS)
+    assert np.array_equal(readBack(fp), cells)
+    # rows done of a running job
+    exportResult(fp, hist, nRows=5)
+    assert np.array_equal(readBack(fp), cells[:5])
+    hist.close()
+
+#-----------------------------------------------------------------------
+
+@pytest.mark.parametrize("ext", FORMATS)
+def test_export_run(tmp_path, ext):
+    cells, info = run(65)
+    fp = str(tmp_path / ("run" + ext))
+    exportRun(fp, 110, 65, H, "random", 65, chunkRows=CHUNK_ROWS)
+    assert np.array_equal(readBack(fp), cells)
+
+#-----------------------------------------------------------------------
+
+@pytest.mark.parametrize("ext", FORMATS)
+@pytest.mark.parametrize("packed", (False, True))
+def test_export_sweep(tmp_path, packed, ext):
+    w = 70
+    blk, info = runSweep(w, H, [30, 90], [1, 2], "random", nProc=1,
+                         packed=packed)
+    fps = exportSweep(str(tmp_path / ("sweep" + ext)), blk, info,
+                      chunkRows=CHUNK_ROWS)
+    ref = [runECA(r, w, H, "random", s, detectCycle=False)[0]
+           for r, s in info["jobs"]]
+    if len(fps) == 1:
+        assert np.array_equal(readBack(fps[0]), np.array(ref))
+    else:
+        for fp, cells in zip(fps, ref):
+            assert np.array_equal(readBack(fp), cells), fp
+
+#=======================================================================
@@ -0,0 +1,92 @@
+# coding: UTF-8
+""" Tests of ecaHashLife.
+"""
+
+import numpy as np
+
+from ecaEngine import runECA
+from ecaHashLife import HashLife
+
+#=======================================================================
+
+class CountingHashLife(HashLife):
+    """ HashLife recording the largest number of interned nodes.
+    """
+    peakNodes = 0
+
+    def join(self, l, r):
+        nd = HashLife.join(self, l, r)
+        self.peakNodes = max(self.peakNodes, len(self.nodes))
+        return nd
+
+#-----------------------------------------------------------------------
+
+def reference(ruleNum, T):
+    """ Generations 0-T from a single live cell at position 0, on a ring
+    wide enough that the wrapped edges are never reached; cell x is at
+    column x + T + 1.
+    """
+    w = 2*T + 3
+    line = np.zeros(w, np.uint8)
+    line[T+1] = 1
+    return runECA(ruleNum, w, T+1, line, detectCycle=False)[0]
+
+#-----------------------------------------------------------------------
+
+def test_node_limit():
+    # 2**12 generations of a chaotic rule need about 175000 nodes
+    # without eviction
+    T = 1 << 12
+    hl = CountingHashLife(30, maxNodes=20000)
+    hl.goTo(T)
+    assert hl.t == T
+    assert hl.peakNodes <= 20000
+    assert np.array_equal(hl.getRow(-T-1, T+2), reference(30, T)[T])
+
+#-----------------------------------------------------------------------
+
+def test_rows_with_eviction():
+    T = 300
+    for ruleNum in (30, 45, 73, 90, 110):
+        ref = reference(ruleNum, T)
+        hl = HashLife(ruleNum, maxNodes=300)
+        for t in (0, 1, 77, 256, 300, 3):
+            hl.goTo(t)
+            assert np.array_equal(hl.getRow(-T-1, T+2), ref[t])
+
+#-----------------------------------------------------------------------
+
+def test_chaotic_rules_are_stepped_directly():
+    T = 3000
+    for ruleNum in (30, 45):
+        ref = reference(ruleNum, T)
+        hl = HashLife(ruleNum)
+        hl.goTo(T)
+        assert hl.direct != None
+        assert np.array_equal(hl.getRow(-T-1, T+2), ref[T])
+        ### only the light cone of a view
+        hl = HashLife(ruleNum)
+        hl.setView(-20, 30, 2000)
+        for t in (1500, 2000):
+            hl.goTo(t)
+            assert np.array_equal(hl.getRow(-20, 30), ref[t, T-19:T+31])
+        hl.goTo(T) # beyond the view: from generation 0 again
+        assert np.array_equal(hl.getRow(-T-1, T+2), ref[T])
+
+#-----------------------------------------------------------------------
+
+def test_history_of_a_chaotic_rule():
+    T = 2500
+    ref = reference(30, T)
+    gens, hist = HashLife(30).getHistory(T, 6, -50, 50)
+    assert np.array_equal(hist, ref[gens, T-49:T+51])
+
+#-----------------------------------------------------------------------
+
+def test_self_similar_rule_stays_fast():
+    t = 1 << 40
+    hl = HashLife(90)
+    hl.goTo(t)
+    assert hl.direct == None
+    assert hl.population(-t-1, t+2) == 2
+    assert hl.getRow(t-1, t+2).tolist() == [0, 1, 0]
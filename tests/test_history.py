@@ -0,0 +1,59 @@
+# coding: UTF-8
+""" On-disk history: an interrupted run resumed from its file gives the
+rows of an uninterrupted run.
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from ecaEngine import makeInitLine, runECA
+from ecaHistory import createHistory, HistoryStore, HEADER_SZ
+
+W = 10000 # a custom line of this width does not fit in the header
+H = 60
+
+#=======================================================================
+
+@pytest.mark.parametrize("packed", (False, True))
+@pytest.mark.parametrize("asString", (False, True))
+def test_resume_wide_custom_line(tmp_path, packed, asString):
+    line = makeInitLine(W, "random", 5)
+    if asString: initL = "".join(map(str, line))
+    else: initL = line
+    ref, info = runECA(110, W, H, line.copy(), detectCycle=False)
+
+    fp = str(tmp_path / "run.hist")
+    hist = createHistory(fp, 110, W, H, initL, packed=packed)
+    assert hist.meta["initL"].startswith("custom:")
+    assert len(hist.meta["initL"]) < HEADER_SZ // 8
+    # interrupt the run after its first chunk
+    cancel = threading.Event()
+    hist.run(callback=lambda row0, row1, h: cancel.set(), chunkRows=16,
+             cancel=cancel)
+    assert 1 < hist.rowsDone < H
+    hist.close()
+
+    hist = HistoryStore(fp, "r+")
+    info = hist.run(chunkRows=16)
+    assert info["resumedFrom"] > 0
+    assert hist.rowsDone == H
+    assert np.array_equal(hist[:], ref)
+    hist.close()
+
+    hist = HistoryStore(fp)
+    assert np.array_equal(hist[0], line)
+    assert np.array_equal(hist[H-1, 100:300], ref[H-1, 100:300])
+    hist.close()
+
+#-----------------------------------------------------------------------
+
+def test_named_line_in_header(tmp_path):
+    hist = createHistory(str(tmp_path / "run.hist"), 30, 100, 10, "Random",
+                         seed=3)
+    assert hist.meta["initL"] == "random"
+    assert hist.meta["seed"] == 3
+    hist.close()
+
+#=======================================================================
@@ -0,0 +1,29 @@
+# coding: UTF-8
+""" Tests of ecaJobs.
+"""
+
+from threading import Event
+
+from ecaJobs import JobRunner
+
+#=======================================================================
+
+def test_failing_job_does_not_stop_the_worker():
+    done = Event()
+    ran = []
+    errors = []
+    def func(job, cancel):
+        if job == "bad": raise ValueError("bad job")
+        ran.append(job)
+        done.set()
+    runner = JobRunner(func, onError=lambda job, e: errors.append((job, e)))
+    try:
+        runner.submit("bad")
+        runner.submit("good")
+        assert done.wait(5)
+    finally:
+        runner.stop(timeout=5)
+    assert ran == ["good"]
+    assert len(errors) == 1 and errors[0][0] == "bad"
+    assert isinstance(errors[0][1], ValueError)
+    assert runner.current == None
@@ -0,0 +1,86 @@
+# coding: UTF-8
+""" Streaming reducers of ecaStats against values computed from the
+whole history.
+"""
+
+import numpy as np
+import pytest
+
+from ecaEngine import ruleLUT, stepECA, makeInitLine, runECA
+from ecaStats import blockIndex, runStats, saveStats, loadStats, Density, \
+                     BlockEntropy, DistinctPatterns, Damage
+
+W = 50
+N_GEN = 30
+
+#=======================================================================
+
+def blocks(line, k):
+    """ k-cell blocks (periodic) as tuples, one per cell.
+    """
+    w = len(line)
+    return [tuple(int(line[(x+j)%w]) for j in range(k)) for x in range(w)]
+
+#=======================================================================
+
+@pytest.mark.parametrize("w", (1, 2, 5, 16, 40))
+def test_block_index(w):
+    line = makeInitLine(w, "random", w)
+    for k in range(1, min(16, w)+1):
+        exp = [int("".join(map(str, b)), 2) for b in blocks(line, k)]
+        assert blockIndex(line, k).tolist() == exp, k
+
+#-----------------------------------------------------------------------
+
+@pytest.mark.parametrize("w, k", ((5, 0), (5, 6), (40, 17)))
+def test_block_length_is_checked(w, k):
+    with pytest.raises(ValueError):
+        blockIndex(makeInitLine(w, "random", 1), k)
+
+#-----------------------------------------------------------------------
+
+@pytest.mark.parametrize("ruleNum", (30, 90, 110, 184))
+def test_reducers(ruleNum):
+    k = 4
+    every = 3
+    reducers = [Density(), BlockEntropy(k, every), DistinctPatterns(k),
+                Damage(ruleNum, flip=[3, 20])]
+    res, spec = runStats(ruleNum, W, N_GEN, "random", 7, reducers)
+    hist, info = runECA(ruleNum, W, N_GEN+1, "random", 7)
+
+    assert np.allclose(res["density"], hist.mean(axis=1))
+
+    ent = []
+    for row in hist[::every]:
+        _, cnt = np.unique(blocks(row, k), axis=0, return_counts=True)
+        p = cnt / W
+        ent.append(-(p * np.log2(p)).sum())
+    assert np.allclose(res["entropy4"], ent)
+    assert int(res["entropy4_every"]) == every
+
+    assert res["patterns4"].tolist() == [len(set(blocks(row, k)))
+                                         for row in hist]
+
+    twin = hist[0].copy()
+    twin[[3, 20]] ^= 1
+    lut = ruleLUT(ruleNum)
+    damage = []
+    for row in hist:
+        damage.append(int(np.count_nonzero(row != twin)))
+        twin = stepECA(twin, lut, np.empty_like(twin))
+    assert res["damage"].tolist() == damage
+    assert spec["nGen"] == N_GEN
+
+#-----------------------------------------------------------------------
+
+def test_save_and_load(tmp_path):
+    res, spec = runStats(110, W, N_GEN, "random", 3,
+                         [Density(2), BlockEntropy(3)])
+    fp = str(tmp_path / "stats.npz")
+    saveStats(fp, res, spec)
+    res2, spec2 = loadStats(fp)
+    assert spec2 == spec
+    assert sorted(res2) == sorted(res)
+    for name in res: assert np.array_equal(res2[name], res[name]), name
+
+#=======================================================================
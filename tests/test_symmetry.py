@@ -0,0 +1,79 @@
+# coding: UTF-8
+""" Rule symmetries: the classes of the 256 rules and sweeps that run
+one member of each class.
+"""
+
+import numpy as np
+import pytest
+
+from ecaEngine import makeInitLine, runECA
+from ecaSymmetry import reflectRule, complementRule, ruleClass, \
+                        ruleClasses, leastRotation, canonicalRun, \
+                        transformHistory
+from ecaSweep import runSweep
+
+#=======================================================================
+
+def test_rule_classes():
+    classes = ruleClasses()
+    assert len(classes) == 88
+    assert sorted(rn for c in classes.values() for rn in c) \
+                                                        == list(range(256))
+    for rep, members in classes.items():
+        assert rep == min(members)
+        assert len(members) in (1, 2, 4)
+        for rn in members: assert ruleClass(rn)[0] == rep
+    # well known classes
+    assert sorted(classes[30]) == [30, 86, 135, 149]
+    assert sorted(classes[110]) == [110, 124, 137, 193]
+    assert classes[90] == [90, 165]
+
+#-----------------------------------------------------------------------
+
+def test_rule_transforms():
+    for rn in range(256):
+        assert reflectRule(reflectRule(rn)) == rn
+        assert complementRule(complementRule(rn)) == rn
+
+#-----------------------------------------------------------------------
+
+def test_least_rotation():
+    rng = np.random.default_rng(0)
+    for w in (1, 2, 5, 16, 33):
+        for i in range(20):
+            line = rng.integers(0, 2, w, dtype=np.uint8)
+            rots = [np.roll(line, -k).tobytes() for k in range(w)]
+            assert rots[leastRotation(line)] == min(rots)
+    assert leastRotation(np.zeros(7, np.uint8)) == 0
+
+#-----------------------------------------------------------------------
+
+@pytest.mark.parametrize("initL", ("center seed", "random"))
+def test_canonical_run(initL):
+    w, h = 13, 20
+    for rn in range(256):
+        line = makeInitLine(w, initL, rn)
+        rep, lineC, (refl, comp, shift) = canonicalRun(rn, line)
+        arrC, info = runECA(rep, w, h, lineC, detectCycle=False)
+        arr, info = runECA(rn, w, h, line, detectCycle=False)
+        assert np.array_equal(transformHistory(arrC, refl, comp, shift),
+                              arr), rn
+
+#-----------------------------------------------------------------------
+
+@pytest.mark.parametrize("initL, seeds", (("center seed", (None,)),
+                                          ("random", (1, 2))))
+def test_sweep_with_symmetry(initL, seeds):
+    w, h = 17, 24
+    blk, info = runSweep(w, h, range(256), seeds, initL, nProc=1)
+    blkS, infoS = runSweep(w, h, range(256), seeds, initL, nProc=1,
+                           useSymmetry=True)
+    assert infoS["jobs"] == info["jobs"]
+    if initL == "center seed": # runs of rules of a class coincide
+        assert infoS["nSimulated"] < len(info["jobs"])
+    assert np.array_equal(np.asarray(blkS), np.asarray(blk))
+    for ji, (rn, s) in enumerate(info["jobs"]):
+        arr, _ = runECA(rn, w, h, initL, s, detectCycle=False)
+        assert np.array_equal(blk[ji], arr), (rn, s)
+
+#=======================================================================